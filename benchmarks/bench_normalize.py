@@ -0,0 +1,121 @@
+"""Benchmark output text normalisation on ~10 MB inputs.
+
+Compares ``normalize_text`` against the previous implementation (kept here verbatim
+as the baseline) on clean prose, prose with noise lines, and the per-page pattern the
+parser used to follow (normalise full_text and then every page again). The second
+part times ``fix_text`` against plain ``ftfy.fix_text`` on clean text, text with 1% of
+lines carrying mojibake, and 100k short table cells.
+
+    python benchmarks/bench_normalize.py [--mb 10]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import ftfy  # noqa: E402
+
+from nc_parser.processing.normalize import fix_text, normalize_text  # noqa: E402
+
+
+def legacy_normalize(text: str) -> str:
+    if not text:
+        return ""
+    t = ftfy.fix_text(text)
+    t = t.replace("\r", "").replace("\xa0", " ")
+    t = t.replace("−", "-")
+    t = re.sub(r"[ \t]+", " ", t)
+    t = "\n".join(line.rstrip() for line in t.splitlines())
+
+    def _is_noise(line: str) -> bool:
+        if not line:
+            return False
+        cleaned = re.sub(r"[A-Za-z0-9]", "", line)
+        symbol_ratio = (len(cleaned) / max(1, len(line)))
+        if len(line) <= 2 and symbol_ratio > 0.7:
+            return True
+        letters = len(re.findall(r"[A-Za-zА-Яа-я]", line))
+        if letters == 0 and symbol_ratio > 0.7:
+            return True
+        if re.fullmatch(r"[•·©®™@©\-_=+~^`\|<>\(\)\[\]{}\\]+", line.strip()):
+            return True
+        return False
+
+    return "\n".join(ln for ln in t.splitlines() if not _is_noise(ln.strip())).strip()
+
+
+WORDS = "invoice total amount payment contract party date signature clause section договор сумма".split()
+
+
+def make_text(mb: float, noise: bool, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    out: list[str] = []
+    size = 0
+    while size < mb * 1024 * 1024:
+        if noise and rnd.random() < 0.15:
+            line = rnd.choice(["•", "---", "| |", "©", "=====", ">>", "  \t "])
+        else:
+            line = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(4, 16)))
+            if rnd.random() < 0.2:
+                line += "   \t  " + str(rnd.randint(1, 99999)) + "\xa0EUR  "
+        out.append(line)
+        size += len(line) + 1
+    return "\n".join(out)
+
+
+def add_mojibake(text: str, share: float, seed: int = 7) -> str:
+    rnd = random.Random(seed)
+    lines = text.split("\n")
+    for i in range(len(lines)):
+        if rnd.random() < share:
+            lines[i] = lines[i].encode("utf-8").decode("latin-1", errors="replace")
+    return "\n".join(lines)
+
+
+def timed(fn, *args) -> float:  # type: ignore[no-untyped-def]
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main(args: list[str]) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=float, default=10.0)
+    ns = ap.parse_args(args)
+    for label, noise in (("clean", False), ("noisy", True)):
+        text = make_text(ns.mb, noise)
+        assert legacy_normalize(text) == normalize_text(text)
+        old = timed(legacy_normalize, text)
+        new = timed(normalize_text, text)
+        again = timed(normalize_text, normalize_text(text))
+        # Parser pattern: 10 pages; before = full_text + every page, after = pages once
+        pages = [text[i::10] for i in range(10)]
+        old_pages = timed(lambda: [legacy_normalize("\n\n".join(pages))] + [legacy_normalize(p) for p in pages])
+        new_pages = timed(lambda: "\n\n".join(normalize_text(p) for p in pages))
+        print(
+            f"{label:5} {ns.mb:.0f}MB  legacy {old:6.2f}s  new {new:6.2f}s  repeat {again * 1000:6.2f}ms  "
+            f"| parse pattern legacy {old_pages:6.2f}s  new {new_pages:6.2f}s"
+        )
+    clean = make_text(ns.mb, False)
+    cells = [" ".join(WORDS[i % len(WORDS):][:3]) for i in range(100_000)]
+    for label, data in (("clean", clean), ("1% bad", add_mojibake(clean, 0.01))):
+        assert fix_text(data) == ftfy.fix_text(data)
+        old = timed(ftfy.fix_text, data)
+        new = timed(fix_text, data)
+        print(f"fix_text {label:6} {ns.mb:.0f}MB  ftfy {old:6.2f}s  fast path {new:6.2f}s")
+    old = timed(lambda: [ftfy.fix_text(c) for c in cells])
+    new = timed(lambda: [fix_text(c) for c in cells])
+    print(f"fix_text cells  100k   ftfy {old:6.2f}s  fast path {new:6.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
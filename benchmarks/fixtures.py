@@ -0,0 +1,292 @@
+"""Synthetic, deterministic fixtures for the stage benchmarks.
+
+Every input format the parser benchmarks need is built here from scratch, offline and
+without extra packages: text PDFs (hand-written content streams with prose and ruled
+tables), scanned PDFs and page images (rendered with Pillow, ruled table included),
+DOCX with embedded images and tables, ODT tables, a large CSV and a large HTML page
+with tables. Sizes scale linearly with ``scale``; the same scale and seed always give
+byte-identical files, so cached fixtures are reused across runs.
+
+    python benchmarks/fixtures.py OUT_DIR [--scale 1.0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import random
+import sys
+import zipfile
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image, ImageDraw, ImageFont
+
+from bench_normalize import WORDS
+
+
+SEED = 7
+
+
+def _sentence(rnd: random.Random, lo: int = 6, hi: int = 16) -> str:
+    return " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(lo, hi))).capitalize() + "."
+
+
+def _count(base: int, scale: float) -> int:
+    return max(1, round(base * scale))
+
+
+# --- PDF -------------------------------------------------------------------------------
+
+
+def _pdf_escape(text: str) -> bytes:
+    raw = text.encode("latin-1", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _pdf_document(contents: list[bytes]) -> bytes:
+    """One page per content stream, Helvetica as /F1 (same layout as the tests' builder)."""
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", b"", b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for content in contents:
+        objs.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objs.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R"
+            b" /Resources << /Font << /F1 3 0 R >> >> >>" % len(objs)
+        )
+        kids.append(b"%d 0 R" % len(objs))
+    objs[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+
+def _pdf_prose(rnd: random.Random, top: float, lines: int) -> bytes:
+    parts = [b"BT /F1 10 Tf 12 TL 60 %.1f Td" % top]
+    for _ in range(lines):
+        parts.append(b"(%s) '" % _pdf_escape(_sentence(rnd, 8, 12)))
+    parts.append(b"ET")
+    return b" ".join(parts)
+
+
+def _pdf_table(rnd: random.Random, top: float, rows: int, cols: int) -> bytes:
+    x0, width, height = 60.0, 480.0 / cols, 18.0
+    ops = [b"0.5 w"]
+    for r in range(rows + 1):
+        y = top - r * height
+        ops.append(b"%.1f %.1f m %.1f %.1f l S" % (x0, y, x0 + cols * width, y))
+    for c in range(cols + 1):
+        x = x0 + c * width
+        ops.append(b"%.1f %.1f m %.1f %.1f l S" % (x, top, x, top - rows * height))
+    ops.append(b"BT /F1 9 Tf")
+    for r in range(rows):
+        for c in range(cols):
+            cell = "Item" if r == 0 else (rnd.choice(WORDS) if c == 0 else str(rnd.randint(1, 9999)))
+            ops.append(b"1 0 0 1 %.1f %.1f Tm (%s) Tj" % (x0 + c * width + 4, top - (r + 1) * height + 5, _pdf_escape(cell)))
+    ops.append(b"ET")
+    return b" ".join(ops)
+
+
+def text_pdf(path: Path, scale: float) -> None:
+    """Prose pages; every fourth page also carries a ruled table."""
+    rnd = random.Random(SEED)
+    contents = []
+    for i in range(_count(20, scale)):
+        if i % 4 == 3:
+            contents.append(_pdf_prose(rnd, 740, 20) + b" " + _pdf_table(rnd, 460, 12, 5))
+        else:
+            contents.append(_pdf_prose(rnd, 740, 56))
+    path.write_bytes(_pdf_document(contents))
+
+
+# --- Raster pages ------------------------------------------------------------------------
+
+
+def _font(size: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1: bitmap font only
+        return ImageFont.load_default()
+
+
+def scan_page(rnd: random.Random, width: int = 1654, height: int = 2339) -> Image.Image:
+    """A 200 dpi A4 "scan": prose, then a ruled 10x4 table with a merged header."""
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    font = _font(max(12, width // 60))
+    y = height // 20
+    for _ in range(18):
+        draw.text((width // 12, y), _sentence(rnd, 8, 11), fill=20, font=font)
+        y += width // 40
+    x0, x1 = width // 12, width - width // 12
+    top, row_h, cols = y + width // 30, width // 28, 4
+    col_w = (x1 - x0) // cols
+    for r in range(11):
+        draw.line([(x0, top + r * row_h), (x0 + cols * col_w, top + r * row_h)], fill=0, width=3)
+    for c in range(cols + 1):
+        # The first row is one merged header cell
+        draw.line([(x0 + c * col_w, top + (0 if c in (0, cols) else row_h)), (x0 + c * col_w, top + 10 * row_h)], fill=0, width=3)
+    draw.text((x0 + 12, top + row_h // 4), "Quarterly totals", fill=0, font=font)
+    for r in range(1, 10):
+        for c in range(cols):
+            cell = rnd.choice(WORDS) if c == 0 else str(rnd.randint(10, 99999))
+            draw.text((x0 + c * col_w + 12, top + r * row_h + row_h // 4), cell, fill=0, font=font)
+    return img
+
+
+def scan_png(path: Path, scale: float) -> None:
+    scan_page(random.Random(SEED)).save(path, "PNG")
+
+
+def scanned_pdf(path: Path, scale: float) -> None:
+    """Image-only PDF (no text layer), one scanned page per PDF page."""
+    rnd = random.Random(SEED)
+    pages = [scan_page(rnd).convert("RGB") for _ in range(_count(3, scale))]
+    pages[0].save(path, "PDF", save_all=True, append_images=pages[1:], resolution=200.0)
+
+
+# --- Office formats ----------------------------------------------------------------------
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_ODT_NS = (
+    'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+    'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"'
+)
+
+
+def _w_p(text: str) -> str:
+    return f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+def _w_table(rnd: random.Random, rows: int, cols: int) -> str:
+    head = "".join(f"<w:tc>{_w_p(f'Column {c + 1}')}</w:tc>" for c in range(cols))
+    body = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{_w_p(str(rnd.randint(1, 9999)))}</w:tc>" for _ in range(cols)) + "</w:tr>"
+        for _ in range(rows)
+    )
+    return f"<w:tbl><w:tr><w:trPr><w:tblHeader/></w:trPr>{head}</w:tr>{body}</w:tbl>"
+
+
+def docx_images(path: Path, scale: float) -> None:
+    """Paragraphs, a table every 20 paragraphs and scanned-page images as media parts."""
+    rnd = random.Random(SEED)
+    body: list[str] = []
+    for i in range(_count(600, scale)):
+        body.append(_w_p(_sentence(rnd, 10, 24)))
+        if i % 20 == 19:
+            body.append(_w_table(rnd, 15, 4))
+    images = _count(4, scale)
+    rels = "".join(f'<Relationship Id="rId{i + 1}" Type="{_R}/image" Target="media/image{i + 1}.png"/>' for i in range(images))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("word/document.xml", f'<?xml version="1.0" encoding="UTF-8"?><w:document {_W}><w:body>{"".join(body)}</w:body></w:document>')
+        zf.writestr("word/_rels/document.xml.rels", f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>')
+        for i in range(images):
+            png = io.BytesIO()
+            scan_page(rnd, 1240, 1754).save(png, "PNG")
+            zf.writestr(f"word/media/image{i + 1}.png", png.getvalue())
+
+
+def odt_tables(path: Path, scale: float) -> None:
+    """Headings, prose and 20-row tables with spanned header cells."""
+    rnd = random.Random(SEED)
+    parts: list[str] = []
+    for t in range(_count(200, scale)):
+        parts.append(f'<text:h text:outline-level="2">Section {t + 1}</text:h><text:p>{_sentence(rnd, 20, 40)}</text:p>')
+        rows = "".join(
+            "<table:table-row>"
+            + "".join(f"<table:table-cell><text:p>{rnd.choice(WORDS) if c == 0 else rnd.randint(1, 9999)}</text:p></table:table-cell>" for c in range(4))
+            + "</table:table-row>"
+            for _ in range(20)
+        )
+        parts.append(
+            "<table:table><table:table-header-rows><table:table-row>"
+            '<table:table-cell table:number-columns-spanned="2"><text:p>Region</text:p></table:table-cell><table:covered-table-cell/>'
+            "<table:table-cell><text:p>Q1</text:p></table:table-cell><table:table-cell><text:p>Q2</text:p></table:table-cell>"
+            f"</table:table-row></table:table-header-rows>{rows}</table:table>"
+        )
+    content = f'<?xml version="1.0" encoding="UTF-8"?><office:document-content {_ODT_NS}><office:body><office:text>{"".join(parts)}</office:text></office:body></office:document-content>'
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("mimetype", "application/vnd.oasis.opendocument.text")
+        zf.writestr("content.xml", content)
+
+
+# --- Text formats ------------------------------------------------------------------------
+
+
+def csv_large(path: Path, scale: float) -> None:
+    """About 10 MB of mixed-type rows with a header, some fields quoted."""
+    rnd = random.Random(SEED)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        f.write("id,date,name,amount,active,comment\n")
+        for i in range(_count(150_000, scale)):
+            comment = _sentence(rnd, 2, 6)
+            if i % 10 == 0:
+                comment = f'"{comment}, with a comma"'
+            f.write(f"{i},2024-{i % 12 + 1:02d}-{i % 28 + 1:02d},{rnd.choice(WORDS)},{rnd.randint(1, 99999) / 100:.2f},{'yes' if i % 3 else 'no'},{comment}\n")
+
+
+def html_large(path: Path, scale: float) -> None:
+    """About 5 MB of paragraphs with a spanned table every 25 paragraphs."""
+    rnd = random.Random(SEED)
+    with path.open("w", encoding="utf-8") as f:
+        f.write("<!DOCTYPE html><html><head><title>Report</title><style>td{padding:2px}</style></head><body>\n")
+        for i in range(_count(30_000, scale)):
+            f.write(f"<p>{_sentence(rnd, 12, 30)}</p>\n")
+            if i % 25 == 24:
+                rows = "".join(
+                    f"<tr><td>{rnd.choice(WORDS)}</td><td>{rnd.randint(1, 999)}</td><td>{rnd.randint(1, 999)}</td></tr>"
+                    for _ in range(10)
+                )
+                f.write(f'<table><tr><th colspan="3">Block {i // 25}</th></tr>{rows}</table>\n')
+        f.write("</body></html>\n")
+
+
+FIXTURES: dict[str, tuple[str, Callable[[Path, float], None]]] = {
+    "text_pdf": ("text.pdf", text_pdf),
+    "scanned_pdf": ("scanned.pdf", scanned_pdf),
+    "scan_png": ("scan.png", scan_png),
+    "docx_images": ("images.docx", docx_images),
+    "odt_tables": ("tables.odt", odt_tables),
+    "csv_large": ("large.csv", csv_large),
+    "html_large": ("large.html", html_large),
+}
+
+
+def generate(out_dir: Path, scale: float = 1.0, names: list[str] | None = None) -> dict[str, Path]:
+    """Build the fixtures missing from ``out_dir`` (one subdirectory per scale)."""
+    target = out_dir / f"scale-{scale:g}"
+    target.mkdir(parents=True, exist_ok=True)
+    paths: dict[str, Path] = {}
+    for name, (filename, build) in FIXTURES.items():
+        if names is not None and name not in names:
+            continue
+        path = target / filename
+        if not path.exists():
+            tmp = path.with_name(path.name + ".tmp")
+            build(tmp, scale)
+            tmp.replace(path)
+        paths[name] = path
+    return paths
+
+
+def main(args: list[str]) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("out_dir", type=Path)
+    ap.add_argument("--scale", type=float, default=1.0)
+    ns = ap.parse_args(args)
+    for name, path in generate(ns.out_dir, ns.scale).items():
+        print(f"{name:12} {path.stat().st_size / 1024:10.0f} KiB  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
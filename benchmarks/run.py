@@ -0,0 +1,385 @@
+"""Per-stage benchmarks with baseline regression gating.
+
+Times each stage function on the synthetic fixtures from ``fixtures.py`` and the whole
+``parse_document_to_text`` per format, together with the stage timings the parser
+itself reports in ``timings_ms`` (recorded as ``<case>/parse:<key>``). Every stage runs
+once to warm up, then ``--repeat`` times and for at least ``--min-time`` seconds; the
+minimum is kept, as the figure least disturbed by other load on the box. A stage that
+looks regressed is measured again, twice as long, before it can fail the run.
+
+Results are compared with ``baselines.json``. A stage regresses when it is slower than
+its baseline by more than ``--threshold`` (relative) and ``--min-delta-ms`` (absolute).
+Baselines should be recorded where the gate runs. Machine speed still drifts between
+runs (shared or throttled CPUs move every stage by tens of percent together), so by
+default (``--speed calibration``) baselines are first scaled by the ratio of the runs'
+times for a fixed CPU workload, which moves with the machine but not with the code.
+``--speed drift`` (opt-in) scales by the median current/baseline ratio over all stages
+instead, so a stage fails when it slowed down relative to the rest of the suite; as
+that would also divide out a regression shared by every stage, the run fails when the
+drift itself exceeds ``1 + --threshold``. ``--speed none`` compares raw times. The exit
+status is 1 when a stage (or, with drift, the whole suite) regressed.
+
+Everything runs offline on a CPU. Stages whose time includes OCR need ``tesseract``
+(and ``pdftoppm`` for scanned PDFs); without them they are reported as skipped.
+
+    python benchmarks/run.py                      # compare against baselines.json
+    python benchmarks/run.py --update             # record new baselines
+    python benchmarks/run.py --cases csv_large,html_large --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import json
+import platform
+import shutil
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from bench_normalize import SRC, make_text  # noqa: F401  (puts src/ on sys.path)
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from fixtures import generate  # noqa: E402
+from nc_parser.core.logging import setup_structlog  # noqa: E402
+from nc_parser.processing import parser  # noqa: E402
+from nc_parser.processing.chunker import chunk_pages  # noqa: E402
+from nc_parser.processing.csv_stream import read_csv  # noqa: E402
+from nc_parser.processing.docx_package import DocxPackage  # noqa: E402
+from nc_parser.processing.fields import extract_fields  # noqa: E402
+from nc_parser.processing.html_extract import extract_html_file  # noqa: E402
+from nc_parser.processing.lattice import detect_tables  # noqa: E402
+from nc_parser.processing.normalize import fix_text, normalize_text  # noqa: E402
+from nc_parser.processing.odt import read_odt  # noqa: E402
+from nc_parser.processing.pdf_tables import extract_pdf_tables, probe_pdf  # noqa: E402
+
+
+HERE = Path(__file__).resolve().parent
+BASELINES = HERE / "baselines.json"
+FIXTURES_DIR = HERE / ".fixtures"
+# Prose for the text-only stages (normalize, fields, chunking), in MB
+PROSE_MB = 2.0
+MAX_ITERATIONS = 100
+# Fewer comparable stages than this (e.g. a --cases subset) make the median meaningless
+MIN_DRIFT_STAGES = 5
+_OCR = ("tesseract",)
+
+
+@dataclass(frozen=True)
+class Stage:
+    case: str  # fixture name, or "prose" for generated text
+    name: str
+    run: Callable[[Any], Any]
+    prepare: Callable[[Path], Any] = lambda path: path  # untimed input preparation
+    requires: tuple[str, ...] = ()  # external programs the timed work needs
+
+
+def _gray(path: Path) -> np.ndarray:
+    return np.array(Image.open(path).convert("L"))
+
+
+def _docx_body(path: Path) -> Any:
+    with DocxPackage(path) as pkg:
+        return pkg.body()
+
+
+def _docx_images_ocr(path: Path) -> Any:
+    with DocxPackage(path) as pkg:
+        return parser._extract_docx_images_ocr(pkg)
+
+
+def _prose_pages(text: str) -> list[dict[str, Any]]:
+    return [{"index": i, "text": text[i::20]} for i in range(20)]
+
+
+STAGES: list[Stage] = [
+    Stage("text_pdf", "pdf_text_layer", parser._pdf_has_text_layer),
+    Stage("text_pdf", "pdf_text_hybrid", parser._read_pdf_text_hybrid),
+    Stage("text_pdf", "pdf_probe", probe_pdf),
+    Stage("text_pdf", "pdf_tables", extract_pdf_tables),
+    Stage("scanned_pdf", "pdf_probe", probe_pdf),
+    Stage("scanned_pdf", "pdf_ocr_pages", parser._ocr_pdf_pages_to_text, requires=_OCR + ("pdftoppm",)),
+    Stage("scan_png", "lattice_detect", detect_tables, prepare=_gray),
+    Stage("scan_png", "image_ocr", parser._read_image_text, requires=_OCR),
+    Stage("docx_images", "docx_body", _docx_body),
+    Stage("docx_images", "docx_images_ocr", _docx_images_ocr, requires=_OCR),
+    Stage("odt_tables", "read_odt", read_odt),
+    Stage("csv_large", "read_csv", lambda p: read_csv(p, html_max_rows=2000, text_max_chars=64 * 1024 * 1024)),
+    Stage("html_large", "extract_html", extract_html_file),
+    Stage("prose", "normalize_text", normalize_text),
+    Stage("prose", "fix_text", fix_text),
+    Stage("prose", "extract_fields", extract_fields),
+    Stage("prose", "chunk_pages", lambda pages: list(chunk_pages(pages)), prepare=_prose_pages),
+]
+# Whole-document parses; image-bearing formats spend most of their time in OCR
+PARSE_REQUIRES: dict[str, tuple[str, ...]] = {
+    "scanned_pdf": _OCR + ("pdftoppm",),
+    "scan_png": _OCR,
+    "docx_images": _OCR,
+}
+
+
+def missing_tools(requires: tuple[str, ...]) -> list[str]:
+    return [tool for tool in requires if shutil.which(tool) is None]
+
+
+Job = Callable[[], dict[str, float]]  # one timed iteration: ms per result key
+
+
+def _timed(run: Callable[[Any], Any], arg: Any, key: str) -> Job:
+    def job() -> dict[str, float]:
+        t0 = time.perf_counter()
+        run(arg)
+        return {key: (time.perf_counter() - t0) * 1000}
+
+    return job
+
+
+def _timed_parse(path: Path, key: str) -> Job:
+    def job() -> dict[str, float]:
+        t0 = time.perf_counter()
+        doc = parser.parse_document_to_text(path)
+        out = {key: (time.perf_counter() - t0) * 1000}
+        out.update((f"{key}:{name}", ms) for name, ms in (doc.timings_ms or {}).items())
+        return out
+
+    return job
+
+
+def measure(job: Job, repeat: int, warmup: int = 1, min_time_s: float = 0.0) -> dict[str, list[float]]:
+    """Times (ms) per key over ``repeat`` iterations after ``warmup``, continuing (up to
+    ``MAX_ITERATIONS``) until the iterations took ``min_time_s`` in total, so that fast
+    stages get enough samples for a stable minimum.
+
+    As in ``timeit``, the cyclic garbage collector is off while an iteration runs, so a
+    collection triggered by an earlier stage's garbage is not billed to this one.
+    """
+    for _ in range(warmup):
+        job()
+    times: dict[str, list[float]] = {}
+    started = time.perf_counter()
+    done = 0
+    while done < repeat or (time.perf_counter() - started < min_time_s and done < MAX_ITERATIONS):
+        done += 1
+        gc.collect()
+        gc.disable()
+        try:
+            sample = job()
+        finally:
+            gc.enable()
+        for key, ms in sample.items():
+            times.setdefault(key, []).append(ms)
+    return times
+
+
+def _calibration_job() -> dict[str, float]:
+    data = bytes(range(256)) * 4096 * 8
+    t0 = time.perf_counter()
+    total = 0
+    for i in range(1_000_000):
+        total += i * i % 7
+    hashlib.sha256(data * 4).digest()
+    return {"calibration": (time.perf_counter() - t0) * 1000}
+
+
+def calibrate() -> float:
+    """ms for a fixed mix of interpreter and hashing work (about 0.1 s); best of ten."""
+    return min(measure(_calibration_job, 10)["calibration"])
+
+
+def build_jobs(fixtures: dict[str, Path], cases: Optional[set[str]]) -> tuple[list[Job], dict[str, str]]:
+    """Timed jobs for the selected cases, and the stages skipped for missing programs."""
+    jobs: list[Job] = []
+    skipped: dict[str, str] = {}
+    prose: Optional[str] = None
+    for stage in STAGES:
+        if cases is not None and stage.case not in cases:
+            continue
+        key = f"{stage.case}/{stage.name}"
+        missing = missing_tools(stage.requires)
+        if missing:
+            skipped[key] = "missing " + ", ".join(missing)
+            continue
+        if stage.case in fixtures:
+            source: Any = fixtures[stage.case]
+        else:
+            prose = prose if prose is not None else make_text(PROSE_MB, noise=True)
+            source = prose
+        jobs.append(_timed(stage.run, stage.prepare(source), key))
+    for case, path in fixtures.items():
+        if cases is not None and case not in cases:
+            continue
+        missing = missing_tools(PARSE_REQUIRES.get(case, ()))
+        if missing:
+            skipped[f"{case}/parse"] = "missing " + ", ".join(missing)
+            continue
+        jobs.append(_timed_parse(path, f"{case}/parse"))
+    return jobs, skipped
+
+
+def summarize(times: dict[str, list[float]]) -> dict[str, dict[str, float]]:
+    return {
+        key: {"min_ms": round(min(values), 3), "median_ms": round(statistics.median(values), 3)}
+        for key, values in times.items()
+    }
+
+
+def speed_factor(
+    current: dict[str, dict[str, float]], baseline: dict[str, Any], mode: str, calibration: float
+) -> float:
+    """Factor applied to baseline times before comparing (see the module docstring)."""
+    if mode == "calibration":
+        return calibration / baseline["meta"]["calibration_ms"]
+    if mode == "drift":
+        ratios = [
+            current[k]["min_ms"] / v["min_ms"]
+            for k, v in baseline["stages"].items()
+            if k in current and v["min_ms"] > 0
+        ]
+        if len(ratios) >= MIN_DRIFT_STAGES:
+            return statistics.median(ratios)
+    return 1.0
+
+
+def compare(
+    current: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    speed: float,
+    threshold: float,
+    min_delta_ms: float,
+) -> list[dict[str, Any]]:
+    """One row per stage; ``speed`` scales baseline times to this machine."""
+    rows = []
+    for key in sorted(set(current) | set(baseline)):
+        cur = current.get(key, {}).get("min_ms")
+        base = baseline.get(key, {}).get("min_ms")
+        row: dict[str, Any] = {"stage": key, "current_ms": cur, "baseline_ms": None, "ratio": None}
+        if cur is None:
+            row["status"] = "not run"
+        elif base is None:
+            row["status"] = "new"
+        else:
+            expected = base * speed
+            row["baseline_ms"] = round(expected, 3)
+            row["ratio"] = round(cur / expected, 3) if expected else None
+            regressed = cur > expected * (1 + threshold) and cur - expected > min_delta_ms
+            row["status"] = "REGRESSED" if regressed else "ok"
+        rows.append(row)
+    return rows
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:10.1f}" if value is not None else f"{'-':>10}"
+
+
+def print_table(rows: list[dict[str, Any]], skipped: dict[str, str]) -> None:
+    print(f"{'stage':44} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for row in rows:
+        ratio = f"{row['ratio']:7.2f}" if row["ratio"] is not None else f"{'-':>7}"
+        status = row["status"]
+        if row["stage"] in skipped:
+            status = f"skipped ({skipped[row['stage']]})"
+        print(f"{row['stage']:44} {_fmt(row['baseline_ms'])} {_fmt(row['current_ms'])} {ratio}  {status}")
+    for key, why in sorted(skipped.items()):
+        if not any(r["stage"] == key for r in rows):
+            print(f"{key:44} {'-':>10} {'-':>10} {'-':>7}  skipped ({why})")
+
+
+def main(args: list[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--baseline", type=Path, default=BASELINES)
+    ap.add_argument("--update", action="store_true", help="write this run as the new baseline")
+    ap.add_argument("--cases", help="comma-separated fixture names (prose for the text stages)")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--min-time", type=float, default=2.0, help="keep repeating a stage for at least this many seconds")
+    ap.add_argument("--scale", type=float, default=1.0, help="fixture size factor")
+    ap.add_argument("--threshold", type=float, default=0.5, help="allowed relative slowdown (after --speed scaling)")
+    ap.add_argument("--min-delta-ms", type=float, default=10.0, help="ignore slowdowns smaller than this")
+    ap.add_argument("--speed", choices=("calibration", "drift", "none"), default="calibration", help="how baselines are scaled to this run")
+    ap.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    ap.add_argument("--json", type=Path, help="also write this run's results here")
+    ns = ap.parse_args(args)
+    setup_structlog("WARNING")
+
+    cases = set(ns.cases.split(",")) if ns.cases else None
+    fixtures = generate(ns.fixtures, ns.scale, sorted(cases) if cases else None)
+    jobs, skipped = build_jobs(fixtures, cases)
+    calibration = calibrate()
+    times: dict[str, list[float]] = {}
+    per_job: list[set[str]] = []
+    for job in jobs:
+        job_times = measure(job, max(1, ns.repeat), min_time_s=ns.min_time)
+        per_job.append(set(job_times))
+        times.update(job_times)
+    # Measured again at the end: the lower figure is the machine with the least interference
+    calibration = min(calibration, calibrate())
+    results = summarize(times)
+    run = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "scale": ns.scale,
+            "repeat": ns.repeat,
+            "calibration_ms": round(calibration, 3),
+            "tools": {tool: shutil.which(tool) is not None for tool in ("tesseract", "pdftoppm")},
+        },
+        "stages": results,
+    }
+    if ns.json:
+        ns.json.write_text(json.dumps(run, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    if ns.update:
+        ns.baseline.write_text(json.dumps(run, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print_table(compare(results, {}, 1.0, ns.threshold, ns.min_delta_ms), skipped)
+        print(f"baseline written to {ns.baseline}")
+        return 0
+
+    if not ns.baseline.exists():
+        print(f"no baseline at {ns.baseline}; run with --update first", file=sys.stderr)
+        return 2
+    baseline = json.loads(ns.baseline.read_text(encoding="utf-8"))
+    if baseline["meta"]["scale"] != ns.scale:
+        print(f"baseline was recorded at --scale {baseline['meta']['scale']}", file=sys.stderr)
+        return 2
+    base_stages = baseline["stages"]
+    if cases is not None:
+        base_stages = {k: v for k, v in base_stages.items() if k.split("/", 1)[0] in cases}
+        baseline = {**baseline, "stages": base_stages}
+    speed = speed_factor(results, baseline, ns.speed, calibration)
+    rows = compare(results, base_stages, speed, ns.threshold, ns.min_delta_ms)
+    suspects = {r["stage"] for r in rows if r["status"] == "REGRESSED"}
+    if suspects:
+        # A slowdown must survive a second, longer measurement before it fails the run
+        for job, keys in zip(jobs, per_job):
+            if keys & suspects:
+                for key, values in measure(job, 2 * max(1, ns.repeat), warmup=0, min_time_s=2 * ns.min_time).items():
+                    times[key].extend(values)
+        results = summarize(times)
+        speed = speed_factor(results, baseline, ns.speed, calibration)
+        rows = compare(results, base_stages, speed, ns.threshold, ns.min_delta_ms)
+    print(f"baselines scaled by {speed:.2f} ({ns.speed}); calibration {calibration:.1f} ms, "
+          f"baseline {baseline['meta']['calibration_ms']:.1f} ms")
+    print_table(rows, skipped)
+    status = 0
+    if speed > 1 + ns.threshold:
+        if ns.speed == "drift":
+            print(f"the whole suite ran {speed:.2f}x slower than the baseline, beyond {ns.threshold:.0%}; "
+                  "rerun with --speed calibration to tell machine load from a shared regression", file=sys.stderr)
+            status = 1
+        else:
+            print(f"note: the calibration workload ran {speed:.2f}x slower than at the baseline (machine load)")
+    regressed = [r["stage"] for r in rows if r["status"] == "REGRESSED"]
+    if regressed:
+        print(f"{len(regressed)} stage(s) regressed beyond {ns.threshold:.0%}: {', '.join(regressed)}", file=sys.stderr)
+        status = 1
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -25,7 +25,16 @@ function Get-Targets {
   foreach ($sd in $Subdirs) {
     $path = Join-Path $Root $sd
     if (-not (Test-Path $path)) { continue }
-    $dirs = Get-ChildItem -Path $path -Directory -ErrorAction SilentlyContinue
+    # Jobs live in <kind>/ab/cd/<id> (or flat <kind>/<id> before migration); age is per job
+    $dirs = @()
+    foreach ($d in (Get-ChildItem -Path $path -Directory -ErrorAction SilentlyContinue)) {
+      if ($d.Name -match '^[0-9a-f]{2}$') {
+        $dirs += Get-ChildItem -Path $d.FullName -Directory -ErrorAction SilentlyContinue |
+          ForEach-Object { Get-ChildItem -Path $_.FullName -Directory -ErrorAction SilentlyContinue }
+      } else {
+        $dirs += $d
+      }
+    }
     if ($AgeDays -ge 0) {
       $cutoff = (Get-Date).AddDays(-$AgeDays)
       $dirs = $dirs | Where-Object { $_.LastWriteTime -lt $cutoff }
@@ -0,0 +1,38 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Local package path
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from nc_parser.storage.layout import migrate_flat_layout  # noqa: E402
+
+
+def main(args: list[str]) -> int:
+    """Move jobs from data/<kind>/<id> to data/<kind>/ab/cd/<id> while the service runs.
+
+    Safe to re-run; uses NC_DATA_DIR like the service. Once a pass reports nothing moved,
+    skipped or conflicting, set NC_DATA_LAYOUT_COMPAT=false.
+    """
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("--dry-run", action="store_true", help="count what would move")
+    ap.add_argument("--limit", type=int, default=None, help="stop after this many moves per pass")
+    ap.add_argument("--min-age-s", type=float, default=3600.0, help="leave unfinished jobs younger than this")
+    ap.add_argument("--loop", action="store_true", help="repeat passes until nothing is left to move")
+    ns = ap.parse_args(args)
+    while True:
+        t0 = time.time()
+        report = migrate_flat_layout(dry_run=ns.dry_run, limit=ns.limit, min_age_s=ns.min_age_s)
+        report["seconds"] = round(time.time() - t0, 2)
+        print(json.dumps(report))
+        if not ns.loop or ns.dry_run or report["moved"] == 0:
+            return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,98 @@
+"""HTTP caching helpers for immutable result responses.
+
+Results never change once written, so every response derived from one is keyed by
+the stored result's digest: together with the variant and the content coding (each
+coding is a different byte sequence) it becomes the strong ETag (``If-None-Match`` ->
+304), and encoded bodies are kept in a byte-bounded in-process LRU.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+try:
+    import zstandard  # type: ignore
+except Exception:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+
+class ByteLRU:
+    """LRU cache bounded by the total size of its byte values."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self._items: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._items[key] = value
+        self._size += len(value)
+        while self._size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= len(evicted)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def accepted_encodings(header: Optional[str]) -> set[str]:
+    """Codings from an Accept-Encoding header, excluding those with q=0."""
+    out: set[str] = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = params.strip()
+        if q.startswith("q=") and q[2:].strip() in {"0", "0.0", "0.00", "0.000"}:
+            continue
+        out.add(name)
+    return out
+
+
+def choose_encoding(accepted: set[str]) -> Optional[str]:
+    if "zstd" in accepted and zstandard is not None:
+        return "zstd"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def encode_body(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)  # type: ignore[union-attr]
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+
+def make_etag(digest: str, variant: str = "", encoding: Optional[str] = None) -> str:
+    """Strong ETag of one representation: the result, the variant and the content coding."""
+    tag = digest
+    if variant:
+        tag += f";v={hashlib.sha256(variant.encode('utf-8')).hexdigest()[:16]}"
+    if encoding:
+        tag += f";e={encoding}"
+    return f'"{tag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
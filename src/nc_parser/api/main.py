@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 
 from fastapi import FastAPI
 
+from nc_parser.api.routes.batch import router as batch_router
+from nc_parser.api.routes.events import router as events_router
 from nc_parser.api.routes.health import router as health_router
+from nc_parser.api.routes.results import router as results_router
+from nc_parser.api.routes.search import router as search_router
 from nc_parser.api.routes.upload import router as upload_router
+from nc_parser.api.status_events import close_subscriber
 from nc_parser.core.logging import setup_structlog
 from nc_parser.core.settings import get_settings
-from nc_parser.core.metrics import metrics_endpoint, metrics_middleware
+from nc_parser.core.metrics import metrics_endpoint, metrics_middleware, monitor_event_loop_lag
+from nc_parser.processing.fields import get_field_engine
 
 
 def create_app() -> FastAPI:
@@ -23,11 +31,33 @@ def create_app() -> FastAPI:
     @app.on_event("startup")
     def _on_startup() -> None:  # noqa: D401
         settings.ensure_data_dirs()
+        # Fail at startup on an invalid NC_FIELD_TEMPLATES_DIR rather than on the first parse
+        get_field_engine()
         logging.getLogger(__name__).info("App started", extra={"data_dir": str(settings.data_dir)})
 
+    @app.on_event("startup")
+    async def _start_loop_lag_monitor() -> None:
+        app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag(settings.event_loop_lag_interval_s))
+
+    @app.on_event("shutdown")
+    async def _stop_loop_lag_monitor() -> None:
+        task = getattr(app.state, "loop_lag_task", None)
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    @app.on_event("shutdown")
+    async def _close_status_subscriber() -> None:
+        await close_subscriber()
+
     # Routers
     app.include_router(health_router)
     app.include_router(upload_router)
+    app.include_router(results_router)
+    app.include_router(events_router)
+    app.include_router(batch_router)
+    app.include_router(search_router)
 
     return app
 
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import itertools
+import logging
+from typing import Any, BinaryIO, Iterable, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Body, File, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import aio
+from nc_parser.storage import batches
+from nc_parser.worker.app import celery_app
+
+
+router = APIRouter()
+
+
+class _EnqueueError(RuntimeError):
+    """The batch was stored but the broker publish failed."""
+
+
+def _create_and_enqueue(files: list[UploadFile], archive: Optional[UploadFile]) -> dict[str, Any]:
+    # Runs on the storage pool: stores every member, then a single broker publish for the batch
+    sources: Iterable[tuple[BinaryIO, Optional[str]]] = [(f.file, f.filename) for f in files]
+    if archive is not None:
+        # Lazily: each zip member is streamed to disk while the archive is still open
+        sources = itertools.chain(sources, batches.iter_archive(archive.file))
+    record = batches.create_batch(sources)
+    try:
+        celery_app.send_task(
+            "nc_parser.process_batch",
+            args=[record["batch_id"], [m["file_id"] for m in record["files"]]],
+            task_id=record["celery_task_id"],
+        )
+    except Exception as exc:
+        # Nothing will ever process the members: do not leave them "queued" forever
+        logging.getLogger(__name__).exception("Batch enqueue failed", extra={"batch_id": record["batch_id"]})
+        batches.fail_batch(record, "batch could not be queued")
+        raise _EnqueueError(record["batch_id"]) from exc
+    return record
+
+
+@router.post("/batch")
+async def create_batch(
+    files: list[UploadFile] = File(default=[]),
+    archive: UploadFile | None = File(default=None),
+) -> JSONResponse:
+    if not files and archive is None:
+        raise HTTPException(status_code=400, detail="files or archive must be provided")
+    try:
+        record = await aio.run_blocking(_create_and_enqueue, files, archive)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except _EnqueueError as exc:
+        raise HTTPException(status_code=503, detail=f"Batch {exc} could not be queued; its files are marked failed")
+    return JSONResponse({"batch_id": record["batch_id"], "status": "queued", "files": record["files"]})
+
+
+@router.get("/batch/{batch_id}")
+async def batch_status(batch_id: UUID) -> JSONResponse:
+    try:
+        return JSONResponse(await aio.read_batch_status(batch_id))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Unknown batch_id")
+
+
+@router.post("/status/bulk")
+async def status_bulk(payload: dict = Body(...)) -> JSONResponse:
+    raw_ids = payload.get("file_ids")
+    if not isinstance(raw_ids, list) or not raw_ids:
+        raise HTTPException(status_code=400, detail="file_ids must be a non-empty list")
+    limit = get_settings().status_bulk_max_ids
+    if len(raw_ids) > limit:
+        raise HTTPException(status_code=400, detail=f"at most {limit} file_ids per request")
+    try:
+        file_ids = [UUID(str(v)) for v in raw_ids]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="file_ids must be UUIDs")
+    return JSONResponse({"statuses": await aio.read_job_statuses(file_ids)})
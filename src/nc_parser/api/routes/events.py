@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import json
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from nc_parser.api.status_events import status_updates
+from nc_parser.core.settings import get_settings
+
+
+router = APIRouter()
+
+
+async def _sse(file_ids: list[UUID]) -> AsyncIterator[str]:
+    keepalive = get_settings().status_sse_keepalive_s
+    async for st in status_updates(file_ids, keepalive=keepalive):
+        if not st:
+            yield ": keepalive\n\n"
+            continue
+        yield f"event: status\ndata: {json.dumps(st, ensure_ascii=False)}\n\n"
+    yield "event: end\ndata: {}\n\n"
+
+
+def _sse_response(file_ids: list[UUID]) -> StreamingResponse:
+    return StreamingResponse(
+        _sse(file_ids),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/status/{file_id}/events")
+async def status_events(file_id: UUID) -> StreamingResponse:
+    return _sse_response([file_id])
+
+
+@router.get("/events")
+async def batch_status_events(file_ids: Optional[str] = Query(default=None)) -> StreamingResponse:
+    try:
+        ids = [UUID(x.strip()) for x in (file_ids or "").split(",") if x.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="file_ids must be comma-separated UUIDs")
+    if not ids:
+        raise HTTPException(status_code=400, detail="file_ids is required")
+    if len(ids) > get_settings().status_sse_max_ids:
+        raise HTTPException(status_code=400, detail="too many file_ids")
+    return _sse_response(ids)
@@ -12,12 +12,12 @@ router = APIRouter()
 
 
 @router.get("/healthz")
-def healthz() -> dict[str, str]:
+async def healthz() -> dict[str, str]:
     return {"status": "ok"}
 
 
 @router.get("/version")
-def version() -> dict[str, str | None]:
+async def version() -> dict[str, str | None]:
     settings = get_settings()
     build_time = settings.build_time or datetime.now(timezone.utc).isoformat()
     return {
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Callable, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+
+from nc_parser.api.http_cache import (
+    ByteLRU,
+    accepted_encodings,
+    choose_encoding,
+    encode_body,
+    etag_matches,
+    make_etag,
+)
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import aio
+from nc_parser.storage import files as storage
+from nc_parser.storage.results import dumps
+
+
+router = APIRouter()
+
+_PAGES_RE = re.compile(r"^(\d+)(?:-(\d*))?$")
+
+
+def _split_csv(value: Optional[str]) -> list[str]:
+    return [x.strip() for x in (value or "").split(",") if x.strip()]
+
+
+def _parse_pages(value: str, page_count: int) -> list[int]:
+    """Parse ``10-20``, ``5``, ``1-3,7`` or open-ended ``10-`` into page positions."""
+    positions: list[int] = []
+    for part in _split_csv(value):
+        m = _PAGES_RE.match(part)
+        if not m:
+            raise ValueError("pages must look like 10-20, 5 or 1-3,7")
+        start = int(m.group(1))
+        if m.group(2) is None:
+            end = start
+        else:
+            end = int(m.group(2)) if m.group(2) else page_count - 1
+        if end < start:
+            raise ValueError("pages range end precedes start")
+        positions.extend(range(start, min(end, page_count - 1) + 1))
+    return list(dict.fromkeys(positions))
+
+
+def _promote_caption(data: dict[str, Any]) -> None:
+    try:
+        pm = data.get("processing_metrics") or {}
+        caption_metrics = pm.get("caption")
+        if caption_metrics and not data.get("caption"):
+            data["caption"] = caption_metrics
+    except Exception:
+        pass
+
+
+def _filter_elements(pages: list[dict[str, Any]], element_types: list[str]) -> list[dict[str, Any]]:
+    wanted = set(element_types)
+    out: list[dict[str, Any]] = []
+    for page in pages:
+        elements = [el for el in page.get("elements") or [] if el.get("type") in wanted]
+        if elements:
+            out.append({**page, "elements": elements})
+    return out
+
+
+def _build_result(
+    file_id: UUID, fields: list[str], pages: Optional[str], elements: list[str]
+) -> dict[str, Any]:
+    """Blocking: read only the parts of the stored result the query asks for."""
+    if not fields and pages is None and not elements:
+        data = storage.read_result(file_id)
+        # Legacy results were stored before caption metrics were promoted at write time
+        _promote_caption(data)
+        return data
+    header = storage.read_result_header(file_id)
+    _promote_caption(header)
+    page_count = int(header.pop("page_count", 0))
+    want_pages = not fields or "pages" in fields or pages is not None or bool(elements)
+    data: dict[str, Any] = {"document_id": header.get("document_id", str(file_id))}
+    for key, value in header.items():
+        if not fields or key in fields:
+            data[key] = value
+    if want_pages:
+        positions = _parse_pages(pages, page_count) if pages is not None else list(range(page_count))
+        selected = storage.read_result_pages(file_id, positions)
+        data["pages"] = _filter_elements(selected, elements) if elements else selected
+        data["page_count"] = page_count
+    return data
+
+
+_body_cache: Optional[ByteLRU] = None
+
+
+def _cache() -> ByteLRU:
+    global _body_cache
+    if _body_cache is None:
+        _body_cache = ByteLRU(get_settings().result_cache_max_mb * 1024 * 1024)
+    return _body_cache
+
+
+def _encoded(build: Callable[[], Any], encoding: Optional[str]) -> bytes:
+    return encode_body(dumps(build()), encoding)
+
+
+async def _serve(request: Request, file_id: UUID, variant: str, build: Callable[[], Any]) -> Response:
+    """Serve a response derived from the stored result with ETag, compression and caching."""
+    try:
+        index = await aio.run_blocking(storage.read_result_index, file_id)
+        digest = index["digest"] if index else await aio.run_blocking(storage.result_digest, file_id)
+    except FileNotFoundError:
+        return Response(status_code=202)
+    accepted = accepted_encodings(request.headers.get("accept-encoding"))
+    # The stored file is the complete document in an encoding the client accepts
+    stored = not variant and index is not None and index.get("version", 1) >= 2 and index["codec"] in accepted
+    encoding = index["codec"] if stored and index is not None else choose_encoding(accepted)
+    etag = make_etag(digest, variant, encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={get_settings().result_http_max_age_s}",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if stored and index is not None:
+        headers = {**headers, "Content-Encoding": index["codec"]}
+        path = storage.result_data_path(file_id, index)
+        if path is not None:
+            return FileResponse(path, media_type="application/json", headers=headers)
+        raw = await aio.run_blocking(storage.read_result_data, file_id, index)
+        return Response(content=raw, media_type="application/json", headers=headers)
+    key = (str(file_id), digest, variant, encoding)
+    body = _cache().get(key)
+    if body is None:
+        try:
+            body = await aio.run_blocking(_encoded, build, encoding)
+        except FileNotFoundError:
+            return Response(status_code=202)
+        _cache().put(key, body)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/result/{file_id}")
+async def result(
+    request: Request,
+    file_id: UUID,
+    fields: Optional[str] = Query(default=None, description="Comma-separated top-level fields"),
+    pages: Optional[str] = Query(default=None, description="Page positions, e.g. 10-20 or 1-3,7"),
+    elements: Optional[str] = Query(default=None, description="Comma-separated element types"),
+) -> Response:
+    field_list, element_list = _split_csv(fields), _split_csv(elements)
+    variant = "" if not (field_list or pages is not None or element_list) else (
+        f"fields={','.join(field_list)}&pages={pages or ''}&elements={','.join(element_list)}"
+    )
+    try:
+        return await _serve(request, file_id, variant, lambda: _build_result(file_id, field_list, pages, element_list))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/result/{file_id}/pages/{position}")
+async def result_page(request: Request, file_id: UUID, position: int) -> Response:
+    try:
+        return await _serve(request, file_id, f"page={position}", lambda: storage.read_result_page(file_id, position))
+    except IndexError:
+        raise HTTPException(status_code=404, detail="Page not found")
+
+
+def _collect_tables(file_id: UUID) -> dict[str, Any]:
+    header = storage.read_result_header(file_id)
+    pages = storage.read_result_pages(file_id, list(range(int(header.get("page_count", 0)))))
+    tables = [
+        {"page": pos, "html": el.get("description", "")}
+        for pos, page in enumerate(pages)
+        for el in page.get("elements") or []
+        if el.get("type") == "table_html"
+    ]
+    return {"document_id": header.get("document_id", str(file_id)), "tables": tables}
+
+
+@router.get("/result/{file_id}/tables")
+async def result_tables(request: Request, file_id: UUID) -> Response:
+    return await _serve(request, file_id, "tables", lambda: _collect_tables(file_id))
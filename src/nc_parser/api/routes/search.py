@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import aio, search_index
+
+
+router = APIRouter()
+
+
+@router.get("/search")
+async def search(
+    q: str = Query(..., min_length=1, description="Words that must all appear"),
+    limit: int = Query(default=20, ge=1),
+    offset: int = Query(default=0, ge=0),
+    field: Optional[str] = Query(default=None, description="Only match this extracted key field, e.g. passport_no"),
+) -> JSONResponse:
+    if not search_index.enabled():
+        raise HTTPException(status_code=404, detail="Search index is disabled")
+    limit = min(limit, max(1, get_settings().search_max_limit))
+    return JSONResponse(await aio.run_blocking(search_index.search, q, limit=limit, offset=offset, field=field))
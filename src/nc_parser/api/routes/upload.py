@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import errno
 from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile, Request
 from fastapi.responses import JSONResponse, Response
 
+from nc_parser.api.status_events import is_final, parse_wait, status_updates
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import aio
 from nc_parser.storage import files as storage
 from nc_parser.worker.app import celery_app
 
@@ -13,23 +17,54 @@ from nc_parser.worker.app import celery_app
 router = APIRouter()
 
 
-@router.post("/upload")
-async def upload_single(file: UploadFile = File(...), filename: Optional[str] = None) -> JSONResponse:
-    data = await file.read()
-    file_id = storage.save_single_shot(data, filename or file.filename)
-    storage.write_status(file_id, status="queued", progress=0.0)
+def _enqueue(file_id: UUID) -> None:
+    # Blocking (object store upload, broker publish); always invoked through aio.run_blocking
+    storage.publish_upload(file_id)
     task = celery_app.send_task("nc_parser.process_file", args=[str(file_id)])
     storage.save_celery_task_id(file_id, task.id)
+
+
+async def _queue_for_processing(file_id: UUID) -> JSONResponse:
+    await aio.write_status(file_id, status="queued", progress=0.0)
+    await aio.run_blocking(_enqueue, file_id)
     return JSONResponse({"file_id": str(file_id), "status": "queued"})
 
 
+@router.post("/upload")
+async def upload_single(file: UploadFile = File(...), filename: Optional[str] = None) -> JSONResponse:
+    file_id = await aio.save_single_shot_stream(file.file, filename or file.filename)
+    return await _queue_for_processing(file_id)
+
+
+def _bounded_int(payload: dict, name: str, max_mb: int) -> Optional[int]:
+    """Optional positive integer field of at most ``max_mb`` MiB; 422 otherwise."""
+    value = payload.get(name)
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise HTTPException(status_code=422, detail=f"{name} must be a positive integer")
+    if value > max_mb * 1024 * 1024:
+        raise HTTPException(status_code=422, detail=f"{name} must be at most {max_mb} MiB")
+    return value
+
+
 @router.post("/upload/init")
-def upload_init(payload: dict | None = None) -> JSONResponse:
-    filename = (payload or {}).get("filename") if payload else None
-    size_bytes = (payload or {}).get("size_bytes") if payload else None
-    checksum = (payload or {}).get("checksum") if payload else None
-    file_id = storage.init_upload(filename=filename, size_bytes=size_bytes, checksum=checksum)
-    storage.write_status(file_id, status="queued", progress=0.0)
+async def upload_init(payload: dict | None = None) -> JSONResponse:
+    payload = payload or {}
+    filename = payload.get("filename")
+    checksum = payload.get("checksum")
+    settings = get_settings()
+    size_bytes = _bounded_int(payload, "size_bytes", settings.upload_max_mb)
+    chunk_size = _bounded_int(payload, "chunk_size", settings.upload_chunk_max_mb)
+    try:
+        file_id = await aio.init_upload(filename=filename, size_bytes=size_bytes, checksum=checksum, chunk_size=chunk_size)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except OSError as exc:
+        if exc.errno == errno.ENOSPC:
+            raise HTTPException(status_code=507, detail="Not enough storage for the declared upload size")
+        raise
+    await aio.write_status(file_id, status="queued", progress=0.0)
     return JSONResponse({"file_id": str(file_id)})
 
 
@@ -38,121 +73,89 @@ async def upload_chunk(
     request: Request,
     file_id: UUID = Query(...),
     index: int = Query(..., ge=0),
+    checksum: Optional[str] = Query(default=None),
 ) -> JSONResponse:
     data = await request.body()
     if not data:
         raise HTTPException(status_code=400, detail="Empty chunk body")
-    storage.append_chunk(file_id, index, data)
+    try:
+        await aio.append_chunk(file_id, index, data, checksum=checksum)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     return Response(status_code=204)
 
 
+@router.get("/upload/{file_id}/chunks")
+async def upload_chunks(file_id: UUID) -> JSONResponse:
+    try:
+        return JSONResponse(await aio.chunk_status(file_id))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+
 @router.post("/upload/complete")
 async def upload_complete(
     file_id: UUID | None = Query(default=None), file: UploadFile | None = File(default=None)
 ) -> JSONResponse:
     if file is not None:
-        data = await file.read()
-        file_id2 = storage.save_single_shot(data, file.filename)
-        storage.write_status(file_id2, status="queued", progress=0.0)
-        task = celery_app.send_task("nc_parser.process_file", args=[str(file_id2)])
-        storage.save_celery_task_id(file_id2, task.id)
-        return JSONResponse({"file_id": str(file_id2), "status": "queued"})
+        file_id2 = await aio.save_single_shot_stream(file.file, file.filename)
+        return await _queue_for_processing(file_id2)
     if file_id is None:
         raise HTTPException(status_code=400, detail="file_id or file must be provided")
-    assembled = storage.assemble_file(file_id)
+    try:
+        if (await aio.read_meta(file_id)).completed_ts:
+            # A retried complete: already assembled and queued, report where the job is
+            st = await aio.read_job_status(file_id)
+            return JSONResponse({"file_id": str(file_id), "status": st["status"]})
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    try:
+        assembled = await aio.assemble_file(file_id)
+    except (ValueError, FileNotFoundError) as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     # If checksum was provided at init, verify
     try:
-        meta = storage.UploadMeta.from_file(storage._meta_path(file_id))  # type: ignore[attr-defined]
+        meta = await aio.read_meta(file_id)
         if meta.checksum:
-            digest = storage.sha256_file(assembled)
+            digest = await aio.upload_sha256(file_id, assembled)
             if digest != meta.checksum:
-                storage.write_status(file_id, status="failed", error="checksum_mismatch", progress=0.0)
+                await aio.write_status(file_id, status="failed", error="checksum_mismatch", progress=0.0)
                 raise HTTPException(status_code=400, detail="checksum mismatch")
     except FileNotFoundError:
         pass
-    storage.write_status(file_id, status="queued", progress=0.0)
-    task = celery_app.send_task("nc_parser.process_file", args=[str(file_id)])
-    storage.save_celery_task_id(file_id, task.id)
-    return JSONResponse({"file_id": str(file_id), "status": "queued"})
+    return await _queue_for_processing(file_id)
 
 
 @router.get("/status/{file_id}")
-def status(file_id: UUID) -> JSONResponse:
-    # If we have result on disk, it's done
+async def status(file_id: UUID, wait: Optional[str] = Query(default=None)) -> JSONResponse:
     try:
-        result_data = storage.read_result(file_id)
-        # Try to enrich status with caption metrics if available in result
-        caption_metrics = None
+        wait_s = parse_wait(wait)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if not wait_s:
         try:
-            pm = result_data.get("processing_metrics") or {}
-            caption_metrics = pm.get("caption")
-        except Exception:
-            caption_metrics = None
-        try:
-            st = storage.read_status(file_id)
-            st.update({"file_id": str(file_id), "status": "done", "progress": 1.0})
-            if caption_metrics:
-                st["caption"] = caption_metrics
-            return JSONResponse(st)
-        except Exception:
-            payload = {"file_id": str(file_id), "status": "done", "progress": 1.0}
-            if caption_metrics:
-                payload["caption"] = caption_metrics
-            return JSONResponse(payload)
-    except FileNotFoundError:
-        pass
-    # Else try to read celery task id and ask celery
-    try:
-        meta = storage.UploadMeta.from_file(storage._meta_path(file_id))  # type: ignore[attr-defined]
-        if meta.celery_task_id:
-            async_result = celery_app.AsyncResult(meta.celery_task_id)
-            st = async_result.status.lower()
-            # Map Celery states to our enum
-            mapped = {
-                "pending": "queued",
-                "received": "processing",
-                "started": "processing",
-                "retry": "processing",
-                "success": "done",
-                "failure": "failed",
-                "revoked": "failed",
-            }.get(st, "processing")
-            try:
-                st = storage.read_status(file_id)
-                st.update({"file_id": str(file_id), "status": mapped})
-                return JSONResponse(st)
-            except Exception:
-                return JSONResponse({"file_id": str(file_id), "status": mapped})
-    except Exception:
-        pass
-    try:
-        st = storage.read_status(file_id)
-        st.update({"file_id": str(file_id)})
-        return JSONResponse(st)
-    except Exception:
-        return JSONResponse({"file_id": str(file_id), "status": "processing"})
-
-
-@router.get("/result/{file_id}")
-def result(file_id: UUID) -> JSONResponse:
+            return JSONResponse(await aio.read_job_status(file_id))
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Unknown file_id")
+    # Long-poll: answer at once if the job is final, else on its next change or at timeout
+    updates = status_updates([file_id], timeout=wait_s)
     try:
-        data = storage.read_result(file_id)
-        # Promote caption metrics to top-level field for convenience
-        try:
-            pm = data.get("processing_metrics") or {}
-            caption_metrics = pm.get("caption")
-            if caption_metrics and not data.get("caption"):
-                data["caption"] = caption_metrics
-        except Exception:
-            pass
-        return JSONResponse(data)
-    except FileNotFoundError:
-        return Response(status_code=202)
+        st = await updates.__anext__()
+        if not is_final(st):
+            async for st in updates:
+                break
+    finally:
+        await updates.aclose()
+    if st.get("status") == "not_found":
+        raise HTTPException(status_code=404, detail="Unknown file_id")
+    return JSONResponse(st)
 
 
 @router.delete("/file/{file_id}")
-def delete_file(file_id: UUID) -> JSONResponse:
-    storage.delete_all(file_id)
+async def delete_file(file_id: UUID) -> JSONResponse:
+    await aio.delete_all(file_id)
     return Response(status_code=204)
 
 
@@ -0,0 +1,253 @@
+"""Push-style status delivery for long-polling and Server-Sent Events.
+
+Waiters wake up when a job may have changed and the status store stays the source
+of truth: after every wake-up the affected statuses are re-read (O(1) each) and only
+real changes are emitted. With ``NC_STATUS_EVENTS=redis`` wake-ups come from the
+per-job pub/sub channels the worker publishes to on every status write, received over
+one shared subscriber connection per API process (event loop); otherwise
+the store is re-checked every ``NC_STATUS_POLL_INTERVAL_S`` inside the API.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import re
+import weakref
+from typing import Any, AsyncIterator, Optional
+from uuid import UUID
+
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import aio
+from nc_parser.storage.status_store import events_channel
+
+
+TERMINAL_STATUSES = {"done", "failed"}
+
+_WAIT_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(ms|s)?\s*$", re.IGNORECASE)
+
+
+def parse_wait(value: Optional[str]) -> Optional[float]:
+    """Parse ``30``, ``30s`` or ``500ms`` into seconds, capped by NC_STATUS_WAIT_MAX_S."""
+    if value is None or value == "":
+        return None
+    m = _WAIT_RE.match(value)
+    if not m:
+        raise ValueError("wait must look like 30, 30s or 500ms")
+    seconds = float(m.group(1)) / (1000.0 if (m.group(2) or "").lower() == "ms" else 1.0)
+    return min(seconds, float(get_settings().status_wait_max_s))
+
+
+class _PollWaiter:
+    def __init__(self, file_ids: list[UUID]) -> None:
+        self._ids = set(file_ids)
+
+    async def __aenter__(self) -> "_PollWaiter":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def wait(self, timeout: float) -> set[UUID]:
+        await asyncio.sleep(max(0.0, min(timeout, get_settings().status_poll_interval_s)))
+        return set(self._ids)
+
+
+class _Subscriber:
+    """One Redis pub/sub connection per event loop, shared by every waiter.
+
+    A channel is subscribed while at least one waiter listens to it, and a single
+    reader task hands each message to the waiters of its channel, so a thousand open
+    long-polls cost one connection rather than a thousand.
+    """
+
+    def __init__(self) -> None:
+        self._client: Any = None
+        self._pubsub: Any = None
+        self._waiters: dict[str, set["_RedisWaiter"]] = {}
+        self._lock = asyncio.Lock()
+        self._active = asyncio.Event()  # set while any channel is subscribed
+        self._reader: Optional[asyncio.Task[None]] = None
+
+    async def add(self, waiter: "_RedisWaiter", channels: list[str]) -> None:
+        async with self._lock:
+            if self._pubsub is None:
+                import redis.asyncio as aioredis
+
+                self._client = aioredis.from_url(get_settings().redis_url, decode_responses=True)
+                self._pubsub = self._client.pubsub()
+            new = [c for c in channels if c not in self._waiters]
+            for channel in channels:
+                self._waiters.setdefault(channel, set()).add(waiter)
+            if new:
+                await self._pubsub.subscribe(*new)
+            self._active.set()
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read())
+
+    async def remove(self, waiter: "_RedisWaiter", channels: list[str]) -> None:
+        async with self._lock:
+            gone: list[str] = []
+            for channel in channels:
+                listeners = self._waiters.get(channel)
+                if listeners is None:
+                    continue
+                listeners.discard(waiter)
+                if not listeners:
+                    del self._waiters[channel]
+                    gone.append(channel)
+            if not self._waiters:
+                self._active.clear()
+            if gone:
+                await self._pubsub.unsubscribe(*gone)
+
+    async def _read(self) -> None:
+        while True:
+            await self._active.wait()
+            try:
+                msg = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Connection lost: waiters fall back to their timeouts until it is back
+                await asyncio.sleep(1.0)
+                continue
+            if msg is None:
+                continue
+            channel = msg.get("channel")
+            for waiter in list(self._waiters.get(channel, ())):
+                waiter.notify(channel)
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader
+        for obj in (self._pubsub, self._client):
+            if obj is not None:
+                await getattr(obj, "aclose", obj.close)()
+
+
+# Per event loop: asyncio primitives and connections must not cross loops (tests run a
+# fresh loop per client)
+_subscribers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Subscriber]" = weakref.WeakKeyDictionary()
+
+
+def _subscriber() -> _Subscriber:
+    loop = asyncio.get_running_loop()
+    sub = _subscribers.get(loop)
+    if sub is None:
+        sub = _subscribers[loop] = _Subscriber()
+    return sub
+
+
+async def close_subscriber() -> None:
+    """Stop this loop's shared subscriber (API shutdown)."""
+    sub = _subscribers.pop(asyncio.get_running_loop(), None)
+    if sub is not None:
+        await sub.close()
+
+
+class _RedisWaiter:
+    def __init__(self, file_ids: list[UUID]) -> None:
+        self._by_channel = {events_channel(fid): fid for fid in file_ids}
+        self._woken: set[UUID] = set()
+        self._event = asyncio.Event()
+        self._subscriber: Optional[_Subscriber] = None
+
+    async def __aenter__(self) -> "_RedisWaiter":
+        self._subscriber = _subscriber()
+        await self._subscriber.add(self, list(self._by_channel))
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        if self._subscriber is not None:
+            await self._subscriber.remove(self, list(self._by_channel))
+
+    def notify(self, channel: str) -> None:
+        fid = self._by_channel.get(channel)
+        if fid is not None:
+            self._woken.add(fid)
+            self._event.set()
+
+    async def wait(self, timeout: float) -> set[UUID]:
+        if not self._woken:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._event.wait(), timeout=max(0.0, timeout))
+        # Everything that arrived meanwhile is returned at once: a burst costs one read per job
+        woken, self._woken = self._woken, set()
+        self._event.clear()
+        return woken
+
+
+def _waiter(file_ids: list[UUID]) -> _PollWaiter | _RedisWaiter:
+    if get_settings().status_events.lower() == "redis":
+        return _RedisWaiter(file_ids)
+    return _PollWaiter(file_ids)
+
+
+async def _read(file_id: UUID) -> dict[str, Any]:
+    try:
+        return await aio.read_job_status(file_id)
+    except FileNotFoundError:
+        return {"file_id": str(file_id), "status": "not_found"}
+
+
+def is_final(st: dict[str, Any]) -> bool:
+    """True once a job will not change any more (done, failed or unknown)."""
+    return st.get("status") in TERMINAL_STATUSES or st.get("status") == "not_found"
+
+
+def _fingerprint(st: dict[str, Any]) -> str:
+    return json.dumps(st, sort_keys=True, default=str)
+
+
+async def status_updates(
+    file_ids: list[UUID],
+    timeout: Optional[float] = None,
+    *,
+    initial: bool = True,
+    keepalive: Optional[float] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield job statuses as they change until every job is terminal or timeout expires.
+
+    The current status of each job is yielded first (unless ``initial`` is False), then
+    one payload per observed change. Subscription happens before the first read, so a
+    change landing in between is not lost. With ``keepalive``, an empty dict is yielded
+    after that many quiet seconds so streaming callers can send heartbeats.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    last_emit = loop.time()
+    last: dict[UUID, str] = {}
+    pending = list(dict.fromkeys(file_ids))
+    async with _waiter(pending) as waiter:
+        for fid in pending:
+            st = await _read(fid)
+            last[fid] = _fingerprint(st)
+            if initial:
+                yield st
+            if is_final(st):
+                pending = [p for p in pending if p != fid]
+        while pending:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                return
+            step = remaining if remaining is not None else 15.0
+            if keepalive is not None:
+                step = min(step, max(0.0, keepalive - (loop.time() - last_emit)))
+            woken = await waiter.wait(step)
+            for fid in [p for p in pending if p in woken]:
+                st = await _read(fid)
+                fp = _fingerprint(st)
+                if fp == last.get(fid):
+                    continue
+                last[fid] = fp
+                last_emit = loop.time()
+                yield st
+                if is_final(st):
+                    pending = [p for p in pending if p != fid]
+            if keepalive is not None and loop.time() - last_emit >= keepalive:
+                last_emit = loop.time()
+                yield {}
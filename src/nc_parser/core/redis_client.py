@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from nc_parser.core.settings import get_settings
+
+if TYPE_CHECKING:  # pragma: no cover
+    import redis
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> "redis.Redis":
+    """Process-wide Redis client (pooled connections) for NC_REDIS_URL."""
+    import redis
+
+    return redis.Redis.from_url(get_settings().redis_url, decode_responses=True, health_check_interval=30)
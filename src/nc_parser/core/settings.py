@@ -3,9 +3,9 @@ from __future__ import annotations
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Literal
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import subprocess
 import shutil
@@ -22,10 +22,42 @@ class AppSettings(BaseSettings):
     # Storage
     data_dir: Path = Field(default=Path("data"))
     data_subdirs: List[str] = Field(default_factory=lambda: ["uploads", "artifacts", "results"])
+    data_layout_compat: bool = Field(default=True)  # also resolve jobs in the pre-sharding flat layout
+    result_codec: str = Field(default="gzip")  # gzip|zstd (zstd needs the `zstandard` package)
+    result_cache_max_mb: int = Field(default=64)  # in-process LRU of encoded /result bodies; 0 disables
+    result_http_max_age_s: int = Field(default=86400)  # Cache-Control max-age for result responses
+    storage_backend: str = Field(default="fs")  # fs|s3 for payloads and results (s3: `s3` extra, NC_STATUS_BACKEND=redis)
+    s3_bucket: str | None = Field(default=None)
+    s3_prefix: str = Field(default="")
+    s3_endpoint_url: str | None = Field(default=None)  # MinIO/Ceph; credentials come from the usual AWS_* env
+    s3_region: str | None = Field(default=None)
+    s3_max_pool_connections: int = Field(default=32)
+    s3_part_size_mb: int = Field(default=16)  # multipart upload/download part size
+    s3_transfer_concurrency: int = Field(default=4)  # parallel parts per transfer
+    input_cache_dir: Path | None = Field(default=None)  # worker read-through cache (default data/cache/inputs)
+    input_cache_max_mb: int = Field(default=2048)
+    storage_io_threads: int = Field(default=16)  # max concurrent blocking storage calls from the API
+    upload_max_mb: int = Field(default=4096)  # cap for size_bytes declared at POST /upload/init
+    upload_chunk_max_mb: int = Field(default=64)  # cap for chunk_size declared at POST /upload/init
+
+    # API
+    event_loop_lag_interval_s: float = Field(default=0.5)  # sampling period for the loop-lag metric
 
     # Queue/Worker
     redis_url: str = Field(default="redis://localhost:6379/0")
+    status_backend: str = Field(default="file")  # file|redis (job status + finished summary records)
+    status_events: str = Field(default="poll")  # poll|redis (pub/sub wake-ups for long-poll and SSE)
+    status_poll_interval_s: float = Field(default=0.5)  # re-check period when status_events=poll
+    status_wait_max_s: float = Field(default=60.0)  # cap for GET /status?wait=
+    status_sse_keepalive_s: float = Field(default=15.0)
+    status_sse_max_ids: int = Field(default=500)
+    status_bulk_max_ids: int = Field(default=1000)  # cap for POST /status/bulk
+    batch_max_files: int = Field(default=1000)  # cap for POST /batch (files or zip members)
     retention_ttl_hours: int = Field(default=168)  # 7 days
+    cleanup_delete_workers: int = Field(default=4)  # parallel deletes per cleanup run
+    cleanup_batch_size: int = Field(default=500)
+    cleanup_max_deletes_per_s: float = Field(default=0.0)  # 0 = unlimited
+    cleanup_reconcile_interval_h: float = Field(default=24.0)  # full scan for orphans / pre-index jobs
     worker_metrics_port: int = Field(default=9100)
 
     # Features & OCR
@@ -50,13 +82,33 @@ class AppSettings(BaseSettings):
     ocr_pdf_page_limit: int = Field(default=10)  # Limit pages for OCR fallback
     ocr_pdf_max_mb: int = Field(default=50)  # Skip OCR if file bigger than this
     ocr_pdf_max_pages: int = Field(default=300)  # Skip OCR if too many pages
+    ocr_tables_enabled: bool = Field(default=True)  # ruled-table detection on scanned pages and images, see processing/lattice.py
     ocr_debug_dump: bool = Field(default=False)  # Dump intermediate OCR images
+    pdf_tables_force: bool = Field(default=False)  # run table extraction on every PDF page, skipping the ruling prefilter
+    text_max_mb: int = Field(default=64)  # cap on text read from TXT/Markdown/HTML (Mi characters)
+    csv_html_max_rows: int = Field(default=2000)  # rows rendered into the CSV table_html preview
+    csv_text_max_mb: int = Field(default=64)  # cap on CSV plain text in full_text (Mi characters)
+    chunking_enabled: bool = Field(default=True)  # build result "chunks" (processing/chunker.py)
+    chunk_unit: Literal["words", "tokens"] = Field(default="words")  # tokens: punctuation-split approximation
+    chunk_target: int = Field(default=250)  # chunk size in chunk_unit
+    chunk_overlap: int = Field(default=40)  # carried over from the previous chunk, at most half the target
+    search_index_enabled: bool = Field(default=False)  # local SQLite FTS index of results for GET /search
+    search_index_path: Path | None = Field(default=None)  # default data/search.sqlite3
+    search_max_limit: int = Field(default=100)  # cap for GET /search?limit=
+    field_templates_dir: Path | None = Field(default=None)  # extra key-field templates (*.json), see processing/fields.py
 
     # Build metadata (populated by CI or docker build args)
     build_version: str | None = Field(default=os.getenv("BUILD_VERSION"))
     build_git_commit: str | None = Field(default=os.getenv("BUILD_GIT_COMMIT"))
     build_time: str | None = Field(default=os.getenv("BUILD_TIME"))
 
+    @model_validator(mode="after")
+    def _check_backends(self) -> "AppSettings":
+        # Status and summaries in data_dir would be invisible to the other nodes
+        if self.storage_backend.lower() == "s3" and self.status_backend.lower() != "redis":
+            raise ValueError("NC_STORAGE_BACKEND=s3 requires NC_STATUS_BACKEND=redis")
+        return self
+
     def ensure_data_dirs(self) -> None:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         for sub in self.data_subdirs:
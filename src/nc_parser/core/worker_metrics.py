@@ -18,6 +18,35 @@ TASK_DURATION = Histogram(
     labelnames=("task",),
 )
 
+CLEANUP_DELETED = Counter(
+    "nc_cleanup_deleted_total",
+    "Jobs (expired), batches and directories (orphans) removed by retention cleanup",
+    labelnames=("kind",),
+)
+
+CLEANUP_BYTES_FREED = Counter(
+    "nc_cleanup_bytes_freed_total",
+    "Bytes freed by retention cleanup",
+)
+
+TEXT_FIX_DOCUMENTS = Counter(
+    "nc_text_fix_documents_total",
+    "Strings passed to fix_text: skipped (clean), unchanged or changed by ftfy",
+    labelnames=("outcome",),
+)
+
+TEXT_FIX_SEGMENTS = Counter(
+    "nc_text_fix_segments_total",
+    "Lines of flagged strings: skipped (clean), unchanged or changed by ftfy",
+    labelnames=("outcome",),
+)
+
+PDF_TABLE_PAGES = Counter(
+    "nc_pdf_table_pages_total",
+    "PDF pages sent to table extraction (extracted) or ruled out by the prefilter (skipped)",
+    labelnames=("outcome",),
+)
+
 
 def start_worker_metrics_server(port: int) -> None:
     # Idempotent start
@@ -58,5 +87,3 @@ def observe_task(task_name: str) -> Callable:
         return async_wrapper if callable(getattr(func, "__await__", None)) else sync_wrapper
 
     return decorator
-
-
@@ -0,0 +1,197 @@
+"""Deterministic chunking of parsed pages for retrieval.
+
+Pages are fed one at a time (``Chunker.add_page``) and finished chunks come out as soon
+as they are complete, so the stage can run while later pages are still being produced.
+Each page is cut once, left to right, into blocks: paragraphs (separated by blank
+lines, or single lines when a page has none) or, on pages carrying ``table_html``
+elements, whole tables. Blocks are cut into units: sentences for prose, rows for
+tables. Units are packed into chunks of about ``target`` words (or tokens); a chunk is
+closed at the last block boundary once it is past half the target, so paragraphs and
+tables are only split when they are larger than that. The next chunk starts with the
+trailing units of the previous one, up to ``overlap``.
+
+Every chunk records the pages it covers (positions in the result's ``pages``, as served
+by ``/result/{id}/pages/{n}``) and, per page, the character span of its text in that
+page's ``text``. Unit sizes are cached, which pays off on repeated headers,
+footers and table rows. The same input always yields the same chunks.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Iterator
+
+
+_BLOCK_BREAK = re.compile(r"\n[ \t]*\n\s*")
+_LINE = re.compile(r"[^\n]+")
+# Sentence ends: ., !, ? or … followed by whitespace
+_SENTENCE = re.compile(r".+?(?:[.!?…](?=\s)|$)", re.S)
+_WORD = re.compile(r"\S+")
+# Rough subword tokens: words split at punctuation, each punctuation mark on its own
+_TOKEN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+@lru_cache(maxsize=65536)
+def count_words(text: str) -> int:
+    return len(_WORD.findall(text))
+
+
+@lru_cache(maxsize=65536)
+def count_tokens(text: str) -> int:
+    return len(_TOKEN.findall(text))
+
+
+_COUNTERS = {"words": count_words, "tokens": count_tokens}
+
+
+@dataclass(frozen=True)
+class _Unit:
+    page: int
+    start: int
+    end: int
+    size: int
+    block_end: bool  # last unit of its paragraph / table / page
+
+
+def _blocks(text: str) -> Iterator[tuple[int, int]]:
+    if _BLOCK_BREAK.search(text) is None:
+        for m in _LINE.finditer(text):
+            yield m.start(), m.end()
+        return
+    start = 0
+    for m in _BLOCK_BREAK.finditer(text):
+        yield start, m.start()
+        start = m.end()
+    yield start, len(text)
+
+
+def _split_long(
+    text: str, start: int, end: int, size: int, target: int, count: Callable[[str], int]
+) -> Iterator[tuple[int, int, int]]:
+    """Cut a single over-long unit at word boundaries into pieces of about ``target``."""
+    if size <= target:
+        yield start, end, size
+        return
+    words = list(_WORD.finditer(text, start, end))
+    for i in range(0, len(words), target):
+        piece = words[i:i + target]
+        a, b = piece[0].start(), piece[-1].end()
+        yield a, b, count(text[a:b])
+
+
+class Chunker:
+    def __init__(self, target: int = 250, overlap: int = 40, unit: str = "words") -> None:
+        if unit not in _COUNTERS:
+            raise ValueError(f"unknown chunk unit {unit!r}; expected one of {sorted(_COUNTERS)}")
+        self.target = max(1, target)
+        self.overlap = max(0, min(overlap, self.target // 2))
+        self.unit = unit
+        self._count = _COUNTERS[unit]
+        self._texts: dict[int, str] = {}
+        self._units: list[_Unit] = []
+        self._size = 0
+        self._fresh = 0  # units in the current chunk that are not overlap from the previous one
+        self._emitted = 0
+        self._page = -1  # page being fed
+
+    def _units_of(self, index: int, text: str, table: bool) -> Iterator[_Unit]:
+        for b_start, b_end in _blocks(text):
+            pieces = (_LINE if table else _SENTENCE).finditer(text, b_start, b_end)
+            sized: list[tuple[int, int, int]] = []
+            for m in pieces:
+                piece = m.group()
+                size = self._count(piece)
+                if size:
+                    # Leading whitespace between sentences belongs to no unit
+                    sized.append((m.start() + len(piece) - len(piece.lstrip()), m.end(), size))
+            for k, (a, b, size) in enumerate(sized):
+                parts = list(_split_long(text, a, b, size, self.target, self._count))
+                for n, (pa, pb, psize) in enumerate(parts):
+                    yield _Unit(index, pa, pb, psize, k == len(sized) - 1 and n == len(parts) - 1)
+
+    def add_page(self, position: int, text: str, table: bool = False) -> Iterator[dict[str, Any]]:
+        """Feed the page at ``position`` (increasing); yields the chunks completed by it."""
+        if not text:
+            return
+        self._texts[position] = text
+        self._page = position
+        for unit in self._units_of(position, text, table):
+            if self._size + unit.size > self.target and self._fresh:
+                yield self._close()
+            self._units.append(unit)
+            self._size += unit.size
+            self._fresh += 1
+
+    def finish(self) -> Iterator[dict[str, Any]]:
+        """Flush the last chunk."""
+        if self._fresh:
+            yield self._emit(self._units)
+        self._units, self._size, self._fresh = [], 0, 0
+        self._texts.clear()
+
+    def _close(self) -> dict[str, Any]:
+        units = self._units
+        first_fresh = len(units) - self._fresh
+        cut = len(units)
+        # Prefer ending at the last paragraph/table boundary once past half the target
+        acc = sum(u.size for u in units)
+        for i in range(len(units) - 1, first_fresh, -1):
+            acc -= units[i].size
+            if acc < self.target / 2:
+                break
+            if units[i - 1].block_end:
+                cut = i
+                break
+        chunk = self._emit(units[:cut])
+        # Overlap: whole trailing units of the emitted chunk, up to ``overlap``
+        keep = cut
+        carried = 0
+        while keep > first_fresh and carried + units[keep - 1].size <= self.overlap:
+            keep -= 1
+            carried += units[keep].size
+        self._units = units[keep:]
+        self._fresh = len(units) - cut
+        self._size = sum(u.size for u in self._units)
+        # Earlier pages no longer referenced by any pending unit can go
+        oldest = min([u.page for u in self._units] + [self._page])
+        for page in [p for p in self._texts if p < oldest]:
+            del self._texts[page]
+        return chunk
+
+    def _emit(self, units: list[_Unit]) -> dict[str, Any]:
+        spans: list[list[int]] = []
+        for u in units:
+            if spans and spans[-1][0] == u.page:
+                spans[-1][2] = u.end
+            else:
+                spans.append([u.page, u.start, u.end])
+        text = "\n\n".join(self._texts[p][a:b] for p, a, b in spans)
+        chunk = {
+            "index": self._emitted,
+            "text": text,
+            "pages": [p for p, _, _ in spans],
+            "spans": spans,
+            "size": sum(u.size for u in units),
+        }
+        self._emitted += 1
+        return chunk
+
+
+def _is_table_page(page: dict[str, Any]) -> bool:
+    return any(el.get("type") == "table_html" for el in page.get("elements") or [])
+
+
+def _is_caption_page(page: dict[str, Any]) -> bool:
+    return any(el.get("type") == "image_caption" for el in page.get("elements") or [])
+
+
+def chunk_pages(pages: Iterable[dict[str, Any]], target: int = 250, overlap: int = 40, unit: str = "words") -> Iterator[dict[str, Any]]:
+    """Chunks over the pages that make up ``full_text`` (caption pages are left out, as there)."""
+    chunker = Chunker(target, overlap, unit)
+    for position, page in enumerate(pages):
+        if _is_caption_page(page):
+            continue
+        yield from chunker.add_page(position, page.get("text") or "", _is_table_page(page))
+    yield from chunker.finish()
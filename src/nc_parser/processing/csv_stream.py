@@ -0,0 +1,177 @@
+"""Bounded-memory CSV ingestion.
+
+The file is never held in memory as a whole: the encoding comes from sampled detection
+(``textio.detect_file_encoding``) and the dialect from a sample of the head, then the
+file is decoded incrementally (``textio.DecodedFile``) and ``csv.reader`` consumes its
+lines (so quoted fields spanning lines stay intact), yielding rows in batches. Every row
+feeds a per-column summary (name, inferred type, non-empty count); plain text is kept up to ``NC_CSV_TEXT_MAX_MB`` and the HTML preview up to
+``NC_CSV_HTML_MAX_ROWS`` rows, each ending with a truncation marker when cut.
+"""
+
+from __future__ import annotations
+
+import csv
+import html
+import re
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from nc_parser.processing.normalize import fix_text, normalize_text
+from nc_parser.processing.textio import SAMPLE_BYTES, DecodedFile, iter_lines
+
+
+_DELIMITERS = ",;\t|"
+_CELL_STRIP = " \t\ufeff"
+BATCH_ROWS = 1000
+
+_INTEGER = re.compile(r"[+-]?\d+")
+_NUMBER = re.compile(r"[+-]?(?:\d+[.,]\d*|[.,]\d+|\d+)(?:[eE][+-]?\d+)?")
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}(?:[ T]\d{2}:\d{2}(?::\d{2})?)?|\d{1,2}[./]\d{1,2}[./]\d{2,4}")
+_BOOLEAN = frozenset({"true", "false", "yes", "no"})
+
+
+@dataclass
+class CsvColumn:
+    name: str
+    type: str = "empty"  # empty|integer|number|date|boolean|text
+    non_empty: int = 0
+
+    def observe(self, value: str) -> None:
+        if not value:
+            return
+        self.non_empty += 1
+        if self.type == "text":
+            return
+        kind = _value_type(value)
+        if self.type == "empty" or self.type == kind:
+            self.type = kind
+        elif {self.type, kind} == {"integer", "number"}:
+            self.type = "number"
+        else:
+            self.type = "text"
+
+
+@dataclass
+class CsvContent:
+    text: str
+    html: str
+    encoding: str
+    delimiter: str
+    has_header: bool
+    rows: int = 0  # data rows, header excluded
+    columns: list[CsvColumn] = field(default_factory=list)
+    text_truncated: bool = False
+    html_truncated: bool = False
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "columns": [{"name": c.name, "type": c.type, "non_empty": c.non_empty} for c in self.columns],
+            "encoding": self.encoding,
+            "delimiter": self.delimiter,
+            "has_header": self.has_header,
+            "text_truncated": self.text_truncated,
+            "html_truncated": self.html_truncated,
+        }
+
+
+def _value_type(value: str) -> str:
+    if _INTEGER.fullmatch(value):
+        return "integer"
+    if _NUMBER.fullmatch(value):
+        return "number"
+    if _DATE.fullmatch(value):
+        return "date"
+    if value.lower() in _BOOLEAN:
+        return "boolean"
+    return "text"
+
+
+def _sniff(sample: str) -> tuple[type[csv.Dialect] | csv.Dialect, bool]:
+    # Only whole lines: a cut-off last row confuses both heuristics
+    head = sample[: sample.rfind("\n") + 1] or sample
+    sniffer = csv.Sniffer()
+    try:
+        dialect: type[csv.Dialect] | csv.Dialect = sniffer.sniff(head, delimiters=_DELIMITERS)
+    except csv.Error:
+        return csv.excel, False
+    try:
+        has_header = sniffer.has_header(head)
+    except csv.Error:
+        has_header = False
+    return dialect, has_header
+
+
+def iter_row_batches(f: Iterable[str], dialect: Any, batch_rows: int = BATCH_ROWS) -> Iterator[list[list[str]]]:
+    """Rows of a CSV text stream (or its lines), ``batch_rows`` at a time, cells stripped."""
+    reader = csv.reader(f, dialect)
+    while batch := list(islice(reader, batch_rows)):
+        yield [[c.strip(_CELL_STRIP) for c in row] for row in batch]
+
+
+def _html_row(row: list[str], tag: str) -> str:
+    cells = [html.escape(fix_text(c), quote=False) for c in row]
+    return "<tr>" + "".join(f"<{tag}>{c}</{tag}>" for c in cells) + "</tr>"
+
+
+def read_csv(path: Path, *, html_max_rows: int, text_max_chars: int) -> CsvContent:
+    decoded = DecodedFile(path)
+    with path.open("rb") as fb:
+        raw = fb.read(SAMPLE_BYTES)
+    sample = raw.decode(decoded.encoding, errors="ignore")
+    dialect, has_header = _sniff(sample)
+
+    columns: list[CsvColumn] = []
+    header: Optional[list[str]] = None
+    html_rows: list[str] = []
+    text_parts: list[str] = []
+    text_len = 0
+    rows = 0
+    text_truncated = False
+    for batch in iter_row_batches(iter_lines(decoded), dialect):
+        data = batch
+        if has_header and header is None:
+            header, data = batch[0], batch[1:]
+            columns = [CsvColumn(fix_text(name) or f"column_{i + 1}") for i, name in enumerate(header)]
+        for row in data:
+            for i, value in enumerate(row):
+                if i >= len(columns):
+                    columns.append(CsvColumn(f"column_{i + 1}"))
+                columns[i].observe(value)
+        if len(html_rows) < html_max_rows:
+            html_rows.extend(_html_row(row, "td") for row in data[: html_max_rows - len(html_rows)])
+        rows += len(data)
+        if not text_truncated:
+            chunk = normalize_text("\n".join(" | ".join(row) for row in batch))
+            if text_len + len(chunk) > text_max_chars:
+                chunk = chunk[: max(0, text_max_chars - text_len)]
+                chunk = chunk[: chunk.rfind("\n") + 1].rstrip()
+                text_truncated = True
+            if chunk:
+                text_parts.append(chunk)
+                text_len += len(chunk) + 1
+
+    html_truncated = rows > len(html_rows)
+    body = "".join(html_rows)
+    if html_truncated:
+        body += f'<tr><td colspan="{max(1, len(columns))}">… {rows - len(html_rows)} more rows not shown</td></tr>'
+    if header is not None:
+        table = f"<table><thead>{_html_row(header, 'th')}</thead><tbody>{body}</tbody></table>"
+    else:
+        table = f"<table>{body}</table>"
+    text = "\n".join(text_parts)
+    if text_truncated:
+        text += f"\n… truncated after {text_len} characters; {rows} rows in total"
+    return CsvContent(
+        text=text,
+        html=table,
+        encoding=decoded.encoding,
+        delimiter=getattr(dialect, "delimiter", ","),
+        has_header=header is not None,
+        rows=rows,
+        columns=columns,
+        text_truncated=text_truncated,
+        html_truncated=html_truncated,
+    )
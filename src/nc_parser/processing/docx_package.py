@@ -0,0 +1,284 @@
+"""Single-open DOCX package with streaming body parsing.
+
+``python-docx`` loads every part of the package (embedded scans included) into memory
+to build its object model, and the parser used to do that up to four times per file.
+``DocxPackage`` opens the zip once; ``word/document.xml`` is fed to lxml's XML parser
+in chunks with a parser target, producing paragraphs and tables in document order
+without building a tree. Headers, footers and footnotes are found through the
+document relationships, and image parts are listed lazily and read one at a time.
+
+Paragraph text follows python-docx: ``w:t`` runs, ``w:tab`` as a tab, ``w:br``/``w:cr``
+as a newline; deleted runs, field codes and the VML fallback copy of text boxes are
+skipped. Tables keep ``w:gridSpan`` as colspan, ``w:vMerge`` as rowspan and
+``w:tblHeader`` rows as header cells.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from lxml import etree
+
+from nc_parser.processing.normalize import fix_text
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+_R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_INLINE = {_W + "tab": "\t", _W + "ptab": "\t", _W + "br": "\n", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+# Deleted text, field instructions, and the duplicate (VML) copy of drawings/text boxes
+_SKIP = frozenset({_W + "delText", _W + "instrText", _W + "del", _MC + "Fallback"})
+_VAL = _W + "val"
+_NOTES = frozenset({_W + "footnote", _W + "endnote"})
+_NOTE_SEPARATORS = frozenset({"separator", "continuationSeparator", "continuationNotice"})
+_CHUNK = 1024 * 1024
+
+_REL_TYPES = {
+    "header": _R_NS + "/header",
+    "footer": _R_NS + "/footer",
+    "footnotes": _R_NS + "/footnotes",
+    "endnotes": _R_NS + "/endnotes",
+    "image": _R_NS + "/image",
+}
+_MAIN_DOCUMENT = "word/document.xml"
+
+
+@dataclass
+class DocxContent:
+    # ("paragraph", str) or ("table", rows of cell dicts), in document order
+    blocks: list[tuple[str, Any]] = field(default_factory=list)
+    # Every paragraph, including those inside tables (headers/footers/notes are read flat)
+    all_paragraphs: list[str] = field(default_factory=list)
+
+    @property
+    def paragraphs(self) -> list[str]:
+        """Body paragraphs outside tables, like python-docx's ``Document.paragraphs``."""
+        return [b for kind, b in self.blocks if kind == "paragraph"]
+
+    @property
+    def tables(self) -> list[list[list[dict[str, Any]]]]:
+        return [b for kind, b in self.blocks if kind == "table"]
+
+
+@dataclass
+class _Table:
+    rows: list[list[dict[str, Any]]] = field(default_factory=list)
+    header_row: bool = False
+    col: int = 0  # grid column of the next cell in the current row
+    # grid column -> cell that started a vertical merge there
+    merges: dict[int, dict[str, Any]] = field(default_factory=dict)
+
+
+class _Target:
+    """lxml parser target for one WordprocessingML part."""
+
+    def __init__(self, out: DocxContent) -> None:
+        self.out = out
+        self._skip = 0
+        self._in_text = 0
+        self._paras: list[list[str]] = []
+        self._tables: list[_Table] = []
+        # (cell, vMerge state, paragraph texts) per open cell
+        self._cells: list[tuple[dict[str, Any], list[Optional[str]], list[str]]] = []
+
+    def start(self, tag: str, attrib: Any) -> None:
+        if self._skip or tag in _SKIP or (tag in _NOTES and attrib.get(_W + "type") in _NOTE_SEPARATORS):
+            self._skip += 1
+            return
+        if tag == _W + "t":
+            self._in_text += 1
+        elif tag in _INLINE:
+            if self._paras:
+                self._paras[-1].append(_INLINE[tag])
+        elif tag == _W + "p":
+            self._paras.append([])
+        elif tag == _W + "tbl":
+            self._tables.append(_Table())
+        elif not self._tables:
+            return
+        elif tag == _W + "tr":
+            table = self._tables[-1]
+            table.rows.append([])
+            table.col = 0
+            table.header_row = False
+        elif tag == _W + "tblHeader":
+            self._tables[-1].header_row = attrib.get(_VAL, "true") not in {"0", "false"}
+        elif tag == _W + "gridBefore":
+            self._tables[-1].col += _int(attrib.get(_VAL))
+        elif tag == _W + "tc":
+            cell = {"text": "", "colspan": 1, "rowspan": 1, "header": self._tables[-1].header_row}
+            self._cells.append((cell, [None], []))
+        elif tag == _W + "gridSpan" and self._cells:
+            self._cells[-1][0]["colspan"] = _int(attrib.get(_VAL))
+        elif tag == _W + "vMerge" and self._cells:
+            self._cells[-1][1][0] = attrib.get(_VAL, "continue")
+
+    def end(self, tag: str) -> None:
+        if self._skip:
+            self._skip -= 1
+            return
+        if tag == _W + "t":
+            self._in_text -= 1
+        elif tag == _W + "p":
+            if not self._paras:
+                return
+            text = "".join(self._paras.pop())
+            self.out.all_paragraphs.append(text)
+            if self._cells:
+                for _, _, texts in self._cells:
+                    texts.append(text)
+            elif not self._tables:
+                # Text box paragraphs end inside their anchor paragraph and come out first
+                self.out.blocks.append(("paragraph", text))
+        elif tag == _W + "tc":
+            if self._cells and self._tables:
+                self._close_cell(self._tables[-1], *self._cells.pop())
+        elif tag == _W + "tbl":
+            if self._tables:
+                rows = [r for r in self._tables.pop().rows if r]
+                if rows:
+                    self.out.blocks.append(("table", rows))
+
+    def _close_cell(self, table: _Table, cell: dict[str, Any], merge: list[Optional[str]], texts: list[str]) -> None:
+        col = table.col
+        table.col += cell["colspan"]
+        if merge[0] == "continue" and col in table.merges:
+            table.merges[col]["rowspan"] += 1
+            return
+        cell["text"] = fix_text(" ".join(t.strip() for t in texts if t.strip()))
+        if table.rows:
+            table.rows[-1].append(cell)
+        for c in range(col, col + cell["colspan"]):
+            table.merges.pop(c, None)
+        if merge[0] == "restart":
+            table.merges[col] = cell
+
+    def data(self, data: str) -> None:
+        if self._in_text and not self._skip and self._paras:
+            self._paras[-1].append(data)
+
+    def close(self) -> None:
+        return None
+
+
+def _int(value: Optional[str]) -> int:
+    try:
+        return max(1, int(value or 1))
+    except ValueError:
+        return 1
+
+
+@dataclass(frozen=True)
+class DocxImage:
+    name: str  # zip member, e.g. word/media/image1.png
+    size: int  # uncompressed bytes
+
+
+class DocxPackage:
+    """An open .docx; use as a context manager. Unreadable files behave as empty."""
+
+    def __init__(self, path: Path) -> None:
+        try:
+            self._zf: Optional[zipfile.ZipFile] = zipfile.ZipFile(str(path), "r")
+        except (OSError, zipfile.BadZipFile):
+            self._zf = None
+        self._rels: Optional[list[tuple[str, str]]] = None
+
+    def __enter__(self) -> "DocxPackage":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._zf is not None:
+            self._zf.close()
+            self._zf = None
+
+    def _relationships(self) -> list[tuple[str, str]]:
+        """(type, zip member) of the main document's internal relationships."""
+        if self._rels is None:
+            self._rels = []
+            if self._zf is None:
+                return self._rels
+            try:
+                root = etree.fromstring(self._zf.read("word/_rels/document.xml.rels"))
+            except (KeyError, etree.LxmlError):
+                return self._rels
+            for rel in root.iter(_RELS_NS + "Relationship"):
+                if rel.get("TargetMode") == "External":
+                    continue
+                target = rel.get("Target") or ""
+                name = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("word", target))
+                self._rels.append((rel.get("Type") or "", name))
+        return self._rels
+
+    def _parse(self, name: str) -> DocxContent:
+        out = DocxContent()
+        if self._zf is None:
+            return out
+        try:
+            member = self._zf.open(name)
+        except KeyError:
+            return out
+        parser = etree.XMLParser(target=_Target(out), huge_tree=True, recover=True, resolve_entities=False)
+        with member:
+            while chunk := member.read(_CHUNK):
+                parser.feed(chunk)
+        try:
+            parser.close()
+        except etree.LxmlError:
+            pass  # truncated part: keep what was read
+        return out
+
+    def body(self) -> DocxContent:
+        return self._parse(_MAIN_DOCUMENT)
+
+    def _related_text(self, kind: str) -> list[str]:
+        lines: list[str] = []
+        seen: set[str] = set()
+        for rel_type, name in self._relationships():
+            if rel_type != _REL_TYPES[kind]:
+                continue
+            for text in self._parse(name).all_paragraphs:
+                key = text.strip()
+                if key and key not in seen:
+                    seen.add(key)
+                    lines.append(key)
+        return lines
+
+    def headers(self) -> list[str]:
+        return self._related_text("header")
+
+    def footers(self) -> list[str]:
+        return self._related_text("footer")
+
+    def notes(self) -> list[str]:
+        """Footnote and endnote paragraphs."""
+        return self._related_text("footnotes") + self._related_text("endnotes")
+
+    def images(self) -> Iterator[DocxImage]:
+        """Image parts of the main document; nothing is decompressed until ``read_image``."""
+        if self._zf is None:
+            return
+        seen: set[str] = set()
+        for rel_type, name in self._relationships():
+            if rel_type != _REL_TYPES["image"] or name in seen:
+                continue
+            seen.add(name)
+            try:
+                info = self._zf.getinfo(name)
+            except KeyError:
+                continue
+            yield DocxImage(name, info.file_size)
+
+    def read_image(self, image: DocxImage) -> bytes:
+        if self._zf is None:
+            raise FileNotFoundError(image.name)
+        return self._zf.read(image.name)
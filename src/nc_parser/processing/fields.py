@@ -0,0 +1,255 @@
+"""Template-driven key-field extraction.
+
+A field template describes one document type (work permit, visa grant, ...) as JSON:
+
+    {
+      "name": "work_permit",
+      "detect": ["Work\\s*Permit"],
+      "max_chars": 50000,
+      "fields": {"passport_no": ["Passport\\s*No\\.?[:\\-]?\\s*([A-Za-z0-9]+)"], ...}
+    }
+
+``detect`` patterns decide whether the template applies; they are searched in the head
+of the document only, and a template without them applies to every document. A
+template with ``"fallback": true`` (and no ``detect``) applies only to documents no
+other template recognised: the built-in ``formal_document`` carries the general
+fields (name, passport, date of birth, ...) searched in every document before types
+were introduced. ``fields`` maps each field to patterns in priority order; group 1
+(or the whole match) is the value. ``max_chars`` limits the region a template scans.
+Built-in templates live in ``field_templates/``; ``NC_FIELD_TEMPLATES_DIR`` adds more,
+and a template with the same name replaces the built-in one. Patterns are
+case-insensitive unless the template sets ``"ignore_case": false``.
+
+All patterns are compiled once per process: one combined detection regex of zero-width
+alternatives over every template (so overlapping detect patterns are all found), so a
+document costs one detection pass over its head. Each field of a matching template is
+then searched on its own, patterns in priority order, up to its first value.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from structlog import get_logger
+
+from nc_parser.core.settings import get_settings
+
+
+logger = get_logger(__name__)
+
+BUILTIN_TEMPLATES_DIR = Path(__file__).with_name("field_templates")
+# Document types are recognised from their first pages
+DETECT_CHARS = 20000
+
+
+@dataclass(frozen=True)
+class FieldTemplate:
+    name: str
+    fields: dict[str, tuple[str, ...]]
+    detect: tuple[str, ...] = ()
+    max_chars: Optional[int] = None
+    ignore_case: bool = True
+    fallback: bool = False
+
+    @classmethod
+    def from_dict(cls, obj: dict[str, Any]) -> "FieldTemplate":
+        fields = {str(k): tuple(v) if isinstance(v, list) else (str(v),) for k, v in obj["fields"].items()}
+        max_chars = obj.get("max_chars")
+        return cls(
+            name=str(obj["name"]),
+            fields=fields,
+            detect=tuple(obj.get("detect") or ()),
+            max_chars=int(max_chars) if max_chars else None,
+            ignore_case=bool(obj.get("ignore_case", True)),
+            fallback=bool(obj.get("fallback", False)),
+        )
+
+
+@dataclass(frozen=True)
+class FieldMatch:
+    field: str
+    value: str
+    start: int  # offsets of the value in the text passed to ``extract``
+    end: int
+    template: str
+    pattern: int  # index of the matching pattern in the field's list (0 = preferred)
+
+
+@dataclass
+class FieldResult:
+    template: str
+    matches: dict[str, FieldMatch] = field(default_factory=dict)
+
+    def values(self) -> dict[str, str]:
+        return {name: m.value for name, m in self.matches.items()}
+
+    def positions(self) -> dict[str, list[int]]:
+        return {name: [m.start, m.end] for name, m in self.matches.items()}
+
+
+def _scoped(pattern: str, ignore_case: bool) -> str:
+    return f"(?i:{pattern})" if ignore_case else f"(?:{pattern})"
+
+
+def _check_pattern(template: str, pattern: str) -> None:
+    try:
+        compiled = re.compile(pattern)
+    except re.error as exc:
+        raise ValueError(f"field template {template!r}: invalid pattern {pattern!r}: {exc}") from exc
+    if compiled.groupindex:
+        raise ValueError(f"field template {template!r}: named groups are not allowed in {pattern!r}")
+
+
+class _CompiledTemplate:
+    """A template's field patterns, compiled once, searched field by field.
+
+    Each field tries its patterns in priority order and stops at the first non-empty
+    value, so fields that overlap or start at the same offset are all found and a
+    field usually costs a scan up to its first hit rather than of the whole region.
+    """
+
+    def __init__(self, template: FieldTemplate) -> None:
+        self.template = template
+        # field -> [(own regex, value group)] in priority order
+        self._fields: dict[str, list[tuple[re.Pattern[str], int]]] = {}
+        for name, patterns in template.fields.items():
+            compiled: list[tuple[re.Pattern[str], int]] = []
+            for pattern in patterns:
+                _check_pattern(template.name, pattern)
+                rx = re.compile(_scoped(pattern, template.ignore_case))
+                # Value group: the pattern's group 1, else the whole match
+                compiled.append((rx, 1 if rx.groups else 0))
+            self._fields[name] = compiled
+
+    def extract(self, text: str) -> FieldResult:
+        result = FieldResult(self.template.name)
+        region = text[: self.template.max_chars] if self.template.max_chars else text
+        for name, patterns in self._fields.items():
+            for prio, (rx, group) in enumerate(patterns):
+                match = _first_value(rx, group, region)
+                if match is not None:
+                    value, start = match
+                    result.matches[name] = FieldMatch(name, value, start, start + len(value), self.template.name, prio)
+                    break
+        return result
+
+
+def _first_value(rx: re.Pattern[str], group: int, text: str) -> Optional[tuple[str, int]]:
+    """(stripped value, offset) of the first match with a non-blank value group."""
+    pos = 0
+    while pos <= len(text):
+        m = rx.search(text, pos)
+        if m is None:
+            return None
+        raw = m.group(group) or ""
+        value = raw.strip()
+        if value:
+            return value, m.start(group) + (len(raw) - len(raw.lstrip()))
+        # A blank value here may hide a real one in a match starting inside this one
+        pos = m.start() + 1
+    return None
+
+
+class FieldEngine:
+    def __init__(self, templates: Iterable[FieldTemplate]) -> None:
+        self._templates = [_CompiledTemplate(t) for t in templates]
+        detect: list[str] = []
+        self._always: list[_CompiledTemplate] = []
+        self._fallback: list[_CompiledTemplate] = []
+        self._detectors: dict[int, re.Pattern[str]] = {}
+        for i, ct in enumerate(self._templates):
+            t = ct.template
+            if t.fallback:
+                if t.detect:
+                    raise ValueError(f"field template {t.name!r}: a fallback template cannot have detect patterns")
+                self._fallback.append(ct)
+                continue
+            if not t.detect:
+                self._always.append(ct)
+                continue
+            for pattern in t.detect:
+                _check_pattern(t.name, pattern)
+            own = "|".join(_scoped(p, t.ignore_case) for p in t.detect)
+            self._detectors[i] = re.compile(own)
+            # Zero-width alternatives: one template's hit never hides another's
+            detect.append(f"(?=(?P<t{i}>{own}))")
+        self._detect = re.compile("|".join(detect)) if detect else None
+
+    @property
+    def templates(self) -> list[FieldTemplate]:
+        return [ct.template for ct in self._templates]
+
+    def detect(self, text: str) -> list[str]:
+        """Names of the templates that apply to ``text``, in template order."""
+        return [ct.template.name for ct in self._matching(text)]
+
+    def _matching(self, text: str) -> list[_CompiledTemplate]:
+        found: set[int] = set()
+        if self._detect is not None:
+            want = len(self._templates) - len(self._always) - len(self._fallback)
+            for m in self._detect.finditer(text, 0, DETECT_CHARS):
+                found.add(int(m.lastgroup[1:]))  # type: ignore[index]
+                # Only the first alternative is reported at a position: try the others there
+                for i, rx in self._detectors.items():
+                    if i not in found and rx.match(text, m.start(), DETECT_CHARS):
+                        found.add(i)
+                if len(found) == want:
+                    break
+        use = self._always if found else self._always + self._fallback
+        return [ct for i, ct in enumerate(self._templates) if i in found or ct in use]
+
+    def extract(self, text: str) -> list[FieldResult]:
+        """Fields of every applicable template that matched at least one field."""
+        if not text:
+            return []
+        results = [ct.extract(text) for ct in self._matching(text)]
+        return [r for r in results if r.matches]
+
+
+def _read_templates(directory: Path) -> list[FieldTemplate]:
+    out: list[FieldTemplate] = []
+    for path in sorted(directory.glob("*.json")):
+        try:
+            out.append(FieldTemplate.from_dict(json.loads(path.read_text(encoding="utf-8"))))
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            raise ValueError(f"invalid field template {path}: {exc}") from exc
+    return out
+
+
+def load_templates(extra_dir: Optional[Path] = None) -> list[FieldTemplate]:
+    """Built-in templates, then those in ``extra_dir`` (same name replaces built-in)."""
+    templates = {t.name: t for t in _read_templates(BUILTIN_TEMPLATES_DIR)}
+    if extra_dir is not None:
+        if not extra_dir.is_dir():
+            raise ValueError(f"NC_FIELD_TEMPLATES_DIR is not a directory: {extra_dir}")
+        templates.update((t.name, t) for t in _read_templates(extra_dir))
+    return list(templates.values())
+
+
+@lru_cache(maxsize=1)
+def get_field_engine() -> FieldEngine:
+    engine = FieldEngine(load_templates(get_settings().field_templates_dir))
+    logger.info("field_templates_loaded", templates=[t.name for t in engine.templates])
+    return engine
+
+
+def extract_fields(text: str) -> list[FieldResult]:
+    return get_field_engine().extract(text)
+
+
+def fields_elements(results: list[FieldResult]) -> list[dict[str, Any]]:
+    """``fields`` page elements: values as JSON in ``description``, plus template and offsets."""
+    return [
+        {
+            "type": "fields",
+            "description": json.dumps(r.values(), ensure_ascii=False),
+            "template": r.template,
+            "positions": r.positions(),
+        }
+        for r in results
+    ]
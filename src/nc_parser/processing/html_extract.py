@@ -0,0 +1,172 @@
+"""Single-pass HTML extraction.
+
+The page is fed to lxml's HTML parser in chunks with a parser target instead of a tree
+builder, so no DOM is kept in memory: visible text, span-aware tables and boilerplate
+removal come out of the same stream of start/end/data events. Text nodes are joined
+with newlines like ``get_text("\\n")``; repeated short lines (menus, footers) are then
+dropped. Files are decoded incrementally in the encoding ``textio`` detects, and
+feeding stops once the collected text reaches the caller's cap.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from lxml import etree
+
+from nc_parser.processing.normalize import fix_text, normalize_text
+from nc_parser.processing.textio import iter_decoded
+
+
+# Never visible, or page chrome rather than content; everything inside is dropped
+_SKIP = frozenset({
+    "script", "style", "noscript", "head", "title", "meta", "link", "svg",
+    "nav", "header", "footer", "aside",
+})
+_CELLS = frozenset({"td", "th"})
+_CHUNK = 1024 * 1024
+# Lines up to this long are kept only on their first occurrence
+_DEDUP_MAX_LEN = 64
+
+
+@dataclass
+class HtmlContent:
+    text: str
+    # Per table, rows of cell dicts: {"text", "colspan", "rowspan", "header"}
+    tables: list[list[list[dict[str, Any]]]] = field(default_factory=list)
+    truncated: bool = False
+
+
+def _span(value: Optional[str]) -> int:
+    try:
+        return max(1, int(value or 1))
+    except ValueError:
+        return 1
+
+
+class _Target:
+    """lxml parser target collecting text nodes and table cells."""
+
+    def __init__(self) -> None:
+        self.strings: list[str] = []
+        self.tables: list[list[list[dict[str, Any]]]] = []
+        self.chars = 0
+        self._buf: list[str] = []
+        self._skip = 0
+        self._open_tables: list[list[list[dict[str, Any]]]] = []
+        # (cell dict, text nodes) for each open cell; nested cells see their children's text too
+        self._open_cells: list[tuple[dict[str, Any], list[str]]] = []
+
+    def _flush(self) -> None:
+        if not self._buf:
+            return
+        s = "".join(self._buf)
+        self._buf.clear()
+        self.strings.append(s)
+        self.chars += len(s)
+        for _, parts in self._open_cells:
+            parts.append(s)
+
+    def start(self, tag: Any, attrib: Any) -> None:
+        self._flush()
+        if self._skip or tag in _SKIP:
+            self._skip += 1
+            return
+        if tag == "table":
+            self._open_tables.append([])
+        elif not self._open_tables:
+            return
+        elif tag == "tr":
+            self._open_tables[-1].append([])
+        elif tag in _CELLS:
+            rows = self._open_tables[-1]
+            if not rows:
+                rows.append([])
+            cell = {
+                "text": "",
+                "colspan": _span(attrib.get("colspan")),
+                "rowspan": _span(attrib.get("rowspan")),
+                "header": tag == "th",
+            }
+            rows[-1].append(cell)
+            self._open_cells.append((cell, []))
+
+    def end(self, tag: Any) -> None:
+        self._flush()
+        if self._skip:
+            self._skip -= 1
+            return
+        if tag in _CELLS and self._open_cells:
+            cell, parts = self._open_cells.pop()
+            cell["text"] = fix_text("".join(p.strip() for p in parts)).strip()
+        elif tag == "table" and self._open_tables:
+            rows = [r for r in self._open_tables.pop() if r]
+            if rows:
+                self.tables.append(rows)
+
+    def data(self, data: str) -> None:
+        if not self._skip:
+            self._buf.append(data)
+
+    def comment(self, text: str) -> None:
+        # A comment splits the surrounding text into two nodes
+        self._flush()
+
+    def close(self) -> None:
+        self._flush()
+
+
+def _dedup_lines(text: str) -> str:
+    lines: list[str] = []
+    seen: set[str] = set()
+    for ln in text.splitlines():
+        key = ln.strip()
+        if key and len(key) <= _DEDUP_MAX_LEN:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(ln)
+    return "\n".join(lines).strip()
+
+
+def _finish(target: _Target, truncated: bool = False) -> HtmlContent:
+    target.close()
+    text = _dedup_lines(normalize_text("\n".join(target.strings)))
+    if truncated:
+        text += f"\n… truncated after {target.chars} characters"
+    return HtmlContent(text, target.tables, truncated)
+
+
+def _new_parser(target: _Target) -> etree.HTMLParser:
+    return etree.HTMLParser(target=target, huge_tree=True)
+
+
+def extract_html(raw_html: str) -> HtmlContent:
+    target = _Target()
+    parser = _new_parser(target)
+    try:
+        for start in range(0, len(raw_html), _CHUNK):
+            parser.feed(raw_html[start:start + _CHUNK])
+        parser.close()
+    except etree.LxmlError:
+        pass  # empty or hopeless input: keep whatever was read
+    return _finish(target)
+
+
+def extract_html_file(path: Path, max_chars: Optional[int] = None) -> HtmlContent:
+    """Stream a page from disk; stop reading once ``max_chars`` of text are collected."""
+    target = _Target()
+    parser = _new_parser(target)
+    truncated = False
+    try:
+        for chunk in iter_decoded(path):
+            parser.feed(chunk)
+            if max_chars is not None and target.chars > max_chars:
+                truncated = True
+                break
+        parser.close()
+    except etree.LxmlError:
+        pass
+    return _finish(target, truncated)
@@ -0,0 +1,232 @@
+"""Lattice (ruled) table detection on raster pages.
+
+Scans and photos have no vector lines for pdfplumber, so ruled tables are found on the
+image itself: the binarised page is opened with long horizontal and vertical kernels,
+leaving only rules; each connected group of rules with at least two rows or columns of
+cells is a table. Rule positions come from the masks' projections, and whether a rule
+actually separates two neighbouring grid cells is a prefix-sum lookup along that rule,
+so merged cells come out as colspan/rowspan without per-cell image work.
+
+Cell text is read in one OCR call per table: non-empty cells are cropped inside their
+borders, stacked into a single strip image with blank gaps, and tesseract's word boxes
+are mapped back to cells by their vertical position in the strip.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+from pytesseract import Output, image_to_data
+
+from nc_parser.core.settings import get_ocr_langs_resolved
+from nc_parser.processing.normalize import fix_text
+
+
+# Rules are at least 1/_LINE_SCALE of the page width (height) long
+_LINE_SCALE = 40
+# Half-width of the band searched for a rule around its position (px)
+_RULE_BAND = 3
+# A cell boundary is a rule when ink covers this share of it
+_RULE_COVERAGE = 0.6
+# Cells with less ink than this (share of pixels, rules excluded) are not OCRed
+_MIN_INK = 0.002
+_STRIP_GAP = 24
+_STRIP_MAX_HEIGHT = 8000
+_OCR_CONFIG = "--oem 1 --psm 6"
+
+OcrData = Callable[[Image.Image], dict[str, list[Any]]]
+
+
+@dataclass(frozen=True)
+class LatticeCell:
+    row: int
+    col: int
+    rowspan: int
+    colspan: int
+    box: tuple[int, int, int, int]  # x0, y0, x1, y1 in page pixels
+
+
+@dataclass
+class LatticeTable:
+    box: tuple[int, int, int, int]
+    n_rows: int
+    n_cols: int
+    cells: list[LatticeCell]
+
+
+def _line_masks(binary: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    h, w = binary.shape
+    hk = cv2.getStructuringElement(cv2.MORPH_RECT, (max(10, w // _LINE_SCALE), 1))
+    vk = cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(10, h // _LINE_SCALE)))
+    # Bridge small breaks in scanned rules before opening
+    horiz = cv2.morphologyEx(cv2.morphologyEx(binary, cv2.MORPH_CLOSE, np.ones((1, 5), np.uint8)), cv2.MORPH_OPEN, hk)
+    vert = cv2.morphologyEx(cv2.morphologyEx(binary, cv2.MORPH_CLOSE, np.ones((5, 1), np.uint8)), cv2.MORPH_OPEN, vk)
+    return horiz, vert
+
+
+def _positions(profile: np.ndarray, min_len: int, offset: int) -> np.ndarray:
+    """Centres of runs of consecutive indices whose profile reaches ``min_len``."""
+    idx = np.flatnonzero(profile >= min_len)
+    if idx.size == 0:
+        return idx
+    breaks = np.flatnonzero(np.diff(idx) > 1) + 1
+    return np.array([int(run.mean()) for run in np.split(idx, breaks)]) + offset
+
+
+def _band(positions: np.ndarray, size: int) -> np.ndarray:
+    """Indices within ``_RULE_BAND`` of each position, clipped to ``0..size-1``: (n, 2*band+1)."""
+    offsets = np.arange(-_RULE_BAND, _RULE_BAND + 1)
+    return np.clip(positions[:, None] + offsets, 0, size - 1)
+
+
+def _crossed(ys: np.ndarray, xs: np.ndarray, horiz: np.ndarray, vert: np.ndarray) -> np.ndarray:
+    """crossed[i, j]: a horizontal and a vertical rule both pass near (xs[j], ys[i])."""
+    # Every (row, column, dy, dx) window pixel gathered at once
+    at = (_band(ys, horiz.shape[0])[:, None, :, None], _band(xs, horiz.shape[1])[None, :, None, :])
+    return (horiz[at] > 0).any(axis=(2, 3)) & (vert[at] > 0).any(axis=(2, 3))
+
+
+def _coverage(mask: np.ndarray, at: np.ndarray, bounds: np.ndarray, axis: int) -> np.ndarray:
+    """Share of each segment ``bounds[k]..bounds[k+1]`` covered by a rule at each position.
+
+    ``axis=1``: vertical rules at x positions ``at``, segments along y; ``axis=0`` the
+    transpose. The bands around all rules are gathered together and their prefix sums
+    sliced at every boundary at once. Returns shape (len(at), len(bounds) - 1).
+    """
+    m = mask if axis == 1 else mask.T
+    lines = (m[:, _band(at, m.shape[1])] > 0).any(axis=2)  # (length along the rules, rules)
+    cs = np.concatenate((np.zeros((1, len(at)), np.int64), np.cumsum(lines, axis=0)))
+    pad = _RULE_BAND + 1
+    a = bounds[:-1] + pad
+    b = np.maximum(bounds[1:] - pad, a + 1)
+    n = lines.shape[0]
+    return ((cs[np.minimum(b, n)] - cs[np.minimum(a, n)]) / (b - a)[:, None]).T
+
+
+def _grid_cells(xs: np.ndarray, ys: np.ndarray, horiz: np.ndarray, vert: np.ndarray) -> list[LatticeCell]:
+    n_rows, n_cols = len(ys) - 1, len(xs) - 1
+    # v_rule[j - 1, i]: rule between columns j-1 and j in row i; h_rule likewise for rows
+    v_rule = _coverage(vert, xs[1:-1], ys, axis=1) >= _RULE_COVERAGE
+    h_rule = _coverage(horiz, ys[1:-1], xs, axis=0) >= _RULE_COVERAGE
+    # Cells at even coordinates of a doubled grid, joined through the odd ones where no
+    # rule separates them; each 4-connected component is one (possibly merged) cell
+    joined = np.zeros((2 * n_rows - 1, 2 * n_cols - 1), np.uint8)
+    joined[::2, ::2] = 1
+    joined[::2, 1::2] = ~v_rule.T
+    joined[1::2, ::2] = ~h_rule
+    n, _, stats, _ = cv2.connectedComponentsWithStats(joined, connectivity=4)
+    cells = []
+    for left, top, width, height, _area in stats[1:n]:
+        r0, c0 = top // 2, left // 2
+        r1, c1 = (top + height - 1) // 2, (left + width - 1) // 2
+        cells.append(LatticeCell(
+            int(r0), int(c0), int(r1 - r0 + 1), int(c1 - c0 + 1),
+            (int(xs[c0]), int(ys[r0]), int(xs[c1 + 1]), int(ys[r1 + 1])),
+        ))
+    cells.sort(key=lambda c: (c.row, c.col))
+    return cells
+
+
+def detect_tables(gray: np.ndarray) -> tuple[list[LatticeTable], np.ndarray]:
+    """Ruled tables on a grayscale page, and the page's ink mask with rules removed."""
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10)
+    horiz, vert = _line_masks(binary)
+    grid = cv2.bitwise_or(horiz, vert)
+    ink = cv2.bitwise_and(binary, cv2.bitwise_not(cv2.dilate(grid, np.ones((3, 3), np.uint8))))
+    h, w = gray.shape
+    min_h, min_v = max(10, w // _LINE_SCALE), max(10, h // _LINE_SCALE)
+    n, _, stats, _ = cv2.connectedComponentsWithStats(cv2.dilate(grid, np.ones((5, 5), np.uint8)))
+    tables: list[LatticeTable] = []
+    for x, y, bw, bh, _area in stats[1:n]:
+        if bw < 2 * min_h or bh < 2 * min_v:
+            continue
+        sub_h = horiz[y:y + bh, x:x + bw] > 0
+        sub_v = vert[y:y + bh, x:x + bw] > 0
+        ys = _positions(sub_h.sum(axis=1), min_h, y)
+        xs = _positions(sub_v.sum(axis=0), min_v, x)
+        # Strokes of text inside cells can pass the length test; rules meet other rules
+        crossed = _crossed(ys, xs, horiz, vert)
+        ys, xs = ys[crossed.sum(axis=1) >= 2], xs[crossed.sum(axis=0) >= 2]
+        if len(ys) < 2 or len(xs) < 2 or (len(ys) - 1) * (len(xs) - 1) < 2:
+            continue
+        cells = _grid_cells(xs, ys, horiz, vert)
+        if len(cells) < 2:
+            continue
+        tables.append(LatticeTable((int(x), int(y), int(x + bw), int(y + bh)), len(ys) - 1, len(xs) - 1, cells))
+    tables.sort(key=lambda t: (t.box[1], t.box[0]))
+    return tables, ink
+
+
+def _tesseract_data(img: Image.Image) -> dict[str, list[Any]]:
+    return image_to_data(img, lang=get_ocr_langs_resolved(), config=_OCR_CONFIG, output_type=Output.DICT)
+
+
+def _ocr_strip(crops: list[np.ndarray], ocr: OcrData) -> list[str]:
+    """Text of each crop from one OCR call over the crops stacked vertically."""
+    width = max(c.shape[1] for c in crops) + 2 * _STRIP_GAP
+    starts: list[int] = []
+    y = _STRIP_GAP
+    for c in crops:
+        starts.append(y)
+        y += c.shape[0] + _STRIP_GAP
+    canvas = np.full((y, width), 255, np.uint8)
+    for c, top in zip(crops, starts):
+        canvas[top:top + c.shape[0], _STRIP_GAP:_STRIP_GAP + c.shape[1]] = c
+    scale = 2 if float(np.median([c.shape[0] for c in crops])) < 32 else 1
+    if scale > 1:
+        canvas = cv2.resize(canvas, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+    data = ocr(Image.fromarray(canvas))
+    words: list[list[str]] = [[] for _ in crops]
+    for text, top, height in zip(data.get("text", []), data.get("top", []), data.get("height", [])):
+        word = str(text).strip()
+        if not word:
+            continue
+        k = bisect_right(starts, (int(top) + int(height) / 2) / scale) - 1
+        if 0 <= k < len(crops):
+            words[k].append(word)
+    return [" ".join(w) for w in words]
+
+
+def read_table(gray: np.ndarray, ink: np.ndarray, table: LatticeTable, ocr: Optional[OcrData] = None) -> list[list[dict[str, Any]]]:
+    """Rows of cell dicts ({"text", "colspan", "rowspan", "header"}) with OCRed text."""
+    ocr = ocr or _tesseract_data
+    inset = _RULE_BAND + 2
+    texts = [""] * len(table.cells)
+    pending: list[tuple[int, np.ndarray]] = []
+    for k, cell in enumerate(table.cells):
+        x0, y0, x1, y1 = cell.box
+        if x1 - x0 <= 2 * inset or y1 - y0 <= 2 * inset:
+            continue
+        region = (slice(y0 + inset, y1 - inset), slice(x0 + inset, x1 - inset))
+        if float((ink[region] > 0).mean()) < _MIN_INK:
+            continue
+        pending.append((k, gray[region]))
+    # One OCR call per strip; very tall tables are split to stay within tesseract's limits
+    batches: list[list[tuple[int, np.ndarray]]] = [[]]
+    height = 0
+    for k, crop in pending:
+        if batches[-1] and height + crop.shape[0] > _STRIP_MAX_HEIGHT:
+            batches.append([])
+            height = 0
+        batches[-1].append((k, crop))
+        height += crop.shape[0] + _STRIP_GAP
+    for batch in batches:
+        if batch:
+            for (k, _), text in zip(batch, _ocr_strip([c for _, c in batch], ocr)):
+                texts[k] = fix_text(text)
+    rows: list[list[dict[str, Any]]] = [[] for _ in range(table.n_rows)]
+    for cell, text in zip(table.cells, texts):
+        rows[cell.row].append({"text": text, "colspan": cell.colspan, "rowspan": cell.rowspan, "header": False})
+    return [r for r in rows if r]
+
+
+def extract_lattice_tables(image: Image.Image, ocr: Optional[OcrData] = None) -> list[list[list[dict[str, Any]]]]:
+    """Ruled tables of a page image as rows of cell dicts."""
+    gray = np.array(image.convert("L"))
+    tables, ink = detect_tables(gray)
+    return [read_table(gray, ink, t, ocr) for t in tables]
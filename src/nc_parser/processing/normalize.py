@@ -0,0 +1,159 @@
+"""Output text normalisation.
+
+``normalize_text`` makes one pass over the text: ftfy, a translate table for the
+character substitutions, one precompiled regex for runs of spaces, and a single line
+loop that trims and drops UI/noise lines. The result is marked as ``NormalizedText``;
+normalising it again returns it unchanged without any work, so callers do not need to
+track whether a string was already normalised.
+
+``fix_text`` is the drop-in for ``ftfy.fix_text`` used throughout the parser. ftfy is
+slow and on clean input changes nothing, so a cheap detector built from ftfy's own
+character tables looks for anything one of its fixers would act on (mojibake, control
+and odd codepoints, entities, non-NFC text) and ftfy only runs on the lines that have it.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+import ftfy
+from ftfy import chardata
+from ftfy.badness import MOJIBAKE_CATEGORIES, is_bad
+
+from nc_parser.core.worker_metrics import TEXT_FIX_DOCUMENTS, TEXT_FIX_SEGMENTS
+
+
+class NormalizedText(str):
+    """A string produced by ``normalize_text`` (noise dropped); normalising it is a no-op."""
+
+    __slots__ = ()
+
+
+# Codepoints that some ftfy fixer rewrites regardless of context: control and bidi
+# characters, C1 controls, surrogates, ANSI escapes (ESC is a control char), line
+# separators, Latin ligatures, full/halfwidth forms and curly quotes.
+_FTFY_CODEPOINTS = (
+    set(chardata.CONTROL_CHARS)
+    | set(chardata.LIGATURES)
+    | set(chardata.WIDTH_MAP)
+    | {ord(c) for c in "\r\x85\u2028\u2029\u02bc"}
+    | set(range(0x80, 0xA0))
+    | set(range(0x2018, 0x2020))
+)
+_SUSPECT = re.compile(
+    "[" + "".join(re.escape(chr(c)) for c in sorted(_FTFY_CODEPOINTS)) + "\ud800-\udfff]"
+)
+# Every alternative of ftfy's badness regex needs at least one of these characters;
+# the "common" Latin, Greek and Cyrillic letters only count next to one of them.
+_MOJIBAKE_HINT = re.compile(
+    "["
+    + "".join(v for k, v in MOJIBAKE_CATEGORIES.items() if k not in {"common", "lower_common", "upper_common"})
+    + "Œœ°Ђў]"
+)
+_ENTITY = chardata.HTML_ENTITY_RE
+_FTFY_CONFIG = ftfy.TextFixerConfig(explain=False)
+# ftfy's "auto" mode: entities are left alone in text that looks like HTML
+_FTFY_CONFIG_HTML = _FTFY_CONFIG._replace(unescape_html=False)
+
+_DOCS = {o: TEXT_FIX_DOCUMENTS.labels(outcome=o) for o in ("skipped", "unchanged", "changed")}
+_SEGMENTS = {o: TEXT_FIX_SEGMENTS.labels(outcome=o) for o in ("skipped", "unchanged", "changed")}
+
+
+def _needs_ftfy(text: str, entities: bool, confirm: bool = True) -> bool:
+    """Whether some ftfy fixer would change ``text``.
+
+    Without ``confirm`` a mojibake hint character is enough, which spares running ftfy's
+    badness regex (the slow part of the check) over a whole document.
+    """
+    if _SUSPECT.search(text) is not None:
+        return True
+    if entities and "&" in text and _ENTITY.search(text) is not None:
+        return True
+    if text.isascii():
+        return False
+    if not unicodedata.is_normalized("NFC", text):
+        return True
+    if _MOJIBAKE_HINT.search(text) is None:
+        return False
+    return not confirm or is_bad(text)
+
+
+def fix_text(text: str) -> str:
+    """``ftfy.fix_text`` that skips the work on text ftfy would leave unchanged.
+
+    The whole string is checked first; if it is flagged, it is split into lines (ftfy's
+    own segments) and only the flagged lines go through ftfy. HTML entities are
+    unescaped only when the string contains no ``<``.
+    """
+    if not text:
+        return text
+    entities = "<" not in text
+    if not _needs_ftfy(text, entities, confirm=False):
+        _DOCS["skipped"].inc()
+        return text
+    config = _FTFY_CONFIG if entities else _FTFY_CONFIG_HTML
+    parts = text.split("\n")
+    last = len(parts) - 1
+    out: list[str] = []
+    skipped = unchanged = changed = 0
+    for i, part in enumerate(parts):
+        segment = part if i == last else part + "\n"
+        if not segment or not _needs_ftfy(segment, entities):
+            skipped += 1
+            out.append(segment)
+            continue
+        fixed = ftfy.fix_text(segment, config)
+        if fixed == segment:
+            unchanged += 1
+        else:
+            changed += 1
+        out.append(fixed)
+    _SEGMENTS["skipped"].inc(skipped)
+    _SEGMENTS["unchanged"].inc(unchanged)
+    _SEGMENTS["changed"].inc(changed)
+    _DOCS["changed" if changed else "unchanged"].inc()
+    return "".join(out) if changed else text
+
+
+_TRANSLATE = str.maketrans({
+    "\r": None,
+    "\xa0": " ",
+    "\t": " ",
+    "−": "-",  # unicode minus
+})
+_SPACE_RUNS = re.compile(r" {2,}")
+_ALNUM = re.compile(r"[A-Za-z0-9]")
+_LETTER = re.compile(r"[A-Za-zА-Яа-я]")
+
+
+def _is_noise(line: str) -> bool:
+    """Short, mostly-symbol lines: bullets, icons, separators, UI crumbs.
+
+    A line is noise when under 30% of it is ASCII alphanumerics and it is either at
+    most two characters long or contains no Latin/Cyrillic letter at all.
+    """
+    if not line:
+        return False
+    n = len(line)
+    if (n - len(_ALNUM.findall(line))) / n <= 0.7:
+        return False
+    return n <= 2 or _LETTER.search(line) is None
+
+
+def normalize_text(text: str, *, drop_noise: bool = True) -> str:
+    """Fix encoding glitches, unify spaces and dashes, trim lines, drop noise lines."""
+    if not text:
+        return ""
+    if drop_noise and isinstance(text, NormalizedText):
+        return text
+    t = fix_text(text).translate(_TRANSLATE)
+    t = _SPACE_RUNS.sub(" ", t)
+    lines: list[str] = []
+    for line in t.splitlines():
+        line = line.rstrip()
+        if drop_noise and _is_noise(line.lstrip()):
+            continue
+        lines.append(line)
+    out = "\n".join(lines).strip()
+    return NormalizedText(out) if drop_noise else out
@@ -0,0 +1,191 @@
+"""Streaming ODT extraction.
+
+``content.xml`` and ``styles.xml`` are fed straight from the archive to lxml's XML
+parser with a parser target, so no tree is built and memory stays bounded however many
+tables a report has. Tags arrive namespace-qualified, which keeps ``text:p`` apart
+from ``table:table`` and friends without any name guessing. One pass yields:
+
+* one line per paragraph or heading (``text:p`` / ``text:h``) in document order, with
+  ``text:s``/``text:tab``/``text:line-break`` expanded; deleted tracked changes and
+  annotations are skipped;
+* tables as rows of cell dicts with ``number-columns/rows-spanned`` preserved, covered
+  cells dropped and ``table:table-header-rows`` marked as header cells;
+* from ``styles.xml``, the master pages' header and footer paragraphs.
+"""
+
+from __future__ import annotations
+
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from lxml import etree
+
+from nc_parser.processing.normalize import fix_text
+
+
+_TEXT = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+_TABLE = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+_STYLE = "{urn:oasis:names:tc:opendocument:xmlns:style:1.0}"
+_OFFICE = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+
+_PARAGRAPHS = frozenset({_TEXT + "p", _TEXT + "h"})
+_INLINE = {_TEXT + "tab": "\t", _TEXT + "line-break": "\n"}
+_SPACES = _TEXT + "s"
+_SKIP = frozenset({_TEXT + "tracked-changes", _OFFICE + "annotation", _TEXT + "sequence-decls"})
+_HEADERS = frozenset({_STYLE + n for n in ("header", "header-left", "header-first")})
+_FOOTERS = frozenset({_STYLE + n for n in ("footer", "footer-left", "footer-first")})
+_COLS_SPANNED = _TABLE + "number-columns-spanned"
+_ROWS_SPANNED = _TABLE + "number-rows-spanned"
+_SPACE_COUNT = _TEXT + "c"
+_CHUNK = 1024 * 1024
+
+
+@dataclass
+class OdtContent:
+    paragraphs: list[str] = field(default_factory=list)
+    # Per table, rows of cell dicts: {"text", "colspan", "rowspan", "header"}
+    tables: list[list[list[dict[str, Any]]]] = field(default_factory=list)
+    headers: list[str] = field(default_factory=list)
+    footers: list[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.paragraphs)
+
+
+def _int_attr(attrib: Any, name: str) -> int:
+    try:
+        return max(1, int(attrib.get(name) or 1))
+    except ValueError:
+        return 1
+
+
+class _Target:
+    """lxml parser target for one ODF XML part."""
+
+    def __init__(self, out: OdtContent) -> None:
+        self.out = out
+        self._skip = 0
+        # Open paragraphs; note bodies nest paragraphs inside paragraphs
+        self._paras: list[list[str]] = []
+        self._tables: list[list[list[dict[str, Any]]]] = []
+        self._header_rows = 0
+        self._cells: list[tuple[dict[str, Any], list[str]]] = []
+        # Where finished paragraphs go: the body, or a master page header/footer
+        self._sink: list[str] = out.paragraphs
+        self._region_depth = 0
+
+    def start(self, tag: str, attrib: Any) -> None:
+        if self._skip or tag in _SKIP:
+            self._skip += 1
+            return
+        if self._region_depth:
+            self._region_depth += 1
+        if tag in _PARAGRAPHS:
+            self._paras.append([])
+        elif tag == _SPACES:
+            if self._paras:
+                self._paras[-1].append(" " * _int_attr(attrib, _SPACE_COUNT))
+        elif tag in _INLINE:
+            if self._paras:
+                self._paras[-1].append(_INLINE[tag])
+        elif tag == _TABLE + "table":
+            self._tables.append([])
+        elif tag == _TABLE + "table-row":
+            if self._tables:
+                self._tables[-1].append([])
+        elif tag == _TABLE + "table-header-rows":
+            self._header_rows += 1
+        elif tag == _TABLE + "table-cell":
+            if self._tables:
+                rows = self._tables[-1]
+                if not rows:
+                    rows.append([])
+                cell = {
+                    "text": "",
+                    "colspan": _int_attr(attrib, _COLS_SPANNED),
+                    "rowspan": _int_attr(attrib, _ROWS_SPANNED),
+                    "header": self._header_rows > 0,
+                }
+                rows[-1].append(cell)
+                self._cells.append((cell, []))
+        elif tag in _HEADERS or tag in _FOOTERS:
+            self._sink = self.out.headers if tag in _HEADERS else self.out.footers
+            self._region_depth = 1
+
+    def end(self, tag: str) -> None:
+        if self._skip:
+            self._skip -= 1
+            return
+        if tag in _PARAGRAPHS:
+            if self._paras:
+                line = "".join(self._paras.pop())
+                self._sink.append(line)
+                for _, lines in self._cells:
+                    lines.append(line)
+        elif tag == _TABLE + "table-cell":
+            if self._cells:
+                cell, lines = self._cells.pop()
+                cell["text"] = fix_text(" ".join(ln.strip() for ln in lines if ln.strip()))
+        elif tag == _TABLE + "table-header-rows":
+            self._header_rows = max(0, self._header_rows - 1)
+        elif tag == _TABLE + "table":
+            if self._tables:
+                rows = [r for r in self._tables.pop() if r]
+                if rows:
+                    self.out.tables.append(rows)
+        if self._region_depth:
+            self._region_depth -= 1
+            if not self._region_depth:
+                self._sink = self.out.paragraphs
+
+    def data(self, data: str) -> None:
+        if not self._skip and self._paras:
+            self._paras[-1].append(data)
+
+    def close(self) -> None:
+        return None
+
+
+def _feed(zf: zipfile.ZipFile, name: str, target: _Target) -> None:
+    try:
+        member = zf.open(name)
+    except KeyError:
+        return
+    parser = etree.XMLParser(target=target, huge_tree=True, recover=True, resolve_entities=False)
+    with member:
+        while chunk := member.read(_CHUNK):
+            parser.feed(chunk)
+    try:
+        parser.close()
+    except etree.LxmlError:
+        pass  # truncated part: keep what was read
+
+
+def _unique(lines: list[str]) -> list[str]:
+    seen: set[str] = set()
+    out: list[str] = []
+    for ln in lines:
+        key = ln.strip()
+        if key and key not in seen:
+            seen.add(key)
+            out.append(key)
+    return out
+
+
+def read_odt(path: Path) -> Optional[OdtContent]:
+    """Paragraphs, tables and page headers/footers of an ODT file; None if unreadable."""
+    out = OdtContent()
+    try:
+        with zipfile.ZipFile(str(path), "r") as zf:
+            _feed(zf, "content.xml", _Target(out))
+            # styles.xml only contributes master page headers/footers
+            styles = OdtContent()
+            _feed(zf, "styles.xml", _Target(styles))
+    except (OSError, zipfile.BadZipFile, etree.LxmlError):
+        return None
+    out.headers = _unique(styles.headers)
+    out.footers = _unique(styles.footers)
+    return out
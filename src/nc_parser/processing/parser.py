@@ -12,18 +12,23 @@ from pytesseract import image_to_string as ocr_image_to_string
 from bs4 import BeautifulSoup
 import pdfplumber
 from pdf2image import convert_from_path
-import csv
+import json
 import subprocess
-import zipfile
 import re
-import json
 import time
-from charset_normalizer import from_path as detect_encoding_from_path
-import ftfy
 from pypdf import PdfReader
 from nc_parser.core.settings import get_settings, get_ocr_langs_resolved
 from structlog import get_logger
 from nc_parser.processing.captioning import caption_images_with_cache
+from nc_parser.processing.csv_stream import read_csv
+from nc_parser.processing.docx_package import DocxPackage
+from nc_parser.processing.fields import extract_fields, fields_elements
+from nc_parser.processing.html_extract import extract_html_file
+from nc_parser.processing.lattice import extract_lattice_tables
+from nc_parser.processing.normalize import fix_text, normalize_text
+from nc_parser.processing.odt import read_odt
+from nc_parser.processing.pdf_tables import extract_pdf_tables
+from nc_parser.processing.textio import read_text
 
 try:
     from striprtf.striprtf import rtf_to_text  # type: ignore
@@ -41,22 +46,6 @@ class ParsedDocument:
     metrics: dict[str, Any] | None = None
 
 
-def _read_text_file(path: Path) -> str:
-    try:
-        # Try UTF-8 first
-        return path.read_text(encoding="utf-8", errors="strict")
-    except Exception:
-        try:
-            best = detect_encoding_from_path(str(path)).best()
-            if best is not None:
-                return best.output_text(stripped=True)
-        except Exception:
-            pass
-        # Fallback with ignore to always return something
-        txt = path.read_text(encoding="utf-8", errors="ignore")
-        return ftfy.fix_text(txt)
-
-
 def _read_pdf_text(path: Path) -> str:
     return pdf_extract_text(str(path)) or ""
 
@@ -93,7 +82,8 @@ def _read_doc_binary_text(path: Path) -> str:
             timeout=30,
         )
         out = res.stdout.decode("utf-8", errors="ignore")
-        return ftfy.fix_text(out).strip()
+        # Callers pass the text through normalize_text, which runs ftfy
+        return out.strip()
     except Exception:
         return ""
 
@@ -104,7 +94,8 @@ def _read_rtf_text(path: Path) -> str:
             return ""
         raw = path.read_text(encoding="utf-8", errors="ignore")
         txt = rtf_to_text(raw)
-        return ftfy.fix_text(txt).strip()
+        # Callers pass the text through normalize_text, which runs ftfy
+        return txt.strip()
     except Exception:
         return ""
 
@@ -131,96 +122,21 @@ def _rtf_to_html(path: Path) -> str:
         return ""
 
 
-def _read_odt_text(path: Path) -> str:
-    try:
-        with zipfile.ZipFile(str(path), "r") as zf:
-            with zf.open("content.xml") as f:
-                xml = f.read().decode("utf-8", errors="ignore")
-        # Extract visible text; lxml already available
-        soup = BeautifulSoup(xml, "lxml")
-        txt = soup.get_text("\n")
-        return ftfy.fix_text(txt).strip()
-    except Exception:
-        return ""
-
-
-def _normalize_output_text(text: str, *, drop_noise: bool = True) -> str:
-    if not text:
-        return ""
-    t = ftfy.fix_text(text)
-    t = t.replace("\r", "").replace("\xa0", " ")
-    # Normalize unicode minus to hyphen
-    t = t.replace("−", "-")
-    # Collapse excessive spaces but preserve newlines
-    t = re.sub(r"[ \t]+", " ", t)
-    # Trim trailing spaces on lines
-    t = "\n".join(line.rstrip() for line in t.splitlines())
-    if drop_noise:
-        # Strip UI/noise lines: short, mostly symbols
-        def _is_noise(line: str) -> bool:
-            if not line:
-                return False
-            # Remove common bullet-like chars for ratio check
-            cleaned = re.sub(r"[A-Za-z0-9]", "", line)
-            symbol_ratio = (len(cleaned) / max(1, len(line)))
-            if len(line) <= 2 and symbol_ratio > 0.7:
-                return True
-            # Lines with almost no letters and lots of punctuation/symbols
-            letters = len(re.findall(r"[A-Za-zА-Яа-я]", line))
-            if letters == 0 and symbol_ratio > 0.7:
-                return True
-            # UI crumbs like isolated icons repeated
-            if re.fullmatch(r"[•·©®™@©\-_=+~^`\|<>\(\)\[\]{}\\]+", line.strip()):
-                return True
-            return False
-        lines = [ln for ln in t.splitlines() if not _is_noise(ln.strip())]
-        t = "\n".join(lines)
-    return t.strip()
-
+def _is_caption_page(page: dict[str, Any]) -> bool:
+    return any(el.get("type") == "image_caption" for el in page.get("elements") or [])
 
-def _extract_text_from_html(raw_html: str) -> str:
-    try:
-        soup = BeautifulSoup(raw_html, "lxml")
-        for tag in soup(["script", "style", "noscript", "head", "title", "meta", "link", "svg"]):
-            tag.decompose()
-        for tag in soup(["nav", "header", "footer", "aside"]):
-            tag.decompose()
-        text = soup.get_text("\n")
-        text = _normalize_output_text(text)
-        # Deduplicate short lines repeated many times (menus, footers)
-        lines = []
-        seen: dict[str, int] = {}
-        for ln in text.splitlines():
-            key = ln.strip()
-            if not key:
-                lines.append(ln)
-                continue
-            count = seen.get(key, 0)
-            if len(key) <= 64 and count >= 1:
-                continue
-            seen[key] = count + 1
-            lines.append(ln)
-        return "\n".join(lines).strip()
-    except Exception:
-        return _normalize_output_text(BeautifulSoup(raw_html, "lxml").get_text("\n"))
 
+def _finish_pages(pages: list[dict[str, Any]], timings: dict[str, float], metrics: dict[str, Any]) -> ParsedDocument:
+    """Normalise each page once and build full_text by concatenating the page texts.
 
-def _extract_html_tables_rows_from_html(raw_html: str) -> list[list[list[str]]]:
-    # Legacy: keep simple extractor for backward compatibility
-    rows_all: list[list[list[str]]] = []
-    try:
-        soup = BeautifulSoup(raw_html, "lxml")
-        for tbl in soup.find_all("table"):
-            rows: list[list[str]] = []
-            for tr in tbl.find_all("tr"):
-                cells = [c.get_text(strip=True) for c in tr.find_all(["td", "th"])]
-                if cells:
-                    rows.append(cells)
-            if rows:
-                rows_all.append(rows)
-    except Exception:
-        pass
-    return rows_all
+    Caption pages stay out of full_text, as they always have.
+    """
+    t_norm = time.perf_counter()
+    for p in pages:
+        p["text"] = normalize_text(p.get("text", ""))
+    text = "\n\n".join(p["text"] for p in pages if p["text"] and not _is_caption_page(p))
+    timings["normalize_ms"] = (time.perf_counter() - t_norm) * 1000
+    return ParsedDocument(full_text=text, pages=pages, timings_ms=timings, metrics=(metrics or None))
 
 
 def _cells_rows_to_html(cells_rows: list[list[dict[str, Any]]], header_rows: int = 1, with_border: bool = True) -> str:
@@ -333,7 +249,7 @@ def _parse_tables_from_html(raw_html: str) -> list[dict[str, Any]]:
                     colspan = int(c.get("colspan") or 1)
                     rowspan = int(c.get("rowspan") or 1)
                     row_cells.append({
-                        "text": ftfy.fix_text(txt).strip(),
+                        "text": fix_text(txt).strip(),
                         "colspan": colspan,
                         "rowspan": rowspan,
                         "header": is_header,
@@ -355,55 +271,6 @@ def _parse_tables_from_html(raw_html: str) -> list[dict[str, Any]]:
     return out
 
 
-def _extract_docx_tables_rows(path: Path) -> list[list[list[str]]]:
-    out: list[list[list[str]]] = []
-    try:
-        import docx  # type: ignore
-        document = docx.Document(str(path))
-        for tbl in document.tables:
-            rows: list[list[str]] = []
-            for row in tbl.rows:
-                cells = [ftfy.fix_text(cell.text or "").strip() for cell in row.cells]
-                rows.append(cells)
-            if rows:
-                out.append(rows)
-    except Exception:
-        pass
-    return out
-
-
-def _extract_odt_tables_cells_from_xml(xml: str) -> list[list[list[dict[str, Any]]]]:
-    """Return per-table cells with spans preserved for ODT content.xml.
-
-    table:table-cell may have table:number-columns-spanned / table:number-rows-spanned.
-    """
-    tables: list[list[list[dict[str, Any]]]] = []
-    try:
-        soup = BeautifulSoup(xml, "lxml")
-        for tbl in soup.find_all(lambda tag: isinstance(tag.name, str) and tag.name.endswith("table")):
-            table_rows: list[list[dict[str, Any]]] = []
-            for tr in tbl.find_all(lambda tag: isinstance(tag.name, str) and tag.name.endswith("table-row")):
-                row_cells: list[dict[str, Any]] = []
-                cells = tr.find_all(lambda tag: isinstance(tag.name, str) and tag.name.endswith("table-cell"))
-                for c in cells:
-                    txt = c.get_text(strip=True)
-                    colspan = int(c.get("table:number-columns-spanned") or 1)
-                    rowspan = int(c.get("table:number-rows-spanned") or 1)
-                    row_cells.append({
-                        "text": ftfy.fix_text(txt).strip(),
-                        "colspan": colspan,
-                        "rowspan": rowspan,
-                        "header": False,
-                    })
-                if row_cells:
-                    table_rows.append(row_cells)
-            if table_rows:
-                tables.append(table_rows)
-    except Exception:
-        pass
-    return tables
-
-
 def _extract_delimited_table_rows_from_text(text: str) -> list[list[list[str]]]:
     rows_all: list[list[list[str]]] = []
     try:
@@ -459,33 +326,6 @@ def _extract_whitespace_table_rows(text: str) -> list[list[list[str]]]:
     return rows_all
 
 
-def _extract_key_fields_formal_doc(text: str) -> dict[str, str]:
-    fields: dict[str, str] = {}
-    try:
-        def grab(pats: list[str]) -> str:
-            for pat in pats:
-                m = re.search(pat, text, re.IGNORECASE)
-                if m:
-                    return (m.group(1) or '').strip()
-            return ''
-
-        fields["work_permit_no"] = grab([r"Work\s*Permit\s*No\.?[:\-]?\s*([A-Za-z0-9\-\/]+)"])
-        fields["visa_grant_number"] = grab([r"Visa\s+grant\s+number\s*[:\-]?\s*([A-Za-z0-9]+)"])
-        fields["name"] = grab([r"Name\s*[:\-]?\s*([A-Z .'-]+)", r"Name\s+([A-Z .'-]+)"])
-        fields["dob"] = grab([r"Date\s*of\s*Birth\s*[:\-]?\s*([0-9]{1,2}\s*[A-Za-z]{3,}\s*[0-9]{2,4}|[0-9]{2}\/[0-9]{2}\/[0-9]{2,4}|[0-9]{1,2}[A-Z]{3}[0-9]{2,4})"])
-        fields["nationality"] = grab([r"Nationality\s*[:\-]?\s*([A-Za-z ]+)"])
-        fields["passport_no"] = grab([r"Passport(?:\/|\s*or\s*Travel\s*Document)?\s*No\.?[:\-]?\s*([A-Za-z0-9]+)"])
-        fields["employer"] = grab([r"Employer\s*[:\-]?\s*([A-Z0-9 ()&.,'-]+)", r"Name of the Employer\s*([A-Z0-9 ()&.,'-]+)"])
-        fields["position"] = grab([r"(TECHNICAL\s+SUPERVISOR.*|Supervisor.*|Engineer.*|Manager.*)"])
-        fields["date_of_issue"] = grab([r"Date\s*of\s*issue\s*[:\-]?\s*([0-9]{1,2}\s*[A-Za-z]{3,}\s*[0-9]{2,4})"])
-        fields["date_of_expiry"] = grab([r"Date\s*of\s*Expiry\s*[:\-]?\s*([0-9]{1,2}\s*[A-Za-z]{3,}\s*[0-9]{2,4})"])
-        # Drop empty
-        fields = {k: v for k, v in fields.items() if v}
-    except Exception:
-        fields = {}
-    return fields
-
-
 def _extract_pdf_tables_html(path: Path) -> list[str]:
     html_tables: list[str] = []
     try:
@@ -517,7 +357,7 @@ def _read_pdf_text_plumber(path: Path) -> str:
         return ""
 
 
-def _read_pdf_text_hybrid(path: Path) -> str:
+def _read_pdf_text_hybrid(path: Path, tables_out: list[list[list[dict[str, Any]]]] | None = None) -> str:
     """Extract text per-page; if a page has no text, OCR just that page.
 
     Respects NC_OCR_PDF_PAGE_LIMIT for OCR part.
@@ -556,6 +396,7 @@ def _read_pdf_text_hybrid(path: Path) -> str:
                             prefix = f"{path.stem}_p{idx}"
                         text = _ocr_from_pil_image(img, dump_prefix=prefix)
                         texts.append(text)
+                        _collect_raster_tables(img, tables_out)
                     else:
                         texts.append("")
                 except Exception:
@@ -776,7 +617,20 @@ def _ocr_from_pil_image(pil_img: Image.Image, dump_prefix: str | None = None) ->
     return ""
 
 
-def _read_image_text(path: Path) -> str:
+def _collect_raster_tables(img: Image.Image, tables_out: list[list[list[dict[str, Any]]]] | None) -> None:
+    """Ruled tables of a scanned page (see processing/lattice.py), appended to ``tables_out``."""
+    if tables_out is None or not get_settings().ocr_tables_enabled:
+        return
+    try:
+        tables_out.extend(extract_lattice_tables(img))
+    except Exception as e:
+        try:
+            logger.warning("ocr_tables_error", error=str(e))
+        except Exception:
+            pass
+
+
+def _read_image_text(path: Path, tables_out: list[list[list[dict[str, Any]]]] | None = None) -> str:
     settings = get_settings()
     with Image.open(path) as img:
         # Put dumps under file_id folder if possible
@@ -785,7 +639,9 @@ def _read_image_text(path: Path) -> str:
             dump_prefix = f"{file_id_part}/{path.stem}"
         except Exception:
             dump_prefix = path.stem
-        return _ocr_from_pil_image(img, dump_prefix=dump_prefix)
+        text = _ocr_from_pil_image(img, dump_prefix=dump_prefix)
+        _collect_raster_tables(img, tables_out)
+        return text
 
 
 def _pdf_has_text_layer(path: Path) -> bool:
@@ -796,7 +652,7 @@ def _pdf_has_text_layer(path: Path) -> bool:
         return False
 
 
-def _ocr_pdf_pages_to_text(path: Path, dpi: int = 300) -> str:
+def _ocr_pdf_pages_to_text(path: Path, dpi: int = 300, tables_out: list[list[list[dict[str, Any]]]] | None = None) -> str:
     settings = get_settings()
     limit = settings.ocr_pdf_page_limit
     # Use first_page/last_page to avoid rendering all pages
@@ -804,27 +660,10 @@ def _ocr_pdf_pages_to_text(path: Path, dpi: int = 300) -> str:
     texts: list[str] = []
     for img in images:
         texts.append(ocr_image_to_string(img, lang=get_ocr_langs_resolved(), config=f"--psm {settings.ocr_tesseract_psm}"))
+        _collect_raster_tables(img, tables_out)
     return "\n".join(texts)
 
 
-def _extract_pdf_tables_rows(path: Path) -> list[list[list[str]]]:
-    tables_rows: list[list[list[str]]] = []
-    try:
-        with pdfplumber.open(str(path)) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables()
-                for tbl in tables or []:
-                    rows: list[list[str]] = []
-                    for row in tbl:
-                        cells = [(cell or "").strip() for cell in row]
-                        rows.append(cells)
-                    if rows:
-                        tables_rows.append(rows)
-    except Exception:
-        pass
-    return tables_rows
-
-
 def _render_html_table(rows: list[list[str]]) -> str:
     tr_list = [
         "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>"
@@ -837,48 +676,30 @@ def _render_plain_table(rows: list[list[str]]) -> str:
     return "\n".join(" | ".join(row) for row in rows)
 
 
-def _read_docx_text(path: Path) -> str:
-    try:
-        import docx  # type: ignore
-    except Exception:
-        return ""
-    doc = docx.Document(str(path))
-    return "\n".join(p.text for p in doc.paragraphs)
-
-
-def _extract_docx_images_ocr(path: Path) -> list[str]:
-    try:
-        import docx  # type: ignore
-    except Exception:
-        return []
+def _extract_docx_images_ocr(pkg: DocxPackage) -> list[str]:
     texts: list[str] = []
-    document = docx.Document(str(path))
-    # Iterate related parts to find images
+    # Image parts are read one at a time, so only the current scan is in memory
     try:
-        rel_parts = document.part.related_parts
-        for rel_id, part in rel_parts.items():  # type: ignore[assignment]
+        for image in pkg.images():
             try:
-                if getattr(part, "content_type", "").startswith("image/"):
-                    from io import BytesIO
+                from io import BytesIO
 
-                    with Image.open(BytesIO(part.blob)) as img:  # type: ignore[attr-defined]
-                        # Reuse image OCR pipeline
-                        tmp_path = path  # not used; call OCR directly on PIL image
-                        # Preprocess similar to _read_image_text
-                        im = img
-                        try:
-                            if max(im.size) < 1200:
-                                im = im.resize((im.width * 2, im.height * 2), Image.LANCZOS)
-                            im = im.convert("L")
-                            im = im.point(lambda x: 0 if x < 140 else 255, "1")
-                        except Exception:
-                            pass
-                        configs = ["--oem 1 --psm 6", "--oem 1 --psm 3", "--oem 1 --psm 11"]
-                        for cfg in configs:
-                            t = ocr_image_to_string(im, lang=get_settings().ocr_langs, config=cfg).strip()
-                            if t:
-                                texts.append(t)
-                                break
+                with Image.open(BytesIO(pkg.read_image(image))) as img:
+                    # Preprocess similar to _read_image_text
+                    im = img
+                    try:
+                        if max(im.size) < 1200:
+                            im = im.resize((im.width * 2, im.height * 2), Image.LANCZOS)
+                        im = im.convert("L")
+                        im = im.point(lambda x: 0 if x < 140 else 255, "1")
+                    except Exception:
+                        pass
+                    configs = ["--oem 1 --psm 6", "--oem 1 --psm 3", "--oem 1 --psm 11"]
+                    for cfg in configs:
+                        t = ocr_image_to_string(im, lang=get_settings().ocr_langs, config=cfg).strip()
+                        if t:
+                            texts.append(t)
+                            break
             except Exception:
                 continue
     except Exception:
@@ -924,7 +745,7 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
     metrics: dict[str, Any] = {}
     t_step = time.perf_counter()
     if ftype == "txt" or (suffix in {".txt", ""} and ftype is None):
-        text = _read_text_file(path)
+        text = read_text(path, get_settings().text_max_mb * 1024 * 1024).text
         timings["txt_read_ms"] = (time.perf_counter() - t_step) * 1000
     elif ftype == "pdf" or suffix == ".pdf":
         t_pdf = time.perf_counter()
@@ -935,15 +756,17 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
         t_layer = time.perf_counter()
         has_text_layer = _pdf_has_text_layer(path)
         timings["pdf_text_layer_check_ms"] = (time.perf_counter() - t_layer) * 1000
+        # Ruled tables found on pages that had to be OCRed
+        ocr_tables: list[list[list[dict[str, Any]]]] = []
         if has_text_layer:
             # Hybrid: try per-page; OCR only empty pages
             t_txt = time.perf_counter()
-            text = _read_pdf_text_hybrid(path) or _read_pdf_text_plumber(path) or _read_pdf_text(path)
+            text = _read_pdf_text_hybrid(path, ocr_tables) or _read_pdf_text_plumber(path) or _read_pdf_text(path)
             timings["pdf_text_extract_ms"] = (time.perf_counter() - t_txt) * 1000
             if not text:
                 # Fallback to OCR for tricky text-layer PDFs
                 t_ocr = time.perf_counter()
-                text = _ocr_pdf_pages_to_text(path)
+                text = _ocr_pdf_pages_to_text(path, tables_out=ocr_tables)
                 timings["pdf_ocr_pages_ms"] = (time.perf_counter() - t_ocr) * 1000
         else:
             # Guard rails for OCR on big docs
@@ -958,10 +781,11 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
                 text = ""  # skip OCR
             else:
                 t_ocr = time.perf_counter()
-                text = _ocr_pdf_pages_to_text(path)
+                text = _ocr_pdf_pages_to_text(path, tables_out=ocr_tables)
                 timings["pdf_ocr_pages_ms"] = (time.perf_counter() - t_ocr) * 1000
         t_tbl = time.perf_counter()
-        tables = _extract_pdf_tables_rows(path)
+        tables, probes = extract_pdf_tables(path, force=get_settings().pdf_tables_force)
+        metrics["pdf_table_pages"] = [p.as_metric() for p in probes]
         timings["pdf_tables_ms"] = (time.perf_counter() - t_tbl) * 1000
         pages: list[dict[str, Any]] = [{"index": 0, "text": text}]
         # OCR embedded images if text is still weak
@@ -1036,9 +860,11 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
                     })
         except Exception:
             pass
-        if tables:
+        if tables or ocr_tables:
             tables_html = [_render_html_table(rows) for rows in tables]
             tables_plain = [_render_plain_table(rows) for rows in tables]
+            tables_html += [_cells_rows_to_html(rows, header_rows=1, with_border=True) for rows in ocr_tables]
+            tables_plain += [_render_plain_table(_cells_rows_to_plain_grid(rows)) for rows in ocr_tables]
             # Add tables page with HTML elements and plain text content
             elements = [{"type": "table_html", "description": html} for html in tables_html]
             pages.append({"index": 1, "text": "\n\n".join(tables_plain), "elements": elements})
@@ -1046,60 +872,74 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
             text = (text + "\n\n" + "\n\n".join(tables_plain)).strip()
         # Extract key fields
         t_fields = time.perf_counter()
-        fields = _extract_key_fields_formal_doc(text)
+        fields = extract_fields(text)
         if fields:
-            pages.append({"index": len(pages), "text": "", "elements": [{"type": "fields", "description": json.dumps(fields, ensure_ascii=False)}]})
+            pages.append({"index": len(pages), "text": "", "elements": fields_elements(fields)})
         timings["fields_extract_ms"] = timings.get("fields_extract_ms", 0.0) + (time.perf_counter() - t_fields) * 1000
-        t_norm = time.perf_counter()
-        text = _normalize_output_text(text)
-        for p in pages:
-            p["text"] = _normalize_output_text(p.get("text", ""))
-        timings["normalize_ms"] = (time.perf_counter() - t_norm) * 1000
-        return ParsedDocument(full_text=text, pages=pages, timings_ms=timings, metrics=(metrics or None))
+        return _finish_pages(pages, timings, metrics)
     elif ftype in {"png", "jpg"} or suffix in {".png", ".jpg", ".jpeg", ".bmp", ".tiff"}:
         t_img = time.perf_counter()
-        text = _normalize_output_text(_read_image_text(path))
+        ocr_tables = []
+        text = normalize_text(_read_image_text(path, ocr_tables))
         timings["image_ocr_ms"] = (time.perf_counter() - t_img) * 1000
+        if ocr_tables:
+            tables_plain = [_render_plain_table(_cells_rows_to_plain_grid(rows)) for rows in ocr_tables]
+            pages = [
+                {"index": 0, "text": text},
+                {
+                    "index": 1,
+                    "text": "\n\n".join(tables_plain),
+                    "elements": [
+                        {"type": "table_html", "description": _cells_rows_to_html(rows, header_rows=1, with_border=True)}
+                        for rows in ocr_tables
+                    ],
+                },
+            ]
+            return _finish_pages(pages, timings, metrics)
     elif ftype == "docx" or suffix in {".docx"}:
-        t_docx = time.perf_counter()
-        text = _read_docx_text(path)
-        timings["docx_text_ms"] = (time.perf_counter() - t_docx) * 1000
-        # OCR for embedded images
-        t_img = time.perf_counter()
-        image_texts = _extract_docx_images_ocr(path)
-        timings["docx_images_ocr_ms"] = (time.perf_counter() - t_img) * 1000
-        # Extract tables
-        t_tbl = time.perf_counter()
-        docx_tables = _extract_docx_tables_rows(path)
-        timings["docx_tables_ms"] = (time.perf_counter() - t_tbl) * 1000
-        tables_html = [_render_html_table(rows) for rows in docx_tables]
-        tables_plain = [_render_plain_table(rows) for rows in docx_tables]
-        pages: list[dict[str, Any]] = []
-        if text:
-            pages.append({"index": 0, "text": text})
-        if image_texts:
-            pages.append({
-                "index": len(pages),
-                "text": "\n\n".join(image_texts),
-                "elements": [{"type": "image_ocr", "description": t} for t in image_texts],
-            })
-            text = (text + "\n\n" + "\n\n".join(image_texts)).strip()
-        # Optional captioning for embedded images in DOCX — batch with caching and heuristics
-        try:
-            if get_settings().captioning_enabled:
-                settings = get_settings()
-                t_cap = time.perf_counter()
-                images_for_caption: list[Image.Image] = []
-                try:
-                    import docx  # type: ignore
-                    document = docx.Document(str(path))
-                    rel_parts = document.part.related_parts
-                    for rel_id, part in rel_parts.items():  # type: ignore[assignment]
-                        if getattr(part, "content_type", "").startswith("image/"):
+        # One open package for text, tables, notes and images; parts are streamed, not loaded
+        with DocxPackage(path) as pkg:
+            t_docx = time.perf_counter()
+            body = pkg.body()
+            text = "\n".join(body.paragraphs)
+            page_elements = (
+                [{"type": "page_header", "description": h} for h in pkg.headers()]
+                + [{"type": "page_footer", "description": f} for f in pkg.footers()]
+                + [{"type": "footnote", "description": n} for n in pkg.notes()]
+            )
+            timings["docx_text_ms"] = (time.perf_counter() - t_docx) * 1000
+            # OCR for embedded images
+            t_img = time.perf_counter()
+            image_texts = _extract_docx_images_ocr(pkg)
+            timings["docx_images_ocr_ms"] = (time.perf_counter() - t_img) * 1000
+            # Tables come from the same body pass; only rendering is timed here
+            t_tbl = time.perf_counter()
+            tables_html = [_cells_rows_to_html(rows, header_rows=1, with_border=True) for rows in body.tables]
+            tables_plain = [_render_plain_table(_cells_rows_to_plain_grid(rows)) for rows in body.tables]
+            timings["docx_tables_ms"] = (time.perf_counter() - t_tbl) * 1000
+            pages: list[dict[str, Any]] = []
+            if text or page_elements:
+                pages.append({"index": 0, "text": text})
+                if page_elements:
+                    pages[0]["elements"] = page_elements
+            if image_texts:
+                pages.append({
+                    "index": len(pages),
+                    "text": "\n\n".join(image_texts),
+                    "elements": [{"type": "image_ocr", "description": t} for t in image_texts],
+                })
+                text = (text + "\n\n" + "\n\n".join(image_texts)).strip()
+            # Optional captioning for embedded images in DOCX — batch with caching and heuristics
+            try:
+                if get_settings().captioning_enabled:
+                    settings = get_settings()
+                    t_cap = time.perf_counter()
+                    images_for_caption: list[Image.Image] = []
+                    try:
+                        for image in pkg.images():
                             from io import BytesIO
                             try:
-                                bio = BytesIO(part.blob)  # type: ignore[attr-defined]
-                                img = Image.open(bio)
+                                img = Image.open(BytesIO(pkg.read_image(image)))
                                 img.load()
                             except Exception:
                                 continue
@@ -1123,47 +963,42 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
                             images_for_caption.append(img)
                             if len(images_for_caption) >= max(1, settings.caption_max_images_per_doc):
                                 break
-                except Exception:
-                    images_for_caption = []
-                cap_texts: list[str] = []
-                if images_for_caption:
-                    caps, cap_metrics = caption_images_with_cache(images_for_caption)
-                    cap_texts = [c.text for c in caps if c.text]
-                    try:
-                        metrics["caption"] = {"count": len(caps), **cap_metrics}
                     except Exception:
-                        pass
-                timings["docx_caption_ms"] = (time.perf_counter() - t_cap) * 1000
-                if cap_texts:
-                    pages.append({
-                        "index": len(pages),
-                        "text": "\n\n".join(cap_texts),
-                        "elements": [{"type": "image_caption", "description": c.text, "model": c.model} for c in caps if c.text],
-                    })
-        except Exception:
-            pass
-        if tables_plain:
-            pages.append({
-                "index": len(pages),
-                "text": "\n\n".join(tables_plain),
-                "elements": [{"type": "table_html", "description": html} for html in tables_html],
-            })
-            text = (text + "\n\n" + "\n\n".join(tables_plain)).strip()
-        # Extract key fields
-        t_fields = time.perf_counter()
-        fields = _extract_key_fields_formal_doc(text)
-        if fields:
-            pages.append({"index": len(pages), "text": "", "elements": [{"type": "fields", "description": json.dumps(fields, ensure_ascii=False)}]})
-        timings["fields_extract_ms"] = timings.get("fields_extract_ms", 0.0) + (time.perf_counter() - t_fields) * 1000
-        t_norm = time.perf_counter()
-        text = _normalize_output_text(text)
-        for p in pages:
-            p["text"] = _normalize_output_text(p.get("text", ""))
-        timings["normalize_ms"] = (time.perf_counter() - t_norm) * 1000
-        return ParsedDocument(full_text=text, pages=pages if pages else [], timings_ms=timings, metrics=(metrics or None))
+                        images_for_caption = []
+                    cap_texts: list[str] = []
+                    if images_for_caption:
+                        caps, cap_metrics = caption_images_with_cache(images_for_caption)
+                        cap_texts = [c.text for c in caps if c.text]
+                        try:
+                            metrics["caption"] = {"count": len(caps), **cap_metrics}
+                        except Exception:
+                            pass
+                    timings["docx_caption_ms"] = (time.perf_counter() - t_cap) * 1000
+                    if cap_texts:
+                        pages.append({
+                            "index": len(pages),
+                            "text": "\n\n".join(cap_texts),
+                            "elements": [{"type": "image_caption", "description": c.text, "model": c.model} for c in caps if c.text],
+                        })
+            except Exception:
+                pass
+            if tables_plain:
+                pages.append({
+                    "index": len(pages),
+                    "text": "\n\n".join(tables_plain),
+                    "elements": [{"type": "table_html", "description": html} for html in tables_html],
+                })
+                text = (text + "\n\n" + "\n\n".join(tables_plain)).strip()
+            # Extract key fields
+            t_fields = time.perf_counter()
+            fields = extract_fields(text)
+            if fields:
+                pages.append({"index": len(pages), "text": "", "elements": fields_elements(fields)})
+            timings["fields_extract_ms"] = timings.get("fields_extract_ms", 0.0) + (time.perf_counter() - t_fields) * 1000
+            return _finish_pages(pages, timings, metrics)
     elif suffix == ".doc":
         t_doc = time.perf_counter()
-        text = _normalize_output_text(_read_doc_binary_text(path))
+        text = normalize_text(_read_doc_binary_text(path))
         timings["doc_text_ms"] = (time.perf_counter() - t_doc) * 1000
         # Try to extract simple delimited tables from text
         t_tbl = time.perf_counter()
@@ -1183,19 +1018,14 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
             text = (text + "\n\n" + "\n\n".join(tables_plain)).strip()
         # Extract known fields
         t_fields = time.perf_counter()
-        fields = _extract_key_fields_formal_doc(text)
+        fields = extract_fields(text)
         if fields:
-            pages.append({"index": len(pages), "text": "", "elements": [{"type": "fields", "description": json.dumps(fields, ensure_ascii=False)}]})
+            pages.append({"index": len(pages), "text": "", "elements": fields_elements(fields)})
         timings["fields_extract_ms"] = timings.get("fields_extract_ms", 0.0) + (time.perf_counter() - t_fields) * 1000
-        t_norm = time.perf_counter()
-        text = _normalize_output_text(text)
-        for p in pages:
-            p["text"] = _normalize_output_text(p.get("text", ""))
-        timings["normalize_ms"] = (time.perf_counter() - t_norm) * 1000
-        return ParsedDocument(full_text=text, pages=pages, timings_ms=timings, metrics=(metrics or None))
+        return _finish_pages(pages, timings, metrics)
     elif ftype == "rtf" or suffix == ".rtf":
         t_rtf = time.perf_counter()
-        text = _normalize_output_text(_read_rtf_text(path))
+        text = normalize_text(_read_rtf_text(path))
         timings["rtf_text_ms"] = (time.perf_counter() - t_rtf) * 1000
         # Prefer HTML-rendered tables from unrtf to preserve spans/headers
         t_tbl = time.perf_counter()
@@ -1225,42 +1055,33 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
             })
             text = (text + "\n\n" + "\n\n".join(tables_plain)).strip()
         t_fields = time.perf_counter()
-        fields = _extract_key_fields_formal_doc(text)
+        fields = extract_fields(text)
         if fields:
-            pages.append({"index": len(pages), "text": "", "elements": [{"type": "fields", "description": json.dumps(fields, ensure_ascii=False)}]})
+            pages.append({"index": len(pages), "text": "", "elements": fields_elements(fields)})
         timings["fields_extract_ms"] = timings.get("fields_extract_ms", 0.0) + (time.perf_counter() - t_fields) * 1000
-        t_norm = time.perf_counter()
-        text = _normalize_output_text(text)
-        for p in pages:
-            p["text"] = _normalize_output_text(p.get("text", ""))
-        timings["normalize_ms"] = (time.perf_counter() - t_norm) * 1000
-        return ParsedDocument(full_text=text, pages=pages, timings_ms=timings, metrics=(metrics or None))
+        return _finish_pages(pages, timings, metrics)
     elif suffix == ".odt":
-        # Extract text and tables from content.xml
+        # Paragraphs, span-aware tables and page headers/footers in one streaming pass
         t_odt = time.perf_counter()
-        try:
-            with zipfile.ZipFile(str(path), "r") as zf:
-                xml = zf.open("content.xml").read().decode("utf-8", errors="ignore")
-        except Exception:
-            xml = ""
-        text = _normalize_output_text(BeautifulSoup(xml, "lxml").get_text("\n") if xml else _read_odt_text(path))
+        odt = read_odt(path)
+        text = normalize_text(odt.text) if odt else ""
         timings["odt_text_ms"] = (time.perf_counter() - t_odt) * 1000
         t_tbl = time.perf_counter()
-        cells_tables = _extract_odt_tables_cells_from_xml(xml) if xml else []
         tables_html: list[str] = []
         tables_plain: list[str] = []
-        if cells_tables:
-            for cells_rows in cells_tables:
-                html = _cells_rows_to_html(cells_rows, header_rows=1, with_border=True)
-                grid = _cells_rows_to_plain_grid(cells_rows)
-                tables_html.append(html)
-                tables_plain.append(_render_plain_table(grid))
+        for cells_rows in odt.tables if odt else []:
+            tables_html.append(_cells_rows_to_html(cells_rows, header_rows=1, with_border=True))
+            tables_plain.append(_render_plain_table(_cells_rows_to_plain_grid(cells_rows)))
         if not tables_plain:
             heur_rows = _extract_whitespace_table_rows(text)
             tables_html = [_render_html_table(rows) for rows in heur_rows]
             tables_plain = [_render_plain_table(rows) for rows in heur_rows]
         timings["odt_tables_ms"] = (time.perf_counter() - t_tbl) * 1000
         pages = [{"index": 0, "text": text}]
+        if odt and (odt.headers or odt.footers):
+            pages[0]["elements"] = [{"type": "page_header", "description": h} for h in odt.headers] + [
+                {"type": "page_footer", "description": f} for f in odt.footers
+            ]
         if tables_plain:
             pages.append({
                 "index": 1,
@@ -1269,64 +1090,45 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
             })
             text = (text + "\n\n" + "\n\n".join(tables_plain)).strip()
         t_fields = time.perf_counter()
-        fields = _extract_key_fields_formal_doc(text)
+        fields = extract_fields(text)
         if fields:
-            pages.append({"index": len(pages), "text": "", "elements": [{"type": "fields", "description": json.dumps(fields, ensure_ascii=False)}]})
+            pages.append({"index": len(pages), "text": "", "elements": fields_elements(fields)})
         timings["fields_extract_ms"] = timings.get("fields_extract_ms", 0.0) + (time.perf_counter() - t_fields) * 1000
-        t_norm = time.perf_counter()
-        text = _normalize_output_text(text)
-        for p in pages:
-            p["text"] = _normalize_output_text(p.get("text", ""))
-        timings["normalize_ms"] = (time.perf_counter() - t_norm) * 1000
-        return ParsedDocument(full_text=text, pages=pages, timings_ms=timings, metrics=(metrics or None))
+        return _finish_pages(pages, timings, metrics)
     elif ftype == "csv" or suffix in {".csv"}:
-        # Parse CSV to HTML table and plain text
+        # Streamed in row batches; the table preview and plain text are capped, the summary covers every row
         try:
-            # Detect encoding
-            enc_text = None
-            try:
-                best = detect_encoding_from_path(str(path)).best()
-                if best is not None:
-                    enc_text = best.output_text(stripped=False)
-            except Exception:
-                enc_text = None
-            rows: list[list[str]] = []
-            if enc_text is not None:
-                # Read from normalized text
-                for line in ftfy.fix_text(enc_text).splitlines():
-                    # Use csv reader on a list with single line to preserve parsing rules
-                    for row in csv.reader([line]):
-                        rows.append([col.strip(" \t\ufeff") for col in row])
-            else:
-                with path.open("r", encoding="utf-8", errors="ignore", newline="") as f:
-                    reader = csv.reader(f)
-                    for row in reader:
-                        rows.append([ftfy.fix_text(col).strip(" \t\ufeff") for col in row])
-            html = _render_html_table(rows)
-            plain = _normalize_output_text(_render_plain_table(rows))
-            pages = [
-                {"index": 0, "text": plain, "elements": [{"type": "table_html", "description": html}]}
+            settings = get_settings()
+            content = read_csv(
+                path,
+                html_max_rows=settings.csv_html_max_rows,
+                text_max_chars=settings.csv_text_max_mb * 1024 * 1024,
+            )
+            elements = [
+                {"type": "table_html", "description": content.html},
+                {"type": "csv_summary", "description": json.dumps(content.summary(), ensure_ascii=False)},
             ]
+            pages = [{"index": 0, "text": content.text, "elements": elements}]
             timings["csv_parse_ms"] = (time.perf_counter() - t_step) * 1000
-            return ParsedDocument(full_text=plain, pages=pages, timings_ms=timings, metrics=(metrics or None))
+            return ParsedDocument(full_text=content.text, pages=pages, timings_ms=timings, metrics=(metrics or None))
         except Exception:
             text = ""
     elif suffix in {".md", ".markdown"}:
         # Simple markdown strip: remove fenced code markers and headers
         t_md = time.perf_counter()
-        raw = _read_text_file(path)
+        raw = read_text(path, get_settings().text_max_mb * 1024 * 1024).text
         text = raw.replace("```", "\n").replace("#", "").strip()
         timings["md_text_ms"] = (time.perf_counter() - t_md) * 1000
     elif ftype == "html" or suffix in {".html", ".htm"}:
         t_html = time.perf_counter()
-        raw = _read_text_file(path)
-        text = _extract_text_from_html(raw)
+        # One streaming pass yields text and span-aware tables
+        content = extract_html_file(path, get_settings().text_max_mb * 1024 * 1024)
+        text = content.text
         timings["html_text_ms"] = (time.perf_counter() - t_html) * 1000
         t_tbl = time.perf_counter()
-        html_tables_rows = _extract_html_tables_rows_from_html(raw)
+        tables_html = [_cells_rows_to_html(rows, header_rows=1, with_border=True) for rows in content.tables]
+        tables_plain = [_render_plain_table(_cells_rows_to_plain_grid(rows)) for rows in content.tables]
         timings["html_tables_ms"] = (time.perf_counter() - t_tbl) * 1000
-        tables_html = [_render_html_table(rows) for rows in html_tables_rows]
-        tables_plain = [_render_plain_table(rows) for rows in html_tables_rows]
         pages = [{"index": 0, "text": text}]
         if tables_plain:
             pages.append({
@@ -1336,15 +1138,15 @@ def parse_document_to_text(path: Path) -> ParsedDocument:
             })
             text = (text + "\n\n" + "\n\n".join(tables_plain)).strip()
         t_fields = time.perf_counter()
-        fields = _extract_key_fields_formal_doc(text)
+        fields = extract_fields(text)
         if fields:
-            pages.append({"index": len(pages), "text": "", "elements": [{"type": "fields", "description": json.dumps(fields, ensure_ascii=False)}]})
+            pages.append({"index": len(pages), "text": "", "elements": fields_elements(fields)})
         timings["fields_extract_ms"] = timings.get("fields_extract_ms", 0.0) + (time.perf_counter() - t_fields) * 1000
         return ParsedDocument(full_text=text, pages=pages, timings_ms=timings, metrics=(metrics or None))
     else:
         text = ""
     t_norm_end = time.perf_counter()
-    text = _normalize_output_text(text)
+    text = normalize_text(text)
     timings["normalize_ms"] = timings.get("normalize_ms", 0.0) + (time.perf_counter() - t_norm_end) * 1000
     pages = [{"index": 0, "text": text}] if text else []
     return ParsedDocument(full_text=text, pages=pages, timings_ms=timings, metrics=(metrics or None))
@@ -0,0 +1,241 @@
+"""Table-presence prefilter for PDF pages.
+
+``pdfplumber``'s ``extract_tables`` (default "lines" strategy) builds cells only from
+ruling edges: stroked or filled lines, rectangle sides and curve segments. A page
+without at least two horizontal and two vertical edges cannot produce a table, yet
+asking for its tables still costs a full pdfminer layout analysis of the page.
+
+The probe reads each page's content stream with pypdf instead, without laying out any
+text: text objects are cut out, the remaining operators are tokenised, painted path
+segments (``re``, ``m``/``l``/``h``, curve chords) are mapped through the current
+transformation matrix, including into form XObjects, and the distinct horizontal and
+vertical rule positions are counted with pdfplumber's 3 pt tolerances, collinear
+pieces (dashes, dots) joined first. Clipping paths (ended by ``n``) are not drawn and
+do not count. Only candidate pages are handed to pdfplumber; ``NC_PDF_TABLES_FORCE``
+sends every page, as before.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import pdfplumber
+from pypdf import PdfReader
+
+from nc_parser.core.worker_metrics import PDF_TABLE_PAGES
+
+
+# pdfplumber's edge_min_length and snap/join tolerances (points)
+_MIN_EDGE = 3.0
+_SNAP = 3.0
+_MIN_PIECE = 1.0  # edge_min_length_prefilter: shorter pieces are dropped before joining
+_MAX_FORM_DEPTH = 8
+
+_TEXT_OBJECT = re.compile(rb"\bBT\b.*?\bET\b", re.S)
+_TOKEN = re.compile(
+    rb"\((?:\\.|[^\\)])*\)"  # string literal (skipped)
+    rb"|<<|>>|<[0-9A-Fa-f\s]*>"  # dict delimiters, hex string (skipped)
+    rb"|%[^\r\n]*"  # comment (skipped)
+    rb"|/[^\s/\[\]()<>{}%]*"  # name
+    rb"|[-+]?(?:\d+\.?\d*|\.\d+)"  # number
+    rb"|[A-Za-z'\"*]+"  # operator
+)
+_PAINT = frozenset({b"S", b"s", b"f", b"F", b"f*", b"B", b"B*", b"b", b"b*"})
+_CLOSING_PAINT = frozenset({b"s", b"b", b"b*"})
+
+Matrix = tuple[float, float, float, float, float, float]
+_IDENTITY: Matrix = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def _mul(m: Matrix, n: Matrix) -> Matrix:
+    """``m`` applied first, then ``n`` (PDF row-vector convention)."""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (
+        a * a2 + b * c2, a * b2 + b * d2,
+        c * a2 + d * c2, c * b2 + d * d2,
+        e * a2 + f * c2 + e2, e * b2 + f * d2 + f2,
+    )
+
+
+def _apply(m: Matrix, x: float, y: float) -> tuple[float, float]:
+    return m[0] * x + m[2] * y + m[4], m[1] * x + m[3] * y + m[5]
+
+
+@dataclass(frozen=True)
+class PageProbe:
+    page: int  # 1-based
+    candidate: bool
+    reason: str  # ruling|no_ruling|forced|probe_error
+    h_rules: int = 0  # distinct horizontal rule positions
+    v_rules: int = 0
+
+    def as_metric(self) -> dict[str, Any]:
+        return {"page": self.page, "candidate": self.candidate, "reason": self.reason, "h": self.h_rules, "v": self.v_rules}
+
+
+class _Rules:
+    """Rule positions, bucketed by the snap tolerance, from merged collinear segments.
+
+    Like pdfplumber's ``merge_edges``, pieces on the same line are joined across gaps of
+    up to ``_SNAP`` before the length check, so dashed and dotted rules count.
+    """
+
+    def __init__(self) -> None:
+        self._h: dict[int, list[tuple[float, float]]] = {}
+        self._v: dict[int, list[tuple[float, float]]] = {}
+
+    def segment(self, p: tuple[float, float], q: tuple[float, float]) -> None:
+        (x0, y0), (x1, y1) = p, q
+        if abs(y0 - y1) < 0.5 and abs(x0 - x1) >= _MIN_PIECE:
+            self._h.setdefault(round((y0 + y1) / 2 / _SNAP), []).append((min(x0, x1), max(x0, x1)))
+        elif abs(x0 - x1) < 0.5 and abs(y0 - y1) >= _MIN_PIECE:
+            self._v.setdefault(round((x0 + x1) / 2 / _SNAP), []).append((min(y0, y1), max(y0, y1)))
+
+    @staticmethod
+    def _count(lines: dict[int, list[tuple[float, float]]]) -> int:
+        count = 0
+        for pieces in lines.values():
+            pieces.sort()
+            lo, hi = pieces[0]
+            longest = 0.0
+            for a, b in pieces[1:]:
+                if a <= hi + _SNAP:
+                    hi = max(hi, b)
+                else:
+                    longest = max(longest, hi - lo)
+                    lo, hi = a, b
+            if max(longest, hi - lo) >= _MIN_EDGE:
+                count += 1
+        return count
+
+    @property
+    def h(self) -> int:
+        return self._count(self._h)
+
+    @property
+    def v(self) -> int:
+        return self._count(self._v)
+
+
+def _scan(content: bytes, resources: Any, ctm: Matrix, rules: _Rules, depth: int) -> None:
+    stack: list[Matrix] = []
+    operands: list[Any] = []
+    path: list[tuple[tuple[float, float], tuple[float, float]]] = []
+    start: Optional[tuple[float, float]] = None
+    current: Optional[tuple[float, float]] = None
+    inline_image = False
+    for m in _TOKEN.finditer(_TEXT_OBJECT.sub(b" ", content)):
+        tok = m.group()
+        first = tok[:1]
+        if inline_image:
+            inline_image = tok != b"EI"
+            continue
+        if first in b"(<%" or tok == b">>":
+            operands.clear()
+            continue
+        if first == b"/":
+            operands.append(tok[1:])
+            continue
+        if first.isdigit() or first in b"+-.":
+            operands.append(float(tok))
+            continue
+        nums = [o for o in operands if isinstance(o, float)]
+        if tok == b"re" and len(nums) >= 4:
+            x, y, w, h = nums[-4:]
+            corners = [_apply(ctm, *pt) for pt in ((x, y), (x + w, y), (x + w, y + h), (x, y + h))]
+            path.extend(zip(corners, corners[1:] + corners[:1]))
+            start = current = corners[0]
+        elif tok == b"m" and len(nums) >= 2:
+            start = current = _apply(ctm, *nums[-2:])
+        elif tok in (b"l", b"c", b"v", b"y") and len(nums) >= 2 and current is not None:
+            nxt = _apply(ctm, *nums[-2:])  # a curve counts by its chord, like its edge in pdfplumber
+            path.append((current, nxt))
+            current = nxt
+        elif tok == b"h" and current is not None and start is not None:
+            path.append((current, start))
+            current = start
+        elif tok in _PAINT:
+            if tok in _CLOSING_PAINT and current is not None and start is not None:
+                path.append((current, start))
+            for seg in path:
+                rules.segment(*seg)
+            path.clear()
+        elif tok == b"n":
+            path.clear()  # clipping path: never drawn
+        elif tok == b"q":
+            stack.append(ctm)
+        elif tok == b"Q":
+            ctm = stack.pop() if stack else ctm
+        elif tok == b"cm" and len(nums) >= 6:
+            ctm = _mul(tuple(nums[-6:]), ctm)  # type: ignore[arg-type]
+        elif tok == b"Do" and operands and isinstance(operands[-1], bytes) and depth < _MAX_FORM_DEPTH:
+            _scan_form(operands[-1].decode("latin-1"), resources, ctm, rules, depth)
+        elif tok == b"ID":
+            inline_image = True
+        operands.clear()
+
+
+def _scan_form(name: str, resources: Any, ctm: Matrix, rules: _Rules, depth: int) -> None:
+    try:
+        form = resources["/XObject"]["/" + name].get_object()
+    except (KeyError, TypeError, AttributeError):
+        return
+    if form.get("/Subtype") != "/Form":
+        return
+    matrix = tuple(float(v) for v in form.get("/Matrix", _IDENTITY))
+    inner = form.get("/Resources")
+    _scan(form.get_data(), inner.get_object() if inner is not None else resources, _mul(matrix, ctm), rules, depth + 1)  # type: ignore[arg-type]
+
+
+def probe_page(page: Any, number: int) -> PageProbe:
+    """Decide from a pypdf page whether pdfplumber could find a ruled table on it."""
+    try:
+        contents = page.get_contents()
+        rules = _Rules()
+        if contents is not None:
+            resources = page.get("/Resources")
+            _scan(contents.get_data(), resources.get_object() if resources is not None else {}, _IDENTITY, rules, 0)
+    except Exception:
+        return PageProbe(number, True, "probe_error")
+    h, v = rules.h, rules.v
+    candidate = h >= 2 and v >= 2
+    return PageProbe(number, candidate, "ruling" if candidate else "no_ruling", h, v)
+
+
+def probe_pdf(path: Path, force: bool = False) -> list[PageProbe]:
+    reader = PdfReader(str(path))
+    if force:
+        return [PageProbe(i, True, "forced") for i in range(1, len(reader.pages) + 1)]
+    return [probe_page(page, i) for i, page in enumerate(reader.pages, start=1)]
+
+
+def extract_pdf_tables(path: Path, force: bool = False) -> tuple[list[list[list[str]]], list[PageProbe]]:
+    """Tables (rows of stripped cell strings) from candidate pages, and every page's probe."""
+    tables_rows: list[list[list[str]]] = []
+    try:
+        probes = probe_pdf(path, force)
+    except Exception:
+        # Unreadable for pypdf: let pdfplumber try every page
+        probes = []
+        force = True
+    try:
+        with pdfplumber.open(str(path)) as pdf:
+            if force and not probes:
+                probes = [PageProbe(i, True, "forced") for i in range(1, len(pdf.pages) + 1)]
+            for probe in probes:
+                if not probe.candidate or probe.page > len(pdf.pages):
+                    continue
+                for tbl in pdf.pages[probe.page - 1].extract_tables() or []:
+                    rows = [[(cell or "").strip() for cell in row] for row in tbl]
+                    if rows:
+                        tables_rows.append(rows)
+    except Exception:
+        pass
+    extracted = sum(p.candidate for p in probes)
+    PDF_TABLE_PAGES.labels(outcome="extracted").inc(extracted)
+    PDF_TABLE_PAGES.labels(outcome="skipped").inc(len(probes) - extracted)
+    return tables_rows, probes
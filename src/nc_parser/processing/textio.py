@@ -0,0 +1,220 @@
+"""Bounded-memory reading of plain-text inputs (TXT, Markdown, HTML, CSV).
+
+Files up to three samples long (192 KiB) are checked whole; larger ones by three 64 KiB
+samples (start, middle, end): a byte-order mark wins, then strict UTF-8 if every sample
+decodes, then charset_normalizer on the samples. The file is then decoded incrementally
+and handed out in line-aligned chunks, so a multi-GB log costs one chunk of memory plus
+whatever the caller keeps; ``read_text`` stops reading once its character cap is
+reached. When UTF-8 was only inferred from samples and an unsampled region turns out
+not to be UTF-8, the encoding is detected again from that region and decoding goes on
+with it, instead of replacing the rest of the file with U+FFFD.
+"""
+
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from charset_normalizer import from_bytes as detect_encoding_from_bytes
+
+from nc_parser.processing.normalize import NormalizedText, normalize_text
+
+
+SAMPLE_BYTES = 64 * 1024
+_CHUNK = 1024 * 1024
+_MAX_LINE = 8 * _CHUNK
+_UTF16_BOMS = (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+_LINE_END = re.compile(r"\r\n|\r|\n")
+
+
+def _is_utf8(sample: bytes) -> bool:
+    try:
+        # Not final: a sample may end in the middle of a multi-byte sequence
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _skip_continuation(sample: bytes) -> bytes:
+    """Drop UTF-8 continuation bytes a sample taken mid-file may start with."""
+    i = 0
+    while i < min(3, len(sample)) and 0x80 <= sample[i] <= 0xBF:
+        i += 1
+    return sample[i:]
+
+
+def detect_file_encoding(path: Path) -> str:
+    """Codec for ``path``; UTF-8 is reported as ``utf-8-sig`` so a BOM is dropped on read."""
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        if size <= 3 * SAMPLE_BYTES:
+            head = f.read()
+            samples = [head]
+        else:
+            head = f.read(SAMPLE_BYTES)
+            samples = [head]
+            for offset in (size // 2, size - SAMPLE_BYTES):
+                f.seek(offset)
+                samples.append(_skip_continuation(f.read(SAMPLE_BYTES)))
+    if head.startswith(_UTF16_BOMS):
+        return "utf-16"
+    return _detect_samples(samples)
+
+
+def _detect_samples(samples: list[bytes]) -> str:
+    if all(_is_utf8(s) for s in samples):
+        return "utf-8-sig"
+    # Only lines with non-ASCII bytes tell the codecs apart; pages of ASCII around a
+    # short legacy passage would otherwise make every single-byte codec look as good
+    informative = b"\n".join(line for s in samples for line in s.splitlines() if not line.isascii())
+    best = detect_encoding_from_bytes(informative[: 3 * SAMPLE_BYTES]).best()
+    return best.encoding if best is not None else "utf-8-sig"
+
+
+class DecodedFile:
+    """Decoded chunks of a file as read from disk; undecodable bytes become U+FFFD.
+
+    ``encoding`` is the codec in use, updated when a detected UTF-8 is contradicted by
+    a region the detection did not sample.
+    """
+
+    def __init__(self, path: Path, encoding: Optional[str] = None) -> None:
+        self.path = path
+        self.encoding = encoding or detect_file_encoding(path)
+        # Only an inferred UTF-8 is re-checked; an explicit codec is taken as given
+        self._verify_utf8 = encoding is None and self.encoding == "utf-8-sig"
+
+    def __iter__(self) -> Iterator[str]:
+        if self._verify_utf8:
+            yield from self._iter_verified()
+            return
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        with self.path.open("rb") as f:
+            while chunk := f.read(_CHUNK):
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def _iter_verified(self) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="strict")
+        first = True
+        with self.path.open("rb") as f:
+            while chunk := f.read(_CHUNK):
+                if first and chunk.startswith(codecs.BOM_UTF8):
+                    chunk = chunk[len(codecs.BOM_UTF8):]
+                first = False
+                pending, _ = decoder.getstate()
+                try:
+                    text = decoder.decode(chunk)
+                except UnicodeDecodeError as exc:
+                    data = pending + chunk
+                    # Everything up to the last line break before the bad byte is UTF-8
+                    cut = data.rfind(b"\n", 0, exc.start) + 1
+                    if cut:
+                        yield data[:cut].decode("utf-8")
+                    yield from self._switch(f, data[cut:])
+                    return
+                if text:
+                    yield text
+        decoder.decode(b"", final=True)
+
+    def _switch(self, f: BinaryIO, data: bytes) -> Iterator[str]:
+        """Detect the codec again from ``data`` (the rest of the file follows in ``f``)."""
+        sample = data[:SAMPLE_BYTES]
+        if len(sample) < SAMPLE_BYTES:
+            sample += f.read(SAMPLE_BYTES - len(sample))
+            data = sample
+        encoding = _detect_samples([sample])
+        self.encoding = "utf-8" if encoding == "utf-8-sig" else encoding
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        while data:
+            text = decoder.decode(data)
+            if text:
+                yield text
+            data = f.read(_CHUNK)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+
+def iter_decoded(path: Path, encoding: Optional[str] = None) -> DecodedFile:
+    """Decoded chunks of ``path`` (see ``DecodedFile``)."""
+    return DecodedFile(path, encoding)
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Lines, ends kept, from decoded chunks, split like a ``newline=""`` file (for ``csv.reader``)."""
+    carry = ""
+    for chunk in chunks:
+        text = carry + chunk
+        start = 0
+        for m in _LINE_END.finditer(text):
+            if m.end() == len(text) and m.group() == "\r":
+                break  # may be the first half of "\r\n"
+            yield text[start:m.end()]
+            start = m.end()
+        carry = text[start:]
+    if carry:
+        yield carry
+
+
+def iter_text(path: Path, encoding: Optional[str] = None) -> Iterator[str]:
+    """Normalised text of ``path`` in chunks that end on line boundaries."""
+    return _normalized_chunks(DecodedFile(path, encoding))
+
+
+def _normalized_chunks(chunks: Iterable[str]) -> Iterator[str]:
+    carry = ""
+    for chunk in chunks:
+        chunk = carry + chunk
+        cut = max(chunk.rfind("\n"), chunk.rfind("\r")) + 1
+        if not cut:
+            if len(chunk) < _MAX_LINE:
+                carry = chunk  # wait for the end of the line
+                continue
+            cut = len(chunk)  # no line breaks at all: split anyway to bound memory
+        carry = chunk[cut:]
+        text = normalize_text(chunk[:cut])
+        if text:
+            yield text
+    text = normalize_text(carry)
+    if text:
+        yield text
+
+
+@dataclass
+class TextContent:
+    text: str
+    encoding: str
+    truncated: bool = False
+
+
+def read_text(path: Path, max_chars: Optional[int] = None) -> TextContent:
+    """Normalised text of ``path``, at most ``max_chars`` plus a truncation marker."""
+    decoded = DecodedFile(path)
+    parts: list[str] = []
+    total = 0
+    truncated = False
+    for chunk in _normalized_chunks(decoded):
+        if max_chars is not None and total + len(chunk) > max_chars:
+            head = chunk[: max(0, max_chars - total)]
+            head = head[: head.rfind("\n") + 1].rstrip()
+            if head:
+                parts.append(head)
+                total += len(head) + 1
+            truncated = True
+            break
+        parts.append(chunk)
+        total += len(chunk) + 1
+    text = "\n".join(parts)
+    if truncated:
+        text += f"\n… truncated after {total} characters"
+    # Every chunk is already normalised (noise lines dropped); keep it from being redone
+    return TextContent(NormalizedText(text), decoded.encoding, truncated)
@@ -0,0 +1,113 @@
+"""Async facade over ``storage.files`` for the API.
+
+Every storage call does blocking file I/O, so routes must not call ``storage.files``
+directly from the event loop. The functions here run the blocking implementation on
+worker threads bounded by ``NC_STORAGE_IO_THREADS``, which keeps a burst of uploads
+from starving the loop (and ``/healthz``) or the default threadpool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Optional, TypeVar
+from uuid import UUID
+
+from anyio import CapacityLimiter, to_thread
+
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import batches, files
+
+
+T = TypeVar("T")
+
+# One limiter per event loop: anyio primitives must not be shared across loops (tests
+# create a fresh loop per client).
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CapacityLimiter]" = weakref.WeakKeyDictionary()
+
+
+def _limiter() -> CapacityLimiter:
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = CapacityLimiter(max(1, get_settings().storage_io_threads))
+        _limiters[loop] = limiter
+    return limiter
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking callable on the bounded storage I/O pool."""
+    return await to_thread.run_sync(partial(func, *args, **kwargs), limiter=_limiter())
+
+
+async def init_upload(
+    filename: Optional[str] = None,
+    size_bytes: Optional[int] = None,
+    checksum: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+) -> UUID:
+    return await run_blocking(
+        files.init_upload, filename=filename, size_bytes=size_bytes, checksum=checksum, chunk_size=chunk_size
+    )
+
+
+async def append_chunk(file_id: UUID, index: int, data: bytes, checksum: Optional[str] = None) -> str:
+    return await run_blocking(files.append_chunk, file_id, index, data, checksum=checksum)
+
+
+async def chunk_status(file_id: UUID) -> dict[str, Any]:
+    return await run_blocking(files.chunk_status, file_id)
+
+
+async def assemble_file(file_id: UUID) -> Path:
+    return await run_blocking(files.assemble_file, file_id)
+
+
+async def save_single_shot_stream(fileobj: BinaryIO, filename: Optional[str]) -> UUID:
+    return await run_blocking(files.save_single_shot_stream, fileobj, filename)
+
+
+async def read_meta(file_id: UUID) -> files.UploadMeta:
+    return await run_blocking(files.read_meta, file_id)
+
+
+async def sha256_file(path: Path) -> str:
+    return await run_blocking(files.sha256_file, path)
+
+
+async def upload_sha256(file_id: UUID, path: Path) -> str:
+    return await run_blocking(files.upload_sha256, file_id, path)
+
+
+async def save_celery_task_id(file_id: UUID, task_id: str) -> None:
+    await run_blocking(files.save_celery_task_id, file_id, task_id)
+
+
+async def read_result(file_id: UUID) -> dict[str, Any]:
+    return await run_blocking(files.read_result, file_id)
+
+
+async def delete_all(file_id: UUID) -> None:
+    await run_blocking(files.delete_all, file_id)
+
+
+async def write_status(file_id: UUID, status: str, **kwargs: Any) -> None:
+    await run_blocking(files.write_status, file_id, status, **kwargs)
+
+
+async def read_status(file_id: UUID) -> dict[str, Any]:
+    return await run_blocking(files.read_status, file_id)
+
+
+async def read_job_status(file_id: UUID) -> dict[str, Any]:
+    return await run_blocking(files.read_job_status, file_id)
+
+
+async def read_job_statuses(file_ids: list[UUID]) -> list[dict[str, Any]]:
+    return await run_blocking(files.read_job_statuses, file_ids)
+
+
+async def read_batch_status(batch_id: UUID) -> dict[str, Any]:
+    return await run_blocking(batches.read_batch_status, batch_id)
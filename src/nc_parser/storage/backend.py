@@ -0,0 +1,352 @@
+"""Blob storage backends for uploaded payloads and results.
+
+Keys mirror the data directory layout (``uploads/ab/cd/<file_id>/<name>``). The
+filesystem backend keeps everything under ``NC_DATA_DIR`` as before; the S3 backend
+(``NC_STORAGE_BACKEND=s3``) keeps payloads and results in a bucket, so the API and the
+workers no longer need a shared volume. Upload sessions (chunks, ledger) stay on the
+API node that received them until the upload is complete; ``meta.json``, worker
+artifacts and the expiry index (``expiry/<hour>/<file_id>``) are written through the
+backend so any node can read and clean them up.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional
+from uuid import uuid4
+
+from nc_parser.core.settings import get_settings
+
+try:
+    import boto3  # type: ignore
+    from boto3.s3.transfer import TransferConfig  # type: ignore
+    from botocore.config import Config as BotoConfig  # type: ignore
+    from botocore.exceptions import ClientError  # type: ignore
+except Exception:  # pragma: no cover
+    boto3 = None  # type: ignore
+
+
+# Ranges closer than this are fetched with one GET and split locally
+_RANGE_MERGE_GAP = 256 * 1024
+
+
+class StorageBackend:
+    """Key/value blob store interface.
+
+    Missing keys raise FileNotFoundError, like the filesystem they replace.
+    """
+
+    name: str = "unknown"
+    # True when keys are plain files under NC_DATA_DIR, i.e. data is already in place
+    local: bool = False
+
+    def put_file(self, key: str, path: Path) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def put_stream(self, key: str, fileobj: BinaryIO) -> int:  # pragma: no cover - interface
+        """Store a stream without buffering it whole; returns the number of bytes stored."""
+        raise NotImplementedError
+
+    def get_bytes(self, key: str) -> bytes:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def get_ranges(self, key: str, ranges: list[list[int]]) -> list[bytes]:  # pragma: no cover - interface
+        """Bytes of each ``[offset, length]`` range, in the given order."""
+        raise NotImplementedError
+
+    def download(self, key: str, dest: Path) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def list_keys(self, prefix: str) -> list[str]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def list_dirs(self, prefix: str) -> list[str]:  # pragma: no cover - interface
+        """Names of the "directories" directly under ``prefix`` (which ends with ``/``)."""
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix: str) -> int:  # pragma: no cover - interface
+        """Delete every key under ``prefix``; returns how many were removed."""
+        raise NotImplementedError
+
+
+def _replace_into(dest: Path, write: Callable[[Path], None]) -> None:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{uuid4().hex}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class FilesystemBackend(StorageBackend):
+    """Keys are paths relative to a root directory (``NC_DATA_DIR`` by default)."""
+
+    name = "fs"
+    local = True
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        return self._root if self._root is not None else get_settings().data_dir
+
+    def path(self, key: str) -> Path:
+        parts = [p for p in key.split("/") if p]
+        if any(p in {".", ".."} for p in parts):
+            raise ValueError(f"invalid key: {key!r}")
+        return self.root.joinpath(*parts)
+
+    def put_file(self, key: str, path: Path) -> None:
+        dest = self.path(key)
+        if dest.exists() and dest.samefile(path):
+            return
+        _replace_into(dest, lambda tmp: shutil.copyfile(path, tmp))
+
+    def put_stream(self, key: str, fileobj: BinaryIO) -> int:
+        size = 0
+
+        def write(tmp: Path) -> None:
+            nonlocal size
+            with tmp.open("wb") as w:
+                shutil.copyfileobj(fileobj, w, 1024 * 1024)
+                size = w.tell()
+
+        _replace_into(self.path(key), write)
+        return size
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.path(key).read_bytes()
+
+    def get_ranges(self, key: str, ranges: list[list[int]]) -> list[bytes]:
+        with self.path(key).open("rb") as f:
+            out = []
+            for start, length in ranges:
+                f.seek(start)
+                out.append(f.read(length))
+            return out
+
+    def download(self, key: str, dest: Path) -> None:
+        src = self.path(key)
+        if not src.exists():
+            raise FileNotFoundError(key)
+        _replace_into(dest, lambda tmp: shutil.copyfile(src, tmp))
+
+    def list_keys(self, prefix: str) -> list[str]:
+        base = self.path(prefix)
+        if base.is_file():
+            return [prefix]
+        if not base.exists():
+            return []
+        root = self.root
+        return sorted(p.relative_to(root).as_posix() for p in base.rglob("*") if p.is_file())
+
+    def list_dirs(self, prefix: str) -> list[str]:
+        base = self.path(prefix)
+        if not base.is_dir():
+            return []
+        return sorted(p.name for p in base.iterdir() if p.is_dir())
+
+    def delete_prefix(self, prefix: str) -> int:
+        target = self.path(prefix)
+        if target.is_file():
+            target.unlink(missing_ok=True)
+            return 1
+        if not target.exists():
+            return 0
+        count = sum(1 for p in target.rglob("*") if p.is_file())
+        shutil.rmtree(target, ignore_errors=True)
+        return count
+
+
+def _merge_ranges(ranges: list[list[int]]) -> list[tuple[int, int, list[int]]]:
+    """Group ranges into (start, end, member indices) spans that are cheaper as one GET."""
+    order = sorted(range(len(ranges)), key=lambda i: ranges[i][0])
+    spans: list[tuple[int, int, list[int]]] = []
+    for i in order:
+        start, length = ranges[i]
+        end = start + length
+        if spans and start - spans[-1][1] <= _RANGE_MERGE_GAP:
+            s, e, members = spans[-1]
+            spans[-1] = (s, max(e, end), members + [i])
+        else:
+            spans.append((start, end, [i]))
+    return spans
+
+
+class _CountingReader:
+    """Read-only view of a stream that counts bytes and leaves the stream open."""
+
+    def __init__(self, fileobj: BinaryIO) -> None:
+        self._f = fileobj
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self.count += len(data)
+        return data
+
+
+class S3Backend(StorageBackend):
+    """S3-compatible object store (AWS, MinIO, Ceph RGW).
+
+    One pooled client per process; large objects go up as multipart uploads and come
+    down as parallel ranged GETs via the boto3 transfer manager.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        max_pool_connections: int = 32,
+        part_size_mb: int = 16,
+        transfer_concurrency: int = 4,
+    ) -> None:
+        if boto3 is None:
+            raise RuntimeError("NC_STORAGE_BACKEND=s3 requires the `s3` extra (boto3)")
+        if not bucket:
+            raise RuntimeError("NC_STORAGE_BACKEND=s3 requires NC_S3_BUCKET")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            config=BotoConfig(
+                max_pool_connections=max(1, max_pool_connections),
+                retries={"max_attempts": 5, "mode": "adaptive"},
+            ),
+        )
+        part = max(5, part_size_mb) * 1024 * 1024  # S3 minimum part size is 5 MiB
+        self._transfer = TransferConfig(
+            multipart_threshold=part,
+            multipart_chunksize=part,
+            max_concurrency=max(1, transfer_concurrency),
+            use_threads=transfer_concurrency > 1,
+        )
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key.lstrip("/")
+
+    @staticmethod
+    def _not_found(exc: Exception) -> bool:
+        code = str(getattr(exc, "response", {}).get("Error", {}).get("Code", ""))
+        return code in {"NoSuchKey", "404", "NotFound"}
+
+    def put_file(self, key: str, path: Path) -> None:
+        self._client.upload_file(str(path), self.bucket, self._key(key), Config=self._transfer)
+
+    def put_stream(self, key: str, fileobj: BinaryIO) -> int:
+        reader = _CountingReader(fileobj)
+        self._client.upload_fileobj(reader, self.bucket, self._key(key), Config=self._transfer)
+        return reader.count
+
+    def _get(self, key: str, byte_range: Optional[str] = None) -> bytes:
+        kwargs = {"Bucket": self.bucket, "Key": self._key(key)}
+        if byte_range:
+            kwargs["Range"] = byte_range
+        try:
+            return self._client.get_object(**kwargs)["Body"].read()
+        except ClientError as exc:
+            if self._not_found(exc):
+                raise FileNotFoundError(key) from exc
+            raise
+
+    def get_bytes(self, key: str) -> bytes:
+        return self._get(key)
+
+    def get_ranges(self, key: str, ranges: list[list[int]]) -> list[bytes]:
+        out: list[bytes] = [b""] * len(ranges)
+        for start, end, members in _merge_ranges(ranges):
+            if end <= start:
+                continue
+            blob = self._get(key, f"bytes={start}-{end - 1}")
+            for i in members:
+                offset, length = ranges[i]
+                out[i] = blob[offset - start:offset - start + length]
+        return out
+
+    def download(self, key: str, dest: Path) -> None:
+        def write(tmp: Path) -> None:
+            try:
+                self._client.download_file(self.bucket, self._key(key), str(tmp), Config=self._transfer)
+            except ClientError as exc:
+                if self._not_found(exc):
+                    raise FileNotFoundError(key) from exc
+                raise
+
+        _replace_into(dest, write)
+
+    def list_keys(self, prefix: str) -> list[str]:
+        keys: list[str] = []
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            keys.extend(obj["Key"][len(self.prefix):] for obj in page.get("Contents", []))
+        return keys
+
+    def list_dirs(self, prefix: str) -> list[str]:
+        full = self._key(prefix)
+        names: list[str] = []
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=full, Delimiter="/"):
+            names.extend(p["Prefix"][len(full):].rstrip("/") for p in page.get("CommonPrefixes", []))
+        return names
+
+    def delete_prefix(self, prefix: str) -> int:
+        keys = self.list_keys(prefix)
+        for i in range(0, len(keys), 1000):
+            batch = [{"Key": self._key(k)} for k in keys[i:i + 1000]]
+            self._client.delete_objects(Bucket=self.bucket, Delete={"Objects": batch, "Quiet": True})
+        return len(keys)
+
+
+class BlobDir:
+    """A "directory" of blobs under one key prefix, as read by ``storage.results``."""
+
+    def __init__(self, backend: StorageBackend, prefix: str) -> None:
+        self.backend = backend
+        self.prefix = prefix.rstrip("/")
+
+    def read_bytes(self, name: str) -> bytes:
+        return self.backend.get_bytes(f"{self.prefix}/{name}")
+
+    def read_ranges(self, name: str, ranges: list[list[int]]) -> list[bytes]:
+        return self.backend.get_ranges(f"{self.prefix}/{name}", ranges)
+
+
+@lru_cache(maxsize=4)
+def _s3_backend(
+    bucket: str,
+    prefix: str,
+    endpoint_url: Optional[str],
+    region: Optional[str],
+    max_pool_connections: int,
+    part_size_mb: int,
+    transfer_concurrency: int,
+) -> S3Backend:
+    # Cached so the process shares one client (and its connection pool)
+    return S3Backend(bucket, prefix, endpoint_url, region, max_pool_connections, part_size_mb, transfer_concurrency)
+
+
+def get_storage_backend() -> StorageBackend:
+    """Backend selected by ``NC_STORAGE_BACKEND`` (``fs`` or ``s3``)."""
+    s = get_settings()
+    if (s.storage_backend or "fs").lower() == "s3":
+        return _s3_backend(
+            s.s3_bucket or "",
+            s.s3_prefix or "",
+            s.s3_endpoint_url,
+            s.s3_region,
+            s.s3_max_pool_connections,
+            s.s3_part_size_mb,
+            s.s3_transfer_concurrency,
+        )
+    return FilesystemBackend()
@@ -0,0 +1,163 @@
+"""Batch submissions: many files stored together and queued with one broker message.
+
+A batch record lives at ``data/batches/<batch_id>.json`` (and under ``batches/`` in the
+object store with ``NC_STORAGE_BACKEND=s3``) and lists its members; the members
+themselves are ordinary uploads with their own status and result, so every per-file
+endpoint keeps working. Batch progress is aggregated from member statuses. Records are
+indexed for expiry like uploads and deleted together with their members.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import time
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Iterable, Optional
+from uuid import UUID, uuid4
+
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import files
+from nc_parser.storage.backend import get_storage_backend
+
+
+def _batch_path(batch_id: UUID) -> Path:
+    return get_settings().data_dir / "batches" / f"{batch_id}.json"
+
+
+def _batch_key(batch_id: UUID) -> str:
+    return f"batches/{batch_id}.json"
+
+
+def _safe_name(name: Optional[str]) -> Optional[str]:
+    # Member names come from the client (or a zip); keep the base name only
+    base = PurePosixPath((name or "").replace("\\", "/")).name
+    return base if base not in {"", ".", ".."} else None
+
+
+def create_batch(sources: Iterable[tuple[BinaryIO, Optional[str]]]) -> dict[str, Any]:
+    """Store every source as an upload, mark all queued at once and write the batch record.
+
+    Raises ValueError when the batch is empty or exceeds ``NC_BATCH_MAX_FILES``.
+    """
+    limit = get_settings().batch_max_files
+    members: list[dict[str, Any]] = []
+    try:
+        for fileobj, filename in sources:
+            if len(members) >= limit:
+                raise ValueError(f"batch exceeds {limit} files")
+            file_id = files.store_complete_upload(fileobj, _safe_name(filename))
+            members.append({"file_id": str(file_id), "filename": _safe_name(filename)})
+        if not members:
+            raise ValueError("batch contains no files")
+    except Exception:
+        # A rejected batch must not leave half of its files behind
+        for m in members:
+            files.delete_all(UUID(m["file_id"]))
+        raise
+    files.write_status_many([UUID(m["file_id"]) for m in members], status="queued", progress=0.0)
+    record = {
+        "batch_id": str(uuid4()),
+        "created_ts": time.time(),
+        # Pre-assigned so the record is written once, before the broker publish
+        "celery_task_id": str(uuid4()),
+        "files": members,
+    }
+    batch_id = UUID(record["batch_id"])
+    raw = json.dumps(record, ensure_ascii=False)
+    path = _batch_path(batch_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(raw, encoding="utf-8")
+    backend = get_storage_backend()
+    if not backend.local:
+        backend.put_stream(_batch_key(batch_id), io.BytesIO(raw.encode("utf-8")))
+    _record_expiry(batch_id, record["created_ts"])
+    return record
+
+
+def _record_expiry(batch_id: UUID, created_ts: float) -> None:
+    from nc_parser.storage.retention import record_batch_expiry  # retention builds on this module
+
+    record_batch_expiry(batch_id, created_ts)
+
+
+def fail_batch(record: dict[str, Any], error: str) -> None:
+    """Mark every member failed, e.g. when the batch could not be handed to the broker."""
+    files.write_status_many([UUID(m["file_id"]) for m in record.get("files") or []], status="failed", error=error)
+
+
+def delete_batch(batch_id: UUID) -> None:
+    """Delete the batch record and every member job; a missing batch is not an error."""
+    try:
+        record = read_batch(batch_id)
+    except FileNotFoundError:
+        record = {}
+    for member in record.get("files") or []:
+        files.delete_all(UUID(member["file_id"]))
+    _batch_path(batch_id).unlink(missing_ok=True)
+    backend = get_storage_backend()
+    if not backend.local:
+        backend.delete_prefix(_batch_key(batch_id))
+
+
+def iter_archive(fileobj: BinaryIO) -> Iterable[tuple[BinaryIO, Optional[str]]]:
+    """Regular files of a zip archive as (stream, name), skipping directories and OS metadata.
+
+    Raises ValueError for anything that is not a zip archive.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile as exc:
+        raise ValueError("archive is not a valid zip file") from exc
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/") or PurePosixPath(name).name.startswith("._"):
+                continue
+            with archive.open(info) as member:
+                yield member, name
+
+
+def read_batch(batch_id: UUID) -> dict[str, Any]:
+    """The batch record; from the object store when another node created the batch."""
+    try:
+        return json.loads(_batch_path(batch_id).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        backend = get_storage_backend()
+        if backend.local:
+            raise
+        return json.loads(backend.get_bytes(_batch_key(batch_id)))
+
+
+def _member_progress(st: dict[str, Any]) -> float:
+    if st.get("status") in {"done", "failed"}:
+        return 1.0
+    return float(st.get("progress") or 0.0)
+
+
+def read_batch_status(batch_id: UUID) -> dict[str, Any]:
+    """Aggregated batch progress plus one status per member; raises FileNotFoundError."""
+    record = read_batch(batch_id)
+    members = record.get("files") or []
+    statuses = files.read_job_statuses([UUID(m["file_id"]) for m in members])
+    counts: dict[str, int] = {}
+    for st in statuses:
+        counts[st["status"]] = counts.get(st["status"], 0) + 1
+    finished = counts.get("done", 0) + counts.get("failed", 0)
+    if finished == len(members):
+        state = "done"
+    elif counts.get("queued", 0) == len(members):
+        state = "queued"
+    else:
+        state = "processing"
+    for member, st in zip(members, statuses):
+        st["filename"] = member.get("filename")
+    return {
+        "batch_id": record["batch_id"],
+        "status": state,
+        "total": len(members),
+        "counts": counts,
+        "progress": sum(_member_progress(st) for st in statuses) / max(1, len(members)),
+        "files": statuses,
+    }
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import errno
 import json
+import math
+import os
 import shutil
-from dataclasses import dataclass
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Literal, Optional
+from typing import Any, BinaryIO, Iterator, Literal, Optional
 from uuid import UUID, uuid4
 import hashlib
+import io
 
 from nc_parser.core.settings import get_settings
+from nc_parser.storage import results, search_index, status_store
+from nc_parser.storage.backend import BlobDir, StorageBackend, get_storage_backend
 
 
 StatusLiteral = Literal["queued", "processing", "done", "failed"]
@@ -21,8 +30,13 @@ class UploadMeta:
     size_bytes: Optional[int] = None
     checksum: Optional[str] = None
     celery_task_id: Optional[str] = None
+    # Legacy field: chunk arrivals are tracked in the append-only ledger (see read_chunk_ledger)
     chunks_received: list[int] | None = None
     created_ts: float | None = None
+    chunk_size: Optional[int] = None
+    upload_mode: Optional[str] = None  # "chunks" (part files + assembly) | "offset" (preallocated target)
+    chunks_digest: Optional[str] = None
+    completed_ts: float | None = None
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -33,11 +47,18 @@ class UploadMeta:
             "celery_task_id": self.celery_task_id,
             "chunks_received": self.chunks_received or [],
             "created_ts": self.created_ts,
+            "chunk_size": self.chunk_size,
+            "upload_mode": self.upload_mode,
+            "chunks_digest": self.chunks_digest,
+            "completed_ts": self.completed_ts,
         }
 
     @staticmethod
     def from_file(path: Path) -> "UploadMeta":
-        data = json.loads(path.read_text(encoding="utf-8"))
+        return UploadMeta.from_dict(json.loads(path.read_text(encoding="utf-8")))
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> "UploadMeta":
         return UploadMeta(
             file_id=UUID(data["file_id"]),
             filename=data.get("filename"),
@@ -46,16 +67,108 @@ class UploadMeta:
             celery_task_id=data.get("celery_task_id"),
             chunks_received=list(data.get("chunks_received")) if data.get("chunks_received") else [],
             created_ts=data.get("created_ts"),
+            chunk_size=data.get("chunk_size"),
+            upload_mode=data.get("upload_mode"),
+            chunks_digest=data.get("chunks_digest"),
+            completed_ts=data.get("completed_ts"),
         )
 
+    def expected_chunks(self) -> Optional[int]:
+        """Number of chunks implied by size_bytes/chunk_size, if both are known."""
+        if not self.size_bytes or not self.chunk_size:
+            return None
+        return max(1, math.ceil(self.size_bytes / self.chunk_size))
 
-def _base_paths(file_id: UUID) -> dict[str, Path]:
+
+JOB_KINDS = ("uploads", "artifacts", "results")
+
+
+def job_dir(kind: str, file_id: UUID) -> Path:
+    """Directory of one job under ``data/<kind>`` (uploads|artifacts|results).
+
+    Jobs live in a two-level fan-out, ``<kind>/ab/cd/<file_id>``, so no directory grows
+    past a few thousand entries. While ``NC_DATA_LAYOUT_COMPAT`` is on, a job still in
+    the old flat layout (``<kind>/<file_id>``) resolves to that directory until
+    ``scripts/migrate_layout.py`` moves it.
+    """
     settings = get_settings()
-    base = settings.data_dir
-    uploads = base / "uploads" / str(file_id)
-    artifacts = base / "artifacts" / str(file_id)
-    results = base / "results" / str(file_id)
-    return {"uploads": uploads, "artifacts": artifacts, "results": results}
+    root = settings.data_dir / kind
+    name = str(file_id)
+    sharded = root / name[:2] / name[2:4] / name
+    if settings.data_layout_compat and not sharded.exists():
+        flat = root / name
+        if flat.exists():
+            return flat
+    return sharded
+
+
+def job_key(kind: str, file_id: UUID, name: str = "") -> str:
+    """Storage backend key of a job directory (or of ``name`` inside it)."""
+    n = str(file_id)
+    base = f"{kind}/{n[:2]}/{n[2:4]}/{n}"
+    return f"{base}/{name}" if name else base
+
+
+def _remote() -> Optional[StorageBackend]:
+    """The object store when payloads/results do not live under NC_DATA_DIR, else None."""
+    backend = get_storage_backend()
+    return None if backend.local else backend
+
+
+def flat_job_dir(kind: str, file_id: UUID) -> Path:
+    return get_settings().data_dir / kind / str(file_id)
+
+
+def _base_paths(file_id: UUID) -> dict[str, Path]:
+    return {kind: job_dir(kind, file_id) for kind in JOB_KINDS}
+
+
+def job_dirs(file_id: UUID) -> list[Path]:
+    """Existing directories that hold data for the job."""
+    return [p for p in _base_paths(file_id).values() if p.exists()]
+
+
+def _is_shard(name: str) -> bool:
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+def iter_job_dirs(kind: str, layout: Optional[str] = None) -> Iterator[tuple[UUID, Path]]:
+    """(file_id, directory) for every job under ``data/<kind>``; a full scan.
+
+    ``layout`` limits the scan to ``"flat"`` or ``"sharded"`` directories; both by default.
+    """
+    root = get_settings().data_dir / kind
+    if not root.exists():
+        return
+    with os.scandir(root) as top:
+        for entry in top:
+            if not entry.is_dir():
+                continue
+            if _is_shard(entry.name):
+                if layout != "flat":
+                    yield from _iter_shard(Path(entry.path))
+                continue
+            if layout == "sharded":
+                continue
+            try:
+                yield UUID(entry.name), Path(entry.path)
+            except ValueError:
+                continue  # caption cache, debug dumps
+
+
+def _iter_shard(shard: Path) -> Iterator[tuple[UUID, Path]]:
+    with os.scandir(shard) as level2:
+        for sub in level2:
+            if not (sub.is_dir() and _is_shard(sub.name)):
+                continue
+            with os.scandir(sub.path) as jobs:
+                for entry in jobs:
+                    if not entry.is_dir():
+                        continue
+                    try:
+                        yield UUID(entry.name), Path(entry.path)
+                    except ValueError:
+                        continue
 
 
 def _meta_path(file_id: UUID) -> Path:
@@ -66,56 +179,394 @@ def _status_path(file_id: UUID) -> Path:
     return _base_paths(file_id)["uploads"] / "status.json"
 
 
-def init_upload(filename: Optional[str] = None, size_bytes: Optional[int] = None, checksum: Optional[str] = None) -> UUID:
+def _summary_path(file_id: UUID) -> Path:
+    return _base_paths(file_id)["results"] / "summary.json"
+
+
+def _redis_status() -> bool:
+    return get_settings().status_backend.lower() == "redis"
+
+
+CHUNK_LEDGER_NAME = "chunks.jsonl"
+
+
+def _ledger_path(file_id: UUID) -> Path:
+    return _base_paths(file_id)["uploads"] / CHUNK_LEDGER_NAME
+
+
+@dataclass
+class _RunningDigest:
+    """sha256 over the chunks of one upload received so far, while they arrive in order."""
+
+    sha256: Any = field(default_factory=hashlib.sha256)
+    next_index: int = 0
+    size: int = 0
+    in_order: bool = True
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+# Uploads declared with a whole-file checksum, hashed as their chunks arrive so that
+# completion need not read the file again. Per process and bounded: chunks that land
+# on another API process, or out of order, leave no usable digest and completion
+# hashes the assembled file instead.
+_RUNNING_DIGESTS_MAX = 1024
+_running_digests: "OrderedDict[UUID, _RunningDigest]" = OrderedDict()
+_running_digests_lock = threading.Lock()
+
+
+def _track_digest(file_id: UUID) -> None:
+    with _running_digests_lock:
+        _running_digests[file_id] = _RunningDigest()
+        while len(_running_digests) > _RUNNING_DIGESTS_MAX:
+            _running_digests.popitem(last=False)
+
+
+def _advance_digest(file_id: UUID, index: int, data: bytes) -> None:
+    with _running_digests_lock:
+        state = _running_digests.get(file_id)
+    if state is None:
+        return
+    with state.lock:
+        if state.in_order and index == state.next_index:
+            state.sha256.update(data)
+            state.next_index += 1
+            state.size += len(data)
+        else:
+            state.in_order = False
+
+
+def upload_sha256(file_id: UUID, path: Path) -> str:
+    """sha256 of an assembled upload; no re-read when every chunk arrived here in order."""
+    with _running_digests_lock:
+        state = _running_digests.pop(file_id, None)
+    if state is not None:
+        with state.lock:
+            if state.in_order and state.next_index == len(read_chunk_ledger(file_id)) and state.size == path.stat().st_size:
+                return state.sha256.hexdigest()
+    return sha256_file(path)
+
+
+def _record_expiry(file_id: UUID, created_ts: float) -> None:
+    from nc_parser.storage.retention import record_expiry  # retention builds on this module
+
+    record_expiry(file_id, created_ts)
+
+
+def _check_positive(name: str, value: Optional[int]) -> None:
+    if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value <= 0):
+        raise ValueError(f"{name} must be a positive integer")
+
+
+def init_upload(
+    filename: Optional[str] = None,
+    size_bytes: Optional[int] = None,
+    checksum: Optional[str] = None,
+    chunk_size: Optional[int] = None,
+) -> UUID:
+    """Open an upload session; raises ValueError for an invalid declared size or chunk size."""
+    _check_positive("size_bytes", size_bytes)
+    _check_positive("chunk_size", chunk_size)
+    limit = get_settings().upload_max_mb * 1024 * 1024
+    if size_bytes is not None and size_bytes > limit:
+        raise ValueError(f"size_bytes exceeds the upload limit of {limit} bytes")
     file_id = uuid4()
     paths = _base_paths(file_id)
     for p in paths.values():
         p.mkdir(parents=True, exist_ok=True)
-    (paths["uploads"] / "chunks").mkdir(parents=True, exist_ok=True)
     import time
-    meta = UploadMeta(file_id=file_id, filename=filename, size_bytes=size_bytes, checksum=checksum, chunks_received=[], created_ts=time.time())
-    _meta_path(file_id).write_text(json.dumps(meta.to_dict(), ensure_ascii=False), encoding="utf-8")
+    # With a known total size and fixed chunk size, chunks are written straight into a
+    # preallocated target at index * chunk_size and completion needs no assembly pass.
+    offset_mode = bool(size_bytes and chunk_size)
+    if offset_mode:
+        try:
+            _preallocate(paths["uploads"] / (filename or "file.bin"), int(size_bytes or 0))
+        except OSError:
+            for p in paths.values():
+                shutil.rmtree(p, ignore_errors=True)
+            raise
+    else:
+        (paths["uploads"] / "chunks").mkdir(parents=True, exist_ok=True)
+    meta = UploadMeta(
+        file_id=file_id,
+        filename=filename,
+        size_bytes=size_bytes,
+        checksum=checksum,
+        chunks_received=[],
+        created_ts=time.time(),
+        chunk_size=chunk_size,
+        upload_mode="offset" if offset_mode else "chunks",
+    )
+    _write_meta(meta)
+    _record_expiry(file_id, meta.created_ts or time.time())
+    if checksum:
+        _track_digest(file_id)
     return file_id
 
 
-def append_chunk(file_id: UUID, index: int, data: bytes) -> None:
-    paths = _base_paths(file_id)
-    chunks_dir = paths["uploads"] / "chunks"
+def _preallocate(path: Path, size: int) -> None:
+    """Reserve ``size`` bytes; OSError (e.g. ENOSPC) propagates."""
+    with path.open("wb") as f:
+        if size <= 0:
+            return
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+        except AttributeError:
+            f.truncate(size)  # no posix_fallocate on this platform: a sparse file is good enough
+        except OSError as exc:
+            if exc.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                raise
+            # Not supported by this filesystem: a sparse file is good enough
+            f.truncate(size)
+
+
+def _pwrite_all(path: Path, data: bytes, offset: int) -> None:
+    if not hasattr(os, "pwrite"):
+        with path.open("r+b") as f:
+            f.seek(offset)
+            f.write(data)
+        return
+    fd = os.open(path, os.O_WRONLY)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+    finally:
+        os.close(fd)
+
+
+def append_chunk(file_id: UUID, index: int, data: bytes, checksum: Optional[str] = None) -> str:
+    """Store one chunk and record it in the upload's chunk ledger.
+
+    Safe to call concurrently for different indices of the same upload: in offset mode
+    the chunk is written in place at ``index * chunk_size``, otherwise it goes to a temp
+    file renamed into place; the ledger is append-only, so no shared metadata is
+    rewritten. Returns the sha256 of the chunk; raises ValueError when ``checksum`` is
+    given and does not match or the chunk does not fit the declared layout.
+    """
+    meta = UploadMeta.from_file(_meta_path(file_id))
+    digest = hashlib.sha256(data).hexdigest()
+    if checksum and checksum.strip().lower() != digest:
+        raise ValueError("Chunk checksum mismatch")
+    if meta.upload_mode == "offset":
+        _write_chunk_at_offset(file_id, meta, index, data)
+        _advance_digest(file_id, index, data)
+        _ledger_append(file_id, {"index": index, "size": len(data), "sha256": digest})
+        return digest
+    chunks_dir = _base_paths(file_id)["uploads"] / "chunks"
     chunks_dir.mkdir(parents=True, exist_ok=True)
-    (chunks_dir / f"chunk_{index:08d}.part").write_bytes(data)
-    # Update meta
+    final = chunks_dir / f"chunk_{index:08d}.part"
+    tmp = chunks_dir / f".chunk_{index:08d}.{uuid4().hex}.tmp"
+    tmp.write_bytes(data)
+    os.replace(tmp, final)
+    _advance_digest(file_id, index, data)
+    _ledger_append(file_id, {"index": index, "size": len(data), "sha256": digest})
+    return digest
+
+
+def _write_chunk_at_offset(file_id: UUID, meta: UploadMeta, index: int, data: bytes) -> None:
+    chunk_size = int(meta.chunk_size or 0)
+    size = int(meta.size_bytes or 0)
+    expected = meta.expected_chunks() or 0
+    if index >= expected:
+        raise ValueError(f"Chunk index {index} out of range (expected {expected} chunks)")
+    offset = index * chunk_size
+    if len(data) != min(chunk_size, size - offset):
+        raise ValueError(f"Chunk {index} has {len(data)} bytes, expected {min(chunk_size, size - offset)}")
+    _pwrite_all(_base_paths(file_id)["uploads"] / (meta.filename or "file.bin"), data, offset)
+
+
+def _ledger_append(file_id: UUID, entry: dict[str, Any]) -> None:
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+    # A single O_APPEND write keeps concurrent appenders from interleaving records
+    fd = os.open(_ledger_path(file_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def read_chunk_ledger(file_id: UUID) -> dict[int, dict[str, Any]]:
+    """Return received chunks as {index: {"size", "sha256"}}; the last record per index wins."""
+    entries: dict[int, dict[str, Any]] = {}
+    try:
+        raw = _ledger_path(file_id).read_bytes()
+    except FileNotFoundError:
+        return entries
+    for line in raw.splitlines():
+        try:
+            rec = json.loads(line)
+            entries[int(rec["index"])] = {"size": rec.get("size"), "sha256": rec.get("sha256")}
+        except Exception:
+            # Skip a torn trailing record from an interrupted writer
+            continue
+    return entries
+
+
+def _to_ranges(indices: list[int]) -> list[list[int]]:
+    """Collapse sorted indices into inclusive [start, end] ranges."""
+    ranges: list[list[int]] = []
+    for idx in indices:
+        if ranges and idx == ranges[-1][1] + 1:
+            ranges[-1][1] = idx
+        else:
+            ranges.append([idx, idx])
+    return ranges
+
+
+def chunk_status(file_id: UUID) -> dict[str, Any]:
+    """Summarise received and missing chunk ranges for resumable uploads."""
     meta = UploadMeta.from_file(_meta_path(file_id))
-    received = set(meta.chunks_received or [])
-    received.add(index)
-    meta.chunks_received = sorted(received)
-    _meta_path(file_id).write_text(json.dumps(meta.to_dict(), ensure_ascii=False), encoding="utf-8")
+    received = sorted(read_chunk_ledger(file_id))
+    expected = meta.expected_chunks()
+    upper = expected if expected is not None else (received[-1] + 1 if received else 0)
+    received_set = set(received)
+    missing = [i for i in range(upper) if i not in received_set]
+    return {
+        "file_id": str(file_id),
+        "chunk_size": meta.chunk_size,
+        "expected_chunks": expected,
+        "received_count": len(received),
+        "received": _to_ranges(received),
+        "missing": _to_ranges(missing),
+    }
+
+
+def _chunk_file_indices(chunks_dir: Path) -> list[int]:
+    # Uploads started before the ledger existed: fall back to the chunk files themselves
+    return sorted(int(p.name.split("_")[1].split(".")[0]) for p in chunks_dir.glob("chunk_*.part"))
+
+
+def _copy_into(dst_fd: int, src_path: Path) -> None:
+    """Append src_path to dst_fd, letting the kernel move the bytes where possible."""
+    with src_path.open("rb", buffering=0) as src:
+        remaining = os.fstat(src.fileno()).st_size
+        if hasattr(os, "copy_file_range"):
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(src.fileno(), dst_fd, remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            except OSError:
+                pass  # e.g. cross-device on older kernels: finish with a user-space copy
+        while remaining > 0:
+            buf = src.read(min(remaining, 1024 * 1024))
+            if not buf:
+                break
+            os.write(dst_fd, buf)
+            remaining -= len(buf)
 
 
 def assemble_file(file_id: UUID) -> Path:
+    """Finalize a chunked upload and return the path of the complete file.
+
+    Offset-mode uploads are already in place, so this only validates the ledger and
+    flips the metadata. Legacy part-file uploads are concatenated with kernel copies
+    and the part files are removed afterwards. Completing an upload again returns the
+    same path without touching the file, so a client retry is harmless.
+    """
     paths = _base_paths(file_id)
     meta = UploadMeta.from_file(_meta_path(file_id))
     chunks_dir = paths["uploads"] / "chunks"
     output_path = paths["uploads"] / (meta.filename or "file.bin")
-    indices = sorted(int(p.name.split("_")[1].split(".")[0]) for p in chunks_dir.glob("chunk_*.part"))
+    if meta.completed_ts:
+        return output_path
+    ledger = read_chunk_ledger(file_id)
+    indices = sorted(ledger) if ledger else _chunk_file_indices(chunks_dir)
     # Ensure contiguous from 0..n
     if not indices:
         raise FileNotFoundError("No chunks found")
     if indices[0] != 0 or indices != list(range(indices[-1] + 1)):
         raise ValueError("Chunk indices are not contiguous from 0")
-    with output_path.open("wb") as w:
+    expected = meta.expected_chunks()
+    if expected is not None and len(indices) != expected:
+        raise ValueError(f"Upload incomplete: {len(indices)} of {expected} chunks received")
+    if meta.upload_mode != "offset":
+        parts = [chunks_dir / f"chunk_{idx:08d}.part" for idx in indices]
+        missing = [p.name for p in parts if not p.exists()]
+        if missing:
+            # Checked before the output is opened: truncating it would lose data
+            raise FileNotFoundError(f"Chunk files missing: {', '.join(missing[:5])}")
+        with output_path.open("wb", buffering=0) as w:
+            for part in parts:
+                _copy_into(w.fileno(), part)
+        shutil.rmtree(chunks_dir, ignore_errors=True)
+    # Digest over the per-chunk sha256s recorded on arrival: finalizes without re-reading data
+    if ledger:
+        h = hashlib.sha256()
         for idx in indices:
-            w.write((chunks_dir / f"chunk_{idx:08d}.part").read_bytes())
+            h.update(str(ledger[idx].get("sha256") or "").encode("ascii"))
+        meta.chunks_digest = h.hexdigest()
+    import time
+    meta.completed_ts = time.time()
+    _write_meta(meta)
     return output_path
 
 
 def save_single_shot(file_bytes: bytes, filename: Optional[str]) -> UUID:
-    file_id = init_upload(filename=filename, size_bytes=len(file_bytes))
+    file_id = init_upload(filename=filename, size_bytes=len(file_bytes) or None)
     paths = _base_paths(file_id)
     out = paths["uploads"] / (filename or "file.bin")
     out.write_bytes(file_bytes)
     return file_id
 
 
+def save_single_shot_stream(fileobj: BinaryIO, filename: Optional[str]) -> UUID:
+    """Like save_single_shot, but copies from a file object without buffering it in memory."""
+    file_id = init_upload(filename=filename)
+    out = _base_paths(file_id)["uploads"] / (filename or "file.bin")
+    with out.open("wb") as w:
+        shutil.copyfileobj(fileobj, w, 1024 * 1024)
+    return file_id
+
+
+def store_complete_upload(fileobj: BinaryIO, filename: Optional[str]) -> UUID:
+    """Store an upload whose bytes are all at hand (batch members).
+
+    Only the upload directory, the payload and meta.json are written; there is no chunk
+    scaffolding and the status is left to the caller, which sets it for the whole batch.
+    """
+    import time
+    file_id = uuid4()
+    uploads = _base_paths(file_id)["uploads"]
+    uploads.mkdir(parents=True, exist_ok=True)
+    name = filename or "file.bin"
+    backend = _remote()
+    if backend is not None:
+        size = backend.put_stream(job_key("uploads", file_id, name), fileobj)
+    else:
+        with (uploads / name).open("wb") as w:
+            shutil.copyfileobj(fileobj, w, 1024 * 1024)
+            size = w.tell()
+    now = time.time()
+    meta = UploadMeta(file_id=file_id, filename=name, size_bytes=size, created_ts=now, completed_ts=now)
+    _write_meta(meta)
+    _record_expiry(file_id, now)
+    return file_id
+
+
+def _write_meta(meta: UploadMeta) -> None:
+    """Write meta.json locally and, with an object store, under the upload's key too."""
+    raw = json.dumps(meta.to_dict(), ensure_ascii=False)
+    _meta_path(meta.file_id).write_text(raw, encoding="utf-8")
+    backend = _remote()
+    if backend is not None:
+        backend.put_stream(job_key("uploads", meta.file_id, "meta.json"), io.BytesIO(raw.encode("utf-8")))
+
+
+def read_meta(file_id: UUID) -> UploadMeta:
+    """Upload metadata; from the object store when this node did not receive the upload."""
+    try:
+        return UploadMeta.from_file(_meta_path(file_id))
+    except FileNotFoundError:
+        backend = _remote()
+        if backend is None:
+            raise
+        return UploadMeta.from_dict(json.loads(backend.get_bytes(job_key("uploads", file_id, "meta.json"))))
+
+
 def get_uploaded_file_path(file_id: UUID) -> Path:
     uploads_dir = _base_paths(file_id)["uploads"]
     # Prefer original filename from meta if exists
@@ -128,10 +579,9 @@ def get_uploaded_file_path(file_id: UUID) -> Path:
     except Exception:
         pass
     # Else pick the most likely content file: exclude control files and pick largest
-    excluded_names = {"meta.json", "status.json"}
     files = [
         p for p in uploads_dir.iterdir()
-        if p.is_file() and p.name not in excluded_names and not p.name.endswith(".part")
+        if p.is_file() and p.name not in _CONTROL_NAMES and not p.name.endswith(".part")
     ]
     if not files:
         raise FileNotFoundError("Uploaded file not found")
@@ -139,6 +589,76 @@ def get_uploaded_file_path(file_id: UUID) -> Path:
     return files[0]
 
 
+_CONTROL_NAMES = {"meta.json", "status.json", CHUNK_LEDGER_NAME}
+
+
+def publish_upload(file_id: UUID) -> None:
+    """Hand a completed upload to the object store so any worker can fetch it by key.
+
+    A no-op on the filesystem backend, where the payload already sits at its key. The
+    local copy is dropped once stored; the upload session files stay for retention.
+    """
+    backend = _remote()
+    if backend is None:
+        return
+    path = get_uploaded_file_path(file_id)
+    backend.put_file(job_key("uploads", file_id, path.name), path)
+    path.unlink(missing_ok=True)
+
+
+def _input_cache_dir() -> Path:
+    s = get_settings()
+    return Path(s.input_cache_dir) if s.input_cache_dir is not None else s.data_dir / "cache" / "inputs"
+
+
+def _trim_input_cache(keep: Path) -> None:
+    limit = get_settings().input_cache_max_mb * 1024 * 1024
+    entries: list[tuple[float, int, Path]] = []
+    for dirpath, _dirs, names in os.walk(_input_cache_dir()):
+        for name in names:
+            p = Path(dirpath) / name
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+    total = sum(size for _, size, _ in entries)
+    for _, size, p in sorted(entries):
+        if total <= limit:
+            break
+        if p == keep:
+            continue
+        p.unlink(missing_ok=True)
+        total -= size
+
+
+def fetch_input(file_id: UUID) -> Path:
+    """Local path of the job's input file, for workers.
+
+    On the filesystem backend this is the upload itself. With an object store the
+    payload is fetched by key into a local read-through cache (``NC_INPUT_CACHE_DIR``,
+    bounded by ``NC_INPUT_CACHE_MAX_MB``, least recently used first out), so retries and
+    re-processing do not download it again.
+    """
+    backend = _remote()
+    if backend is None:
+        return get_uploaded_file_path(file_id)
+    prefix = job_key("uploads", file_id)
+    cache_dir = _input_cache_dir().joinpath(*prefix.split("/"))
+    if cache_dir.is_dir():
+        for p in cache_dir.iterdir():
+            if p.is_file() and not p.name.startswith("."):
+                os.utime(p)  # mark as recently used
+                return p
+    keys = [k for k in backend.list_keys(prefix + "/") if k.rsplit("/", 1)[-1] not in _CONTROL_NAMES]
+    if not keys:
+        raise FileNotFoundError("Uploaded file not found")
+    dest = cache_dir / keys[0].rsplit("/", 1)[-1]
+    backend.download(keys[0], dest)
+    _trim_input_cache(keep=dest)
+    return dest
+
+
 def sha256_file(path: Path) -> str:
     h = hashlib.sha256()
     with path.open("rb") as f:
@@ -148,32 +668,102 @@ def sha256_file(path: Path) -> str:
 
 
 def save_celery_task_id(file_id: UUID, task_id: str) -> None:
-    meta_path = _meta_path(file_id)
-    meta = UploadMeta.from_file(meta_path)
+    meta = read_meta(file_id)
     meta.celery_task_id = task_id
-    meta_path.write_text(json.dumps(meta.to_dict(), ensure_ascii=False), encoding="utf-8")
+    _meta_path(file_id).parent.mkdir(parents=True, exist_ok=True)
+    _write_meta(meta)
+
+
+def write_artifact(file_id: UUID, name: str, data: bytes) -> None:
+    """Store a debug artifact of the job (``artifacts/.../<name>``) on the configured backend."""
+    backend = _remote()
+    if backend is not None:
+        backend.put_stream(job_key("artifacts", file_id, name), io.BytesIO(data))
+        return
+    art_dir = _base_paths(file_id)["artifacts"]
+    art_dir.mkdir(parents=True, exist_ok=True)
+    (art_dir / name).write_bytes(data)
+
+
+def _result_source(file_id: UUID) -> Any:
+    backend = _remote()
+    if backend is None:
+        return _base_paths(file_id)["results"]
+    return BlobDir(backend, job_key("results", file_id))
 
 
 def write_result(file_id: UUID, result: dict[str, Any]) -> Path:
-    results_dir = _base_paths(file_id)["results"]
-    results_dir.mkdir(parents=True, exist_ok=True)
-    out = results_dir / "result.json"
-    out.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
-    return out
+    """Store the result; returns the data file path (its key, on an object store)."""
+    # Promote caption metrics to top level at write time so the stored document can be
+    # served byte-for-byte by GET /result
+    caption_metrics = (result.get("processing_metrics") or {}).get("caption")
+    if caption_metrics and not result.get("caption"):
+        result = {**result, "caption": caption_metrics}
+    backend = _remote()
+    if backend is None:
+        return results.write_result_file(_base_paths(file_id)["results"], result)
+    prefix = job_key("results", file_id)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = results.write_result_file(Path(tmp), result)
+        backend.put_file(f"{prefix}/{out.name}", out)
+        # Index last: readers only see a result once its data is in place
+        backend.put_file(f"{prefix}/{results.INDEX_NAME}", Path(tmp) / results.INDEX_NAME)
+    return Path(prefix) / out.name
+
+
+def read_result_index(file_id: UUID) -> Optional[dict[str, Any]]:
+    return results.read_result_index(_result_source(file_id))
+
+
+def result_data_path(file_id: UUID, index: dict[str, Any]) -> Optional[Path]:
+    """Local path of the stored data file, or None when it lives in an object store."""
+    if _remote() is not None:
+        return None
+    return _base_paths(file_id)["results"] / index["file"]
+
+
+def read_result_data(file_id: UUID, index: dict[str, Any]) -> bytes:
+    """The stored (compressed) data file as-is."""
+    return results.read_blob(_result_source(file_id), index["file"])
+
+
+def result_digest(file_id: UUID) -> str:
+    return results.result_digest(_result_source(file_id))
 
 
 def read_result(file_id: UUID) -> dict[str, Any]:
-    out = _base_paths(file_id)["results"] / "result.json"
-    return json.loads(out.read_text(encoding="utf-8"))
+    return results.read_result_file(_result_source(file_id))
+
+
+def read_result_header(file_id: UUID) -> dict[str, Any]:
+    return results.read_result_header(_result_source(file_id))
+
+
+def read_result_page(file_id: UUID, position: int) -> dict[str, Any]:
+    return results.read_result_page(_result_source(file_id), position)
+
+
+def read_result_pages(file_id: UUID, positions: list[int]) -> list[dict[str, Any]]:
+    return results.read_result_pages(_result_source(file_id), positions)
 
 
 def delete_all(file_id: UUID) -> None:
+    with _running_digests_lock:
+        _running_digests.pop(file_id, None)
     for p in _base_paths(file_id).values():
         if p.exists():
             shutil.rmtree(p, ignore_errors=True)
+    backend = _remote()
+    if backend is not None:
+        for kind in JOB_KINDS:
+            backend.delete_prefix(job_key(kind, file_id) + "/")
+    if _redis_status():
+        status_store.delete(file_id)
+    if search_index.enabled():
+        search_index.remove(file_id)
 
 
-def write_status(
+def _status_payload(
     file_id: UUID,
     status: str,
     progress: Optional[float] = None,
@@ -181,7 +771,7 @@ def write_status(
     timings_ms: Optional[dict[str, float]] = None,
     stage: Optional[str] = None,
     progress_by_stage: Optional[dict[str, float]] = None,
-) -> None:
+) -> dict[str, Any]:
     payload: dict[str, Any] = {"file_id": str(file_id), "status": status}
     if progress is not None:
         payload["progress"] = max(0.0, min(1.0, float(progress)))
@@ -193,10 +783,110 @@ def write_status(
         payload["stage"] = stage
     if progress_by_stage:
         payload["progress_by_stage"] = progress_by_stage
-    _status_path(file_id).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    return payload
+
+
+def write_status(
+    file_id: UUID,
+    status: str,
+    progress: Optional[float] = None,
+    error: Optional[str] = None,
+    timings_ms: Optional[dict[str, float]] = None,
+    stage: Optional[str] = None,
+    progress_by_stage: Optional[dict[str, float]] = None,
+) -> None:
+    payload = _status_payload(file_id, status, progress, error, timings_ms, stage, progress_by_stage)
+    if _redis_status():
+        status_store.write_status(file_id, payload)
+    else:
+        _status_path(file_id).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    if get_settings().status_events.lower() == "redis":
+        try:
+            status_store.publish_status(file_id, payload)
+        except Exception:
+            # Listeners fall back to their wait timeout; the status itself is stored
+            pass
+
+
+def write_status_many(
+    file_ids: list[UUID], status: str, progress: Optional[float] = None, error: Optional[str] = None
+) -> None:
+    """Set the same status on many jobs; one pipelined round trip on the redis backend."""
+    payloads = {fid: _status_payload(fid, status, progress, error) for fid in file_ids}
+    publish = get_settings().status_events.lower() == "redis"
+    if _redis_status():
+        status_store.write_status_many(payloads, publish=publish)
+        return
+    for fid, payload in payloads.items():
+        _status_path(fid).write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    if publish:
+        try:
+            for fid, payload in payloads.items():
+                status_store.publish_status(fid, payload)
+        except Exception:
+            pass
 
 
 def read_status(file_id: UUID) -> dict[str, Any]:
+    if _redis_status():
+        st, _ = status_store.read_status_and_summary(file_id)
+        if st is None:
+            raise FileNotFoundError("Status not found")
+        return st
     return json.loads(_status_path(file_id).read_text(encoding="utf-8"))
 
 
+def write_summary(file_id: UUID, summary: dict[str, Any]) -> None:
+    """Store the small finished-job record (caption metrics, counts) next to the result."""
+    if _redis_status():
+        status_store.write_summary(file_id, summary)
+        return
+    path = _summary_path(file_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(summary, ensure_ascii=False), encoding="utf-8")
+
+
+def _job_status(file_id: UUID, st: dict[str, Any], summary: Optional[dict[str, Any]]) -> dict[str, Any]:
+    st["file_id"] = str(file_id)
+    if summary and summary.get("caption"):
+        st["caption"] = summary["caption"]
+    return st
+
+
+def _read_file_summary(file_id: UUID) -> Optional[dict[str, Any]]:
+    try:
+        return json.loads(_summary_path(file_id).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def read_job_status(file_id: UUID) -> dict[str, Any]:
+    """Status as served to clients: the status record plus caption metrics once done.
+
+    Never touches result.json; raises FileNotFoundError for unknown jobs.
+    """
+    if _redis_status():
+        st, summary = status_store.read_status_and_summary(file_id)
+        if st is None:
+            raise FileNotFoundError("Status not found")
+    else:
+        st = json.loads(_status_path(file_id).read_text(encoding="utf-8"))
+        summary = _read_file_summary(file_id) if st.get("status") == "done" else None
+    return _job_status(file_id, st, summary)
+
+
+def read_job_statuses(file_ids: list[UUID]) -> list[dict[str, Any]]:
+    """``read_job_status`` for many jobs, in input order; unknown ids get ``status: not_found``."""
+    if _redis_status():
+        records = status_store.read_many(file_ids)
+        return [
+            _job_status(fid, st, summary) if st is not None else {"file_id": str(fid), "status": "not_found"}
+            for fid, (st, summary) in zip(file_ids, records)
+        ]
+    out: list[dict[str, Any]] = []
+    for fid in file_ids:
+        try:
+            out.append(read_job_status(fid))
+        except FileNotFoundError:
+            out.append({"file_id": str(fid), "status": "not_found"})
+    return out
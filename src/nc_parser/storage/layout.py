@@ -0,0 +1,62 @@
+"""Online migration from the flat data layout to the sharded one.
+
+Each job directory is moved with a single ``rename`` into ``<kind>/ab/cd/<file_id>``;
+``files.job_dir`` resolves both layouts meanwhile, so the API and workers keep running.
+Jobs that may still be written to (not final and recently touched) are left for a
+later pass, as is any job whose sharded directory already exists.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Optional
+from uuid import UUID
+
+from nc_parser.storage import files
+
+
+_FINAL = {"done", "failed"}
+
+
+def _is_settled(file_id: UUID, flat_mtime: float, now: float, min_age_s: float) -> bool:
+    if now - flat_mtime >= min_age_s:
+        return True
+    try:
+        return files.read_status(file_id).get("status") in _FINAL
+    except (FileNotFoundError, ValueError):
+        return False
+
+
+def migrate_flat_layout(
+    dry_run: bool = False, limit: Optional[int] = None, min_age_s: float = 3600.0
+) -> dict[str, Any]:
+    """Move up to ``limit`` flat job directories into the sharded layout; returns counters."""
+    report: dict[str, Any] = {"moved": 0, "skipped_active": 0, "conflicts": 0, "errors": 0}
+    now = time.time()
+    for kind in files.JOB_KINDS:
+        for file_id, flat in files.iter_job_dirs(kind, layout="flat"):
+            if limit is not None and report["moved"] >= limit:
+                return report
+            try:
+                mtime = flat.stat().st_mtime
+            except OSError:
+                continue  # deleted meanwhile
+            if not _is_settled(file_id, mtime, now, min_age_s):
+                report["skipped_active"] += 1
+                continue
+            name = str(file_id)
+            target = flat.parent / name[:2] / name[2:4] / name
+            if target.exists():
+                report["conflicts"] += 1
+                continue
+            if dry_run:
+                report["moved"] += 1
+                continue
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(flat, target)
+                report["moved"] += 1
+            except OSError:
+                report["errors"] += 1
+    return report
@@ -0,0 +1,255 @@
+"""Compressed, page-indexed result files.
+
+A result is written as ``result.json.gz`` (or ``.zst``) made of independently
+decodable frames: a header frame with every top-level field except ``pages``,
+one frame per page, and a closing frame. The frames are arranged so that the
+decompressed stream is itself the complete result JSON, i.e. the file can be
+served as-is with ``Content-Encoding: gzip``. ``result.index.json`` records the
+byte range of every frame, so a single page or just the header can be read
+without decoding the rest. Results written before this format (plain
+``result.json``) are still readable.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Optional
+from uuid import uuid4
+
+from nc_parser.core.settings import get_settings
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import zstandard  # type: ignore
+except Exception:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+
+INDEX_NAME = "result.index.json"
+LEGACY_NAME = "result.json"
+_DATA_NAMES = {"gzip": "result.json.gz", "zstd": "result.json.zst"}
+_PAGES_KEY = b'"pages":['
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _resolve_codec() -> str:
+    codec = (get_settings().result_codec or "gzip").lower()
+    if codec == "zstd" and zstandard is None:
+        return "gzip"
+    return codec if codec in _DATA_NAMES else "gzip"
+
+
+class _FrameEncoder:
+    """Encode independently decodable frames into one stream.
+
+    gzip: a single gzip member whose deflate stream is fully flushed after each frame,
+    so a frame's bytes inflate on their own (raw deflate) while the file stays an
+    ordinary one-member .gz that any HTTP client can decode. zstd: one zstd frame each.
+    """
+
+    def __init__(self, codec: str) -> None:
+        self.codec = codec
+        # zlib writes a fixed 10-byte gzip header (mtime 0), keeping output deterministic
+        self._z = zlib.compressobj(6, zlib.DEFLATED, 31) if codec == "gzip" else None
+        self._zstd = zstandard.ZstdCompressor(level=3) if codec == "zstd" else None  # type: ignore[union-attr]
+        self._header_pending = codec == "gzip"
+
+    def frame(self, raw: bytes) -> tuple[bytes, int]:
+        """Return (encoded bytes, number of leading stream-header bytes not in the frame)."""
+        if self._zstd is not None:
+            return self._zstd.compress(raw), 0
+        assert self._z is not None
+        out = self._z.compress(raw) + self._z.flush(zlib.Z_FULL_FLUSH)
+        skip = 10 if self._header_pending else 0
+        self._header_pending = False
+        return out, skip
+
+    def finish(self) -> bytes:
+        return self._z.flush() if self._z is not None else b""
+
+
+def _decompress_frame(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("result is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompressobj(-zlib.MAX_WBITS).decompress(data)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_result_file(results_dir: Path, result: dict[str, Any]) -> Path:
+    """Write result frame by frame, then publish its index; returns the data file path."""
+    results_dir.mkdir(parents=True, exist_ok=True)
+    codec = _resolve_codec()
+    out = results_dir / _DATA_NAMES[codec]
+    header = {k: v for k, v in result.items() if k != "pages"}
+    head = dumps(header)
+    prefix = (head[:-1] + b"," if header else b"{") + _PAGES_KEY
+    digest = hashlib.sha256()
+    offset = 0
+    page_ranges: list[list[int]] = []
+    tmp = out.with_name(f".{out.name}.{uuid4().hex}.tmp")
+
+    encoder = _FrameEncoder(codec)
+    with tmp.open("wb") as f:
+        def write(data: bytes) -> None:
+            nonlocal offset
+            f.write(data)
+            digest.update(data)
+            offset += len(data)
+
+        def frame(raw: bytes) -> list[int]:
+            data, skip = encoder.frame(raw)
+            start = offset + skip
+            write(data)
+            return [start, len(data) - skip]
+
+        header_range = frame(prefix)
+        for i, page in enumerate(result.get("pages") or []):
+            page_ranges.append(frame((b"," if i else b"") + dumps(page)))
+        tail_range = frame(b"]}")
+        write(encoder.finish())
+    os.replace(tmp, out)
+    index = {
+        # v2: the stored document is exactly what GET /result serves (caption promoted)
+        "version": 2,
+        "codec": codec,
+        "file": out.name,
+        "size": offset,
+        "digest": f"sha256:{digest.hexdigest()}",
+        "header": header_range,
+        "pages": page_ranges,
+        "tail": tail_range,
+    }
+    _atomic_write(results_dir / INDEX_NAME, dumps(index))
+    # A stale plain result from an older run would otherwise shadow nothing but waste space
+    (results_dir / LEGACY_NAME).unlink(missing_ok=True)
+    return out
+
+
+# Readers accept the results directory as a Path or as any object with
+# ``read_bytes(name)`` and ``read_ranges(name, ranges)`` (see ``backend.BlobDir``).
+ResultSource = Any
+
+
+def read_blob(src: ResultSource, name: str) -> bytes:
+    if isinstance(src, Path):
+        return (src / name).read_bytes()
+    return src.read_bytes(name)
+
+
+def _read_ranges(src: ResultSource, name: str, ranges: list[list[int]]) -> list[bytes]:
+    if not isinstance(src, Path):
+        return src.read_ranges(name, ranges)
+    out: list[bytes] = []
+    with (src / name).open("rb") as f:
+        for offset, length in ranges:
+            f.seek(offset)
+            out.append(f.read(length))
+    return out
+
+
+def read_result_index(src: ResultSource) -> Optional[dict[str, Any]]:
+    try:
+        return loads(read_blob(src, INDEX_NAME))
+    except FileNotFoundError:
+        return None
+
+
+def result_digest(src: ResultSource) -> str:
+    """Digest of the stored result bytes; raises FileNotFoundError when there is no result."""
+    index = read_result_index(src)
+    if index is not None:
+        return str(index["digest"])
+    if not isinstance(src, Path):
+        return f"sha256:{hashlib.sha256(read_blob(src, LEGACY_NAME)).hexdigest()}"
+    h = hashlib.sha256()
+    with (src / LEGACY_NAME).open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return f"sha256:{h.hexdigest()}"
+
+
+def _read_legacy(src: ResultSource) -> dict[str, Any]:
+    return loads(read_blob(src, LEGACY_NAME))
+
+
+def read_result_file(src: ResultSource) -> dict[str, Any]:
+    index = read_result_index(src)
+    if index is None:
+        return _read_legacy(src)
+    raw = read_blob(src, index["file"])
+    if index["codec"] == "gzip":
+        return loads(gzip.decompress(raw))
+    parts = [index["header"], *index["pages"], index["tail"]]
+    return loads(b"".join(_decompress_frame(index["codec"], raw[o:o + n]) for o, n in parts))
+
+
+def read_result_header(src: ResultSource) -> dict[str, Any]:
+    """All top-level fields except ``pages``, plus ``page_count``."""
+    index = read_result_index(src)
+    if index is None:
+        data = _read_legacy(src)
+        pages = data.pop("pages", None) or []
+        data["page_count"] = len(pages)
+        return data
+    (frame,) = _read_ranges(src, index["file"], [index["header"]])
+    raw = _decompress_frame(index["codec"], frame)
+    body = raw[: -len(_PAGES_KEY)].rstrip(b",")
+    header = loads(body + b"}")
+    header["page_count"] = len(index["pages"])
+    return header
+
+
+def read_result_pages(src: ResultSource, positions: list[int]) -> list[dict[str, Any]]:
+    """Pages at the given list positions (out-of-range positions are skipped), in order."""
+    index = read_result_index(src)
+    if index is None:
+        pages = _read_legacy(src).get("pages") or []
+        return [pages[p] for p in positions if 0 <= p < len(pages)]
+    ranges = index["pages"]
+    wanted = [ranges[p] for p in positions if 0 <= p < len(ranges)]
+    frames = _read_ranges(src, index["file"], wanted) if wanted else []
+    return [loads(_decompress_frame(index["codec"], f).lstrip(b",")) for f in frames]
+
+
+def read_result_page(src: ResultSource, position: int) -> dict[str, Any]:
+    """Page at list position ``position``; raises IndexError when out of range."""
+    index = read_result_index(src)
+    if index is None:
+        pages = _read_legacy(src).get("pages") or []
+        if not 0 <= position < len(pages):
+            raise IndexError(position)
+        return pages[position]
+    if not 0 <= position < len(index["pages"]):
+        raise IndexError(position)
+    (frame,) = _read_ranges(src, index["file"], [index["pages"][position]])
+    return loads(_decompress_frame(index["codec"], frame).lstrip(b","))
@@ -0,0 +1,292 @@
+"""Expiry index and TTL cleanup.
+
+Every upload and batch is recorded in a time-bucketed manifest under ``data/expiry``:
+one append-only ``<hour>.jsonl`` per hour of expiry time, listing the jobs and batches
+created for that hour; an expired batch goes together with its members. A cleanup run only opens manifests whose hour has passed, so it costs
+O(expired jobs) instead of a scan of every job directory. With an object store
+(``NC_STORAGE_BACKEND=s3``) the index lives in the bucket instead, one empty
+``expiry/<hour>/<file_id>_<created>`` (or ``batch_<batch_id>_<created>``) key per
+job, so any node's cleanup sees the
+jobs every API node created. ``reconcile`` is the slow
+full scan, meant to run rarely: it removes orphaned ``artifacts``/``results``
+directories and expired jobs that predate the index.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Optional
+from uuid import UUID, uuid4
+
+from nc_parser.core.settings import get_settings
+from nc_parser.core.worker_metrics import CLEANUP_BYTES_FREED, CLEANUP_DELETED
+from nc_parser.storage import batches, files, search_index
+from nc_parser.storage.backend import StorageBackend, get_storage_backend
+
+
+EXPIRY_DIR = "expiry"
+_BUCKET_S = 3600
+# Directories younger than this are never treated as orphans: the worker may still be
+# creating them for an upload that is being written right now.
+_ORPHAN_GRACE_S = 3600
+
+
+def _expiry_dir() -> Path:
+    return get_settings().data_dir / EXPIRY_DIR
+
+
+def _ttl_s() -> float:
+    return get_settings().retention_ttl_hours * 3600
+
+
+def _bucket_path(expires: float) -> Path:
+    return _expiry_dir() / f"{int(expires // _BUCKET_S)}.jsonl"
+
+
+def _append_line(path: Path, entry: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+    # Single O_APPEND write: concurrent uploads never interleave records
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line)
+    finally:
+        os.close(fd)
+
+
+def _record(field: str, item_id: UUID, created_ts: float) -> None:
+    expires = created_ts + _ttl_s()
+    backend = get_storage_backend()
+    if not backend.local:
+        name = f"{item_id}" if field == "file_id" else f"batch_{item_id}"
+        key = f"{EXPIRY_DIR}/{int(expires // _BUCKET_S)}/{name}_{created_ts:.3f}"
+        backend.put_stream(key, io.BytesIO(b""))
+        return
+    _append_line(_bucket_path(expires), {field: str(item_id), "created": created_ts})
+
+
+def record_expiry(file_id: UUID, created_ts: float) -> None:
+    """Index a new job under the hour in which it expires."""
+    _record("file_id", file_id, created_ts)
+
+
+def record_batch_expiry(batch_id: UUID, created_ts: float) -> None:
+    """Index a new batch record; it expires (with its members) like an upload."""
+    _record("batch_id", batch_id, created_ts)
+
+
+def _due_manifests(now: float) -> list[Path]:
+    due: list[Path] = []
+    directory = _expiry_dir()
+    if not directory.exists():
+        return due
+    for entry in os.scandir(directory):
+        # "<hour>.jsonl", or "<hour>.jsonl.<token>.claimed" left behind by an interrupted run
+        head = entry.name.split(".", 1)[0]
+        if head.isdigit() and (int(head) + 1) * _BUCKET_S <= now:
+            due.append(Path(entry.path))
+    return sorted(due)
+
+
+def _claim(path: Path) -> Optional[Path]:
+    if path.name.endswith(".claimed"):
+        return path
+    claimed = path.with_name(f"{path.name}.{uuid4().hex}.claimed")
+    try:
+        # New jobs only ever append to future hours, so a past manifest is complete
+        os.replace(path, claimed)
+    except FileNotFoundError:
+        return None  # claimed by a concurrent run
+    return claimed
+
+
+def _read_manifest(path: Path) -> dict[tuple[str, UUID], float]:
+    """{("file_id" | "batch_id", id): created} for every intact line."""
+    entries: dict[tuple[str, UUID], float] = {}
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+                field = "batch_id" if "batch_id" in rec else "file_id"
+                entries[(field, UUID(str(rec[field])))] = float(rec["created"])
+            except (ValueError, KeyError, TypeError):
+                continue  # torn trailing line
+    return entries
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(Path(entry.path))
+                    else:
+                        try:
+                            total += entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            pass
+        except OSError:
+            continue
+    return total
+
+
+def _delete_job(file_id: UUID) -> int:
+    freed = sum(_dir_size(p) for p in files.job_dirs(file_id))
+    files.delete_all(file_id)
+    return freed
+
+
+def _delete_batch(batch_id: UUID) -> int:
+    try:
+        members = [UUID(m["file_id"]) for m in batches.read_batch(batch_id).get("files") or []]
+    except FileNotFoundError:
+        members = []
+    freed = sum(_dir_size(p) for fid in members for p in files.job_dirs(fid))
+    batches.delete_batch(batch_id)
+    return freed
+
+
+def _delete_paths(path: Path) -> int:
+    freed = _dir_size(path)
+    shutil.rmtree(path, ignore_errors=True)
+    return freed
+
+
+def _run_deletes(func: Any, items: Iterable[Any], report: dict[str, Any], counter: str) -> None:
+    """Apply ``func`` in parallel batches, at most NC_CLEANUP_MAX_DELETES_PER_S per second."""
+    settings = get_settings()
+    batch_size = max(1, settings.cleanup_batch_size)
+    rate = settings.cleanup_max_deletes_per_s
+    pending = list(items)
+    with ThreadPoolExecutor(max_workers=max(1, settings.cleanup_delete_workers)) as pool:
+        for start in range(0, len(pending), batch_size):
+            t0 = time.monotonic()
+            batch = pending[start:start + batch_size]
+            for outcome in pool.map(_safe_call, [func] * len(batch), batch):
+                if outcome is None:
+                    report["errors"] += 1
+                    continue
+                report[counter] += 1
+                report["bytes_freed"] += outcome
+                CLEANUP_DELETED.labels(kind=counter).inc()
+                CLEANUP_BYTES_FREED.inc(outcome)
+            if rate > 0:
+                time.sleep(max(0.0, len(batch) / rate - (time.monotonic() - t0)))
+
+
+def _safe_call(func: Any, item: Any) -> Optional[int]:
+    try:
+        return int(func(item))
+    except Exception:
+        return None
+
+
+def _new_report() -> dict[str, Any]:
+    return {"expired": 0, "batches": 0, "orphans": 0, "bytes_freed": 0, "errors": 0, "manifests": 0}
+
+
+def cleanup_expired(now: Optional[float] = None) -> dict[str, Any]:
+    """Delete every job whose expiry hour has passed; returns counters for the run."""
+    now = time.time() if now is None else now
+    ttl = _ttl_s()
+    report = _new_report()
+    started = time.monotonic()
+    for manifest in _due_manifests(now):
+        claimed = _claim(manifest)
+        if claimed is None:
+            continue
+        _delete_due(_read_manifest(claimed), now, ttl, report)
+        claimed.unlink(missing_ok=True)
+        report["manifests"] += 1
+    backend = get_storage_backend()
+    if not backend.local:
+        _cleanup_remote(backend, now, ttl, report)
+    report["duration_s"] = round(time.monotonic() - started, 3)
+    return report
+
+
+def _delete_due(entries: dict[tuple[str, UUID], float], now: float, ttl: float, report: dict[str, Any]) -> None:
+    expired: dict[str, list[UUID]] = {"file_id": [], "batch_id": []}
+    for (field, item_id), created in entries.items():
+        if created + ttl <= now:
+            expired[field].append(item_id)
+        else:
+            # TTL was raised since the entry was indexed: move it to its new hour
+            _record(field, item_id, created)
+    _run_deletes(_delete_job, expired["file_id"], report, "expired")
+    _run_deletes(_delete_batch, expired["batch_id"], report, "batches")
+
+
+def _cleanup_remote(backend: StorageBackend, now: float, ttl: float, report: dict[str, Any]) -> None:
+    """``cleanup_expired`` over the expiry keys in the object store.
+
+    There is no atomic claim on an object store: concurrent runs may both delete the
+    same jobs, which is harmless since deletes are idempotent.
+    """
+    for hour in backend.list_dirs(EXPIRY_DIR + "/"):
+        if not hour.isdigit() or (int(hour) + 1) * _BUCKET_S > now:
+            continue
+        prefix = f"{EXPIRY_DIR}/{hour}/"
+        entries: dict[tuple[str, UUID], float] = {}
+        for key in backend.list_keys(prefix):
+            name, _, created = key.rsplit("/", 1)[-1].rpartition("_")
+            field = "batch_id" if name.startswith("batch_") else "file_id"
+            try:
+                entries[(field, UUID(name.removeprefix("batch_")))] = float(created)
+            except ValueError:
+                continue
+        _delete_due(entries, now, ttl, report)
+        # New jobs only ever land in future hours, so the whole hour can go
+        backend.delete_prefix(prefix)
+        report["manifests"] += 1
+
+
+def reconcile(now: Optional[float] = None) -> dict[str, Any]:
+    """Full scan: expired jobs missing from the index and directories without an upload."""
+    now = time.time() if now is None else now
+    ttl = _ttl_s()
+    report = _new_report()
+    started = time.monotonic()
+    scan_started = time.time()
+    known: set[UUID] = set()
+    expired: list[UUID] = []
+    for file_id, path in files.iter_job_dirs("uploads"):
+        known.add(file_id)
+        meta_path = path / "meta.json"
+        try:
+            meta = files.UploadMeta.from_file(meta_path)
+            created = meta.created_ts or meta_path.stat().st_mtime
+        except (OSError, ValueError, KeyError):
+            try:
+                created = path.stat().st_mtime
+            except OSError:
+                continue
+        if created + ttl <= now:
+            expired.append(file_id)
+    _run_deletes(_delete_job, expired, report, "expired")
+    orphans: list[Path] = []
+    for kind in ("artifacts", "results"):
+        for file_id, path in files.iter_job_dirs(kind):
+            if file_id in known:
+                continue
+            try:
+                if path.stat().st_mtime + _ORPHAN_GRACE_S > now:
+                    continue
+            except OSError:
+                continue
+            orphans.append(path)
+    _run_deletes(_delete_paths, orphans, report, "orphans")
+    if search_index.enabled() and get_settings().storage_backend == "fs":
+        # Documents indexed after the scan started may have uploads it did not see
+        report["search_pruned"] = search_index.prune(known, scan_started)
+    report["duration_s"] = round(time.monotonic() - started, 3)
+    return report
@@ -0,0 +1,191 @@
+"""Local full-text index over stored results (SQLite FTS5).
+
+Enabled with ``NC_SEARCH_INDEX_ENABLED``. The worker indexes a document right after
+writing its result: one row per chunk (or per page when the result has no chunks)
+and one per extracted key field, each tagged with the document id, page position,
+chunk index and field name. Re-indexing a document replaces its rows. Deleting a job
+(``DELETE /file/{id}``, TTL cleanup) removes them, and the reconcile pass drops rows
+of documents whose upload no longer exists.
+
+Row metadata lives in a plain ``segments`` table indexed by document, and the FTS
+table shares its rowids, so removing a document is a pair of indexed deletes rather
+than a scan of the full-text table. The database is a single file under ``data/``
+(WAL mode), shared by the worker processes and the API of one node.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+from uuid import UUID
+
+from nc_parser.core.settings import get_settings
+
+
+DB_NAME = "search.sqlite3"
+_BUSY_TIMEOUT_MS = 10000
+# Query terms: words and numbers, each quoted so FTS5 operators in user input stay literal
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    document_id TEXT PRIMARY KEY,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    document_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    page INTEGER,
+    chunk INTEGER,
+    field TEXT
+);
+CREATE INDEX IF NOT EXISTS segments_document ON segments(document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(text, tokenize = 'unicode61 remove_diacritics 2');
+"""
+
+_ready: set[Path] = set()
+_ready_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return get_settings().search_index_enabled
+
+
+def _db_path() -> Path:
+    settings = get_settings()
+    return settings.search_index_path or settings.data_dir / DB_NAME
+
+
+def _connect() -> sqlite3.Connection:
+    path = _db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=_BUSY_TIMEOUT_MS / 1000)
+    conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+    if path not in _ready:
+        with _ready_lock:
+            if path not in _ready:
+                conn.execute("PRAGMA journal_mode = WAL")
+                conn.executescript(_SCHEMA)
+                _ready.add(path)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+def _field_rows(position: int, page: dict[str, Any]) -> Iterator[tuple[str, int, Optional[int], str, str]]:
+    for el in page.get("elements") or []:
+        if el.get("type") != "fields":
+            continue
+        try:
+            values = json.loads(el.get("description") or "{}")
+        except ValueError:
+            continue
+        for name, value in values.items() if isinstance(values, dict) else ():
+            if value not in (None, ""):
+                yield "field", position, None, str(name), str(value)
+
+
+def _rows(result: dict[str, Any]) -> Iterator[tuple[str, int, Optional[int], Optional[str], str]]:
+    """(kind, page, chunk, field, text) for every indexed piece of a result."""
+    pages = result.get("pages") or []
+    chunks = result.get("chunks") or []
+    if chunks:
+        for chunk in chunks:
+            page_list = chunk.get("pages") or [0]
+            yield "chunk", int(page_list[0]), int(chunk.get("index", 0)), None, chunk.get("text") or ""
+    else:
+        for position, page in enumerate(pages):
+            if page.get("text"):
+                yield "page", position, None, None, page["text"]
+    for position, page in enumerate(pages):
+        yield from _field_rows(position, page)
+
+
+def _delete(conn: sqlite3.Connection, document_id: str) -> None:
+    conn.execute("DELETE FROM entries WHERE rowid IN (SELECT id FROM segments WHERE document_id = ?)", (document_id,))
+    conn.execute("DELETE FROM segments WHERE document_id = ?", (document_id,))
+    conn.execute("DELETE FROM documents WHERE document_id = ?", (document_id,))
+
+
+def index_result(file_id: UUID, result: dict[str, Any]) -> int:
+    """Replace the document's rows with those of ``result``; returns the number indexed."""
+    document_id = str(file_id)
+    count = 0
+    with closing(_connect()) as conn, conn:
+        _delete(conn, document_id)
+        conn.execute("INSERT INTO documents(document_id, indexed_at) VALUES (?, ?)", (document_id, time.time()))
+        for kind, page, chunk, field, text in _rows(result):
+            if not text.strip():
+                continue
+            cur = conn.execute(
+                "INSERT INTO segments(document_id, kind, page, chunk, field) VALUES (?, ?, ?, ?, ?)",
+                (document_id, kind, page, chunk, field),
+            )
+            conn.execute("INSERT INTO entries(rowid, text) VALUES (?, ?)", (cur.lastrowid, text))
+            count += 1
+    return count
+
+
+def remove(file_id: UUID) -> None:
+    if not _db_path().exists():
+        return
+    with closing(_connect()) as conn, conn:
+        _delete(conn, str(file_id))
+
+
+def prune(keep: Iterable[UUID], indexed_before: float) -> int:
+    """Remove documents indexed before ``indexed_before`` that are not in ``keep``."""
+    if not _db_path().exists():
+        return 0
+    known = {str(k) for k in keep}
+    with closing(_connect()) as conn:
+        stale = [
+            doc for (doc,) in conn.execute("SELECT document_id FROM documents WHERE indexed_at < ?", (indexed_before,))
+            if doc not in known
+        ]
+        for doc in stale:
+            with conn:
+                _delete(conn, doc)
+    return len(stale)
+
+
+def _match_expr(query: str) -> str:
+    return " ".join('"' + term + '"' for term in _TERM.findall(query))
+
+
+def search(query: str, limit: int = 20, offset: int = 0, field: Optional[str] = None) -> dict[str, Any]:
+    """Ranked hits for every term of ``query``; ``field`` restricts to that key field."""
+    out: dict[str, Any] = {"query": query, "total": 0, "limit": limit, "offset": offset, "hits": []}
+    expr = _match_expr(query)
+    if not expr or not _db_path().exists():
+        return out
+    where = "entries MATCH ?"
+    params: list[Any] = [expr]
+    if field is not None:
+        where += " AND s.kind = 'field' AND s.field = ?"
+        params.append(field)
+    with closing(_connect()) as conn:
+        out["total"] = conn.execute(
+            f"SELECT count(*) FROM entries JOIN segments s ON s.id = entries.rowid WHERE {where}", params
+        ).fetchone()[0]
+        rows = conn.execute(
+            "SELECT s.document_id, s.kind, s.page, s.chunk, s.field,"
+            " snippet(entries, 0, '[', ']', '…', 16), entries.rank"
+            f" FROM entries JOIN segments s ON s.id = entries.rowid WHERE {where}"
+            " ORDER BY entries.rank LIMIT ? OFFSET ?",
+            [*params, limit, offset],
+        ).fetchall()
+    for document_id, kind, page, chunk, field_name, snippet, rank in rows:
+        hit: dict[str, Any] = {"document_id": document_id, "kind": kind, "page": page, "snippet": snippet, "score": round(-rank, 4)}
+        if chunk is not None:
+            hit["chunk"] = chunk
+        if field_name is not None:
+            hit["field"] = field_name
+        out["hits"].append(hit)
+    return out
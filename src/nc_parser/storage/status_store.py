@@ -0,0 +1,103 @@
+"""Redis-backed job status and finished-summary records, plus status change events.
+
+Used by ``storage.files`` when ``NC_STATUS_BACKEND=redis``. Each job has two small
+hashes: ``nc:status:<file_id>`` (replaced atomically on every update) and
+``nc:summary:<file_id>`` (written once when the result is stored, e.g. caption
+metrics). Field values are JSON-encoded so nested dicts round-trip. Status writes
+are also announced on ``nc:events:<file_id>`` when ``NC_STATUS_EVENTS=redis``,
+independently of which backend stores the status.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+from uuid import UUID
+
+from nc_parser.core.redis_client import get_redis
+from nc_parser.core.settings import get_settings
+
+
+def status_key(file_id: UUID) -> str:
+    return f"nc:status:{file_id}"
+
+
+def summary_key(file_id: UUID) -> str:
+    return f"nc:summary:{file_id}"
+
+
+def events_channel(file_id: UUID) -> str:
+    return f"nc:events:{file_id}"
+
+
+def _ttl_seconds() -> int:
+    return max(1, get_settings().retention_ttl_hours) * 3600
+
+
+def _encode(record: dict[str, Any]) -> dict[str, str]:
+    return {k: json.dumps(v, ensure_ascii=False) for k, v in record.items()}
+
+
+def _decode(raw: dict[str, str]) -> dict[str, Any]:
+    return {k: json.loads(v) for k, v in raw.items()}
+
+
+def _replace(key: str, record: dict[str, Any]) -> None:
+    pipe = get_redis().pipeline(transaction=True)
+    pipe.delete(key)
+    pipe.hset(key, mapping=_encode(record))
+    pipe.expire(key, _ttl_seconds())
+    pipe.execute()
+
+
+def write_status(file_id: UUID, payload: dict[str, Any]) -> None:
+    _replace(status_key(file_id), payload)
+
+
+def write_summary(file_id: UUID, summary: dict[str, Any]) -> None:
+    _replace(summary_key(file_id), summary)
+
+
+def read_status_and_summary(file_id: UUID) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    """Fetch both records in one round trip; missing records come back as None."""
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.hgetall(status_key(file_id))
+    pipe.hgetall(summary_key(file_id))
+    status_raw, summary_raw = pipe.execute()
+    return (_decode(status_raw) if status_raw else None, _decode(summary_raw) if summary_raw else None)
+
+
+def write_status_many(payloads: dict[UUID, dict[str, Any]], publish: bool = False) -> None:
+    """Store (and optionally announce) many status records in one round trip."""
+    ttl = _ttl_seconds()
+    pipe = get_redis().pipeline(transaction=False)
+    for file_id, payload in payloads.items():
+        key = status_key(file_id)
+        pipe.delete(key)
+        pipe.hset(key, mapping=_encode(payload))
+        pipe.expire(key, ttl)
+        if publish:
+            pipe.publish(events_channel(file_id), json.dumps(payload, ensure_ascii=False))
+    pipe.execute()
+
+
+def read_many(file_ids: list[UUID]) -> list[tuple[dict[str, Any] | None, dict[str, Any] | None]]:
+    """Status and summary records for many jobs in one round trip, in input order."""
+    pipe = get_redis().pipeline(transaction=False)
+    for file_id in file_ids:
+        pipe.hgetall(status_key(file_id))
+        pipe.hgetall(summary_key(file_id))
+    raw = pipe.execute()
+    return [
+        (_decode(st) if st else None, _decode(sm) if sm else None)
+        for st, sm in zip(raw[0::2], raw[1::2])
+    ]
+
+
+def publish_status(file_id: UUID, payload: dict[str, Any]) -> None:
+    """Notify long-poll/SSE listeners that the job's status changed."""
+    get_redis().publish(events_channel(file_id), json.dumps(payload, ensure_ascii=False))
+
+
+def delete(file_id: UUID) -> None:
+    get_redis().delete(status_key(file_id), summary_key(file_id))
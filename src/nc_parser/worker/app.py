@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from typing import Any
+
 from celery import Celery
+from celery.signals import worker_init
+from structlog import get_logger
 
 from nc_parser.core.settings import get_settings
 from nc_parser.core.worker_metrics import start_worker_metrics_server
 
 
+logger = get_logger(__name__)
+
+
 def create_celery() -> Celery:
     settings = get_settings()
     # Start Prometheus metrics server for worker
@@ -31,3 +38,19 @@ def create_celery() -> Celery:
 celery_app = create_celery()
 
 
+@worker_init.connect
+def load_field_templates(**_: Any) -> None:
+    """Compile the key-field templates before the pool forks, so children inherit them.
+
+    An invalid template stops the worker here instead of failing every parse; celery
+    only logs exceptions from signal handlers, hence SystemExit.
+    """
+    from nc_parser.processing.fields import get_field_engine
+
+    try:
+        get_field_engine()
+    except ValueError as exc:
+        logger.error("field_templates_invalid", error=str(exc))
+        raise SystemExit(1) from exc
+
+
@@ -4,14 +4,18 @@ from time import sleep
 from typing import Any
 from uuid import UUID
 
-from nc_parser.processing.parser import parse_document_to_text
-from nc_parser.storage.files import get_uploaded_file_path, write_result, write_status
+from celery import group
+
+from nc_parser.processing.parser import ParsedDocument, parse_document_to_text
+from nc_parser.storage import retention, search_index
+from nc_parser.storage.files import fetch_input, job_dir, write_artifact, write_result, write_status, write_summary
 from nc_parser.worker.app import celery_app
 from nc_parser.core.settings import get_settings
 from pathlib import Path
 import time
 from nc_parser.core.worker_metrics import observe_task
 from nc_parser.processing.captioning import caption_image_stub
+from nc_parser.processing.chunker import chunk_pages
 from pathlib import Path
 from structlog import get_logger
 
@@ -23,13 +27,49 @@ logger = get_logger(__name__)
 @observe_task("nc_parser.process_file")
 def process_file(file_id: str) -> dict[str, Any]:
     """Process file and write a dummy result; placeholder for later phases."""
+    try:
+        return _process_file(file_id)
+    except Exception as exc:
+        # The status record is the only thing /status reads, so failures must land there
+        try:
+            write_status(UUID(file_id), status="failed", error=f"{type(exc).__name__}: {exc}")
+        except Exception:
+            pass
+        raise
+
+
+@celery_app.task(name="nc_parser.process_batch")
+def process_batch(batch_id: str, file_ids: list[str]) -> dict[str, Any]:
+    """Fan a batch out to per-file tasks; the API publishes a single message per batch."""
+    group(process_file.s(fid) for fid in file_ids).apply_async()
+    return {"batch_id": batch_id, "files": len(file_ids)}
+
+
+_CAPTION_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".tiff"}
+
+
+def _append_caption_page(parsed: ParsedDocument, input_path: Path) -> None:
+    """Add the image's caption as a caption page, shaped like the parser's (kept out of chunks)."""
+    cap = caption_image_stub(input_path)
+    if not cap.text:
+        return
+    parsed.pages.append({
+        "index": len(parsed.pages),
+        "text": cap.text,
+        "elements": [{"type": "image_caption", "description": cap.text, "model": cap.model}],
+    })
+    metrics = parsed.metrics if parsed.metrics is not None else {}
+    metrics.setdefault("caption", {"count": 1, "model": cap.model})
+    parsed.metrics = metrics
+
+
+def _process_file(file_id: str) -> dict[str, Any]:
     # Update status: processing start
     write_status(UUID(file_id), status="processing", progress=0.1, stage="ingest")
-    input_path = get_uploaded_file_path(UUID(file_id))
+    input_path = fetch_input(UUID(file_id))
     # Extra debug: log input path and list of files in uploads/<file_id>
     try:
-        settings = get_settings()
-        uploads_dir = settings.data_dir / "uploads" / file_id
+        uploads_dir = job_dir("uploads", UUID(file_id))
         if uploads_dir.exists():
             files_list = [p.name for p in uploads_dir.iterdir() if p.is_file()]
         else:
@@ -38,48 +78,66 @@ def process_file(file_id: str) -> dict[str, Any]:
         logger.debug("worker_input_path", file_id=file_id, input=str(input_path), uploads=str(uploads_dir), files=files_list)
     except Exception:
         pass
-    # Debug: ensure artifacts dir is writable and visible
-    try:
-        settings = get_settings()
-        if settings.ocr_debug_dump:
-            art_dir = settings.data_dir / "artifacts" / file_id
-            art_dir.mkdir(parents=True, exist_ok=True)
-            # Write a small probe and copy original only when debug dump is enabled
-            try:
-                (art_dir / "probe.txt").write_text("ok", encoding="utf-8")
-            except Exception:
-                pass
-            try:
-                dest = art_dir / input_path.name
-                dest.write_bytes(Path(input_path).read_bytes())
-                logger.debug("worker_artifacts_copied", file_id=file_id, dest=str(dest))
-            except Exception:
-                pass
-    except Exception:
-        pass
+    # Debug: keep a probe and a copy of the original with the job's artifacts
+    if get_settings().ocr_debug_dump:
+        try:
+            write_artifact(UUID(file_id), "probe.txt", b"ok")
+            write_artifact(UUID(file_id), input_path.name, Path(input_path).read_bytes())
+            logger.debug("worker_artifacts_copied", file_id=file_id, name=input_path.name)
+        except Exception:
+            pass
     t0 = time.time()
     # Update stage: parse
     write_status(UUID(file_id), status="processing", progress=0.2, stage="parse")
     parsed = parse_document_to_text(input_path)
     t_parse = int((time.time() - t0) * 1000)
+    settings = get_settings()
     # Optional captioning (stub): if enabled and input is image
-    if get_settings().captioning_enabled and input_path.suffix.lower() in {".png", ".jpg", ".jpeg", ".bmp", ".tiff"}:
-        cap = caption_image_stub(input_path)
-        parsed.pages.append({"index": len(parsed.pages), "text": cap.text})
+    if settings.captioning_enabled and input_path.suffix.lower() in _CAPTION_SUFFIXES:
+        _append_caption_page(parsed, input_path)
+    # Retrieval chunks with page provenance, built from the parsed pages in one pass
+    chunks: list[dict[str, Any]] = []
+    t_chunk = time.perf_counter()
+    if settings.chunking_enabled:
+        write_status(UUID(file_id), status="processing", progress=0.8, stage="chunk")
+        chunks = list(chunk_pages(parsed.pages, settings.chunk_target, settings.chunk_overlap, settings.chunk_unit))
+    chunk_ms = (time.perf_counter() - t_chunk) * 1000
     result = {
         "document_id": file_id,
         "document_description": "Auto-parsed document",
         "full_text": parsed.full_text,
         "pages": parsed.pages,
-        "chunks": [],
+        "chunks": chunks,
         "processing_metrics": {
-            "timings_ms": {"parse": t_parse, **(parsed.timings_ms or {})},
+            "timings_ms": {"parse": t_parse, **(parsed.timings_ms or {}), "chunk": chunk_ms},
+            "chunking": {
+                "count": len(chunks),
+                "unit": settings.chunk_unit,
+                "target": settings.chunk_target,
+                "overlap": settings.chunk_overlap,
+            },
             **({"caption": parsed.metrics.get("caption")} if getattr(parsed, "metrics", None) and parsed.metrics.get("caption") else {}),
         },
     }
     write_result(UUID(file_id), result)
+    if settings.search_index_enabled:
+        # The index is a convenience: a failure here must not fail the job
+        try:
+            t_index = time.perf_counter()
+            rows = search_index.index_result(UUID(file_id), result)
+            logger.debug("search_indexed", file_id=file_id, rows=rows, ms=(time.perf_counter() - t_index) * 1000)
+        except Exception as exc:
+            logger.warning("search_index_failed", file_id=file_id, error=f"{type(exc).__name__}: {exc}")
+    # Small record for status polls, so they never need to open the (large) result
+    caption_metrics = result["processing_metrics"].get("caption")
+    write_summary(UUID(file_id), {
+        "pages": len(parsed.pages),
+        "chars": len(parsed.full_text or ""),
+        "timings_ms": {"parse": float(t_parse)},
+        **({"caption": caption_metrics} if caption_metrics else {}),
+    })
     # Finalize with per-stage progress sketch (heuristic for now)
-    stage_progress = {"ingest": 1.0, "parse": 1.0, "ocr": 1.0, "tables": 1.0, "caption": 1.0}
+    stage_progress = {"ingest": 1.0, "parse": 1.0, "ocr": 1.0, "tables": 1.0, "caption": 1.0, "chunk": 1.0}
     write_status(UUID(file_id), status="done", progress=1.0, timings_ms={"parse": float(t_parse)}, progress_by_stage=stage_progress)
     return result
 
@@ -87,34 +145,22 @@ def process_file(file_id: str) -> dict[str, Any]:
 @celery_app.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):  # type: ignore[no-untyped-def]
     sender.add_periodic_task(3600.0, cleanup_expired.s(), name="ttl_cleanup_hourly")
+    reconcile_every = get_settings().cleanup_reconcile_interval_h * 3600
+    if reconcile_every > 0:
+        sender.add_periodic_task(reconcile_every, reconcile_storage.s(), name="storage_reconcile")
 
 
 @celery_app.task(name="nc_parser.cleanup_expired")
 def cleanup_expired() -> dict[str, Any]:
-    settings = get_settings()
-    base = settings.data_dir
-    now = time.time()
-    ttl = settings.retention_ttl_hours * 3600
-    removed: list[str] = []
-    uploads_dir = base / "uploads"
-    if not uploads_dir.exists():
-        return {"removed": removed}
-    for dir_path in uploads_dir.iterdir():
-        if not dir_path.is_dir():
-            continue
-        meta_path = dir_path / "meta.json"
-        if not meta_path.exists():
-            continue
-        try:
-            meta = UploadMeta.from_file(meta_path)  # type: ignore[name-defined]
-            created = meta.created_ts or (meta_path.stat().st_mtime)
-            if now - created > ttl:
-                # delete corresponding folders
-                from nc_parser.storage.files import delete_all
-                delete_all(UUID(str(meta.file_id)))
-                removed.append(str(meta.file_id))
-        except Exception:
-            continue
-    return {"removed": removed}
+    """Delete jobs whose TTL has passed, reading only the due expiry manifests."""
+    report = retention.cleanup_expired()
+    logger.info("ttl_cleanup", **report)
+    return report
 
 
+@celery_app.task(name="nc_parser.reconcile_storage")
+def reconcile_storage() -> dict[str, Any]:
+    """Full scan for orphaned artifacts/results and expired jobs missing from the index."""
+    report = retention.reconcile()
+    logger.info("storage_reconcile", **report)
+    return report
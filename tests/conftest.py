@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from nc_parser.core.redis_client import get_redis
+from nc_parser.core.settings import get_settings
+
+
+@pytest.fixture()
+def data_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point NC_DATA_DIR at a temp dir for the duration of a test."""
+    monkeypatch.setenv("NC_DATA_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    get_settings().ensure_data_dirs()
+    yield tmp_path
+    get_settings.cache_clear()
+
+
+@pytest.fixture()
+def redis_db(monkeypatch: pytest.MonkeyPatch):
+    """Redis for the test: in-memory fakeredis when installed, else the server at
+    NC_TEST_REDIS_URL (flushed afterwards); skipped when neither is available."""
+    import redis
+
+    try:
+        import fakeredis
+        import fakeredis.aioredis
+    except ImportError:
+        fakeredis = None
+    if fakeredis is not None:
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr(redis.Redis, "from_url", lambda url, **kw: fakeredis.FakeRedis(server=server, **kw))
+        monkeypatch.setattr("redis.asyncio.from_url", lambda url, **kw: fakeredis.aioredis.FakeRedis(server=server, **kw))
+    else:
+        url = os.environ.get("NC_TEST_REDIS_URL")
+        if not url:
+            pytest.skip("needs fakeredis or NC_TEST_REDIS_URL")
+        monkeypatch.setenv("NC_REDIS_URL", url)
+    get_settings.cache_clear()
+    get_redis.cache_clear()
+    client = get_redis()
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip("Redis at NC_TEST_REDIS_URL is not reachable")
+    yield client
+    client.flushdb()
+    get_redis.cache_clear()
@@ -0,0 +1,67 @@
+import io
+import time
+import zipfile
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+
+from nc_parser.api.main import create_app
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import batches, retention
+from nc_parser.storage import files as storage
+from nc_parser.worker.app import celery_app
+
+
+def test_batch_zip_is_queued_with_one_publish(data_dir, monkeypatch) -> None:
+    sent: list[tuple] = []
+    monkeypatch.setattr(celery_app, "send_task", lambda name, args=None, **kw: sent.append((name, args)))
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        zf.writestr("docs/a.txt", "alpha")
+        zf.writestr("b.txt", "beta")
+        zf.writestr("__MACOSX/._b.txt", "junk")
+    client = TestClient(create_app())
+    resp = client.post("/batch", files={"archive": ("in.zip", buf.getvalue(), "application/zip")})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [m["filename"] for m in body["files"]] == ["a.txt", "b.txt"]
+    assert len(sent) == 1 and sent[0][0] == "nc_parser.process_batch"
+
+    batch = client.get(f"/batch/{body['batch_id']}").json()
+    assert batch["status"] == "queued" and batch["total"] == 2 and batch["counts"] == {"queued": 2}
+
+
+def test_status_bulk_reports_unknown_ids(data_dir, monkeypatch) -> None:
+    monkeypatch.setattr(celery_app, "send_task", lambda *a, **kw: None)
+    client = TestClient(create_app())
+    body = client.post("/batch", files=[("files", ("x.txt", b"x")), ("files", ("y.txt", b"y"))]).json()
+    ids = [m["file_id"] for m in body["files"]] + ["00000000-0000-0000-0000-000000000000"]
+    statuses = client.post("/status/bulk", json={"file_ids": ids}).json()["statuses"]
+    assert [s["status"] for s in statuses] == ["queued", "queued", "not_found"]
+    assert client.post("/status/bulk", json={"file_ids": ["nope"]}).status_code == 400
+
+
+def test_failed_enqueue_marks_members_failed(data_dir, monkeypatch) -> None:
+    def _down(*a, **kw):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(celery_app, "send_task", _down)
+    client = TestClient(create_app())
+    resp = client.post("/batch", files=[("files", ("x.txt", b"x")), ("files", ("y.txt", b"y"))])
+    assert resp.status_code == 503
+    batch_id = next((data_dir / "batches").glob("*.json")).stem
+    batch = client.get(f"/batch/{batch_id}").json()
+    assert batch["counts"] == {"failed": 2} and batch["status"] == "done"
+
+
+def test_expired_batch_is_deleted_with_members(data_dir, monkeypatch) -> None:
+    monkeypatch.setattr(celery_app, "send_task", lambda *a, **kw: None)
+    client = TestClient(create_app())
+    body = client.post("/batch", files=[("files", ("x.txt", b"x"))]).json()
+    batch_id, member = UUID(body["batch_id"]), UUID(body["files"][0]["file_id"])
+    ttl = get_settings().retention_ttl_hours * 3600
+    report = retention.cleanup_expired(now=time.time() + ttl + 3600)
+    assert report["batches"] == 1 and report["expired"] == 1
+    assert storage.job_dirs(member) == []
+    assert client.get(f"/batch/{batch_id}").status_code == 404
+    assert not batches._batch_path(batch_id).exists()
@@ -0,0 +1,63 @@
+import pydantic
+import pytest
+from PIL import Image
+
+from nc_parser.core.settings import get_settings
+from nc_parser.processing.chunker import Chunker, chunk_pages
+from nc_parser.processing.parser import ParsedDocument
+from nc_parser.worker.tasks import _append_caption_page
+
+
+def _para(n: int, word: str) -> str:
+    return " ".join(f"{word} {i} is here." for i in range(n))
+
+
+PAGES = [
+    {"index": 0, "text": "\n\n".join([_para(5, "alpha"), _para(5, "beta"), _para(5, "gamma")])},
+    {"index": 1, "text": "h1 | h2\na | 1\nb | 2", "elements": [{"type": "table_html", "description": "<table/>"}]},
+    {"index": 2, "text": "caption", "elements": [{"type": "image_caption", "description": "caption"}]},
+    {"index": 3, "text": _para(3, "delta")},
+]
+
+
+def test_chunks_respect_paragraphs_and_carry_provenance() -> None:
+    chunks = list(chunk_pages(PAGES, target=30, overlap=8))
+    assert [c["index"] for c in chunks] == list(range(len(chunks)))
+    for c in chunks:
+        assert c["text"] == "\n\n".join(PAGES[p]["text"][a:b] for p, a, b in c["spans"])
+        assert c["pages"] == [p for p, _, _ in c["spans"]]
+        assert 2 not in c["pages"]  # caption pages stay out, as in full_text
+    # 20-word paragraphs: the first chunk ends at a paragraph boundary, not mid-paragraph
+    assert chunks[0]["text"] == _para(5, "alpha") and chunks[0]["size"] == 20
+    # Overlap: the next chunk starts with the last sentence(s) of the previous one
+    assert chunks[1]["text"].startswith("alpha 3 is here. alpha 4 is here.")
+    # The table is never split and the last chunk spans table and prose pages
+    assert chunks[-1]["pages"][-2:] == [1, 3] and "h1 | h2\na | 1\nb | 2" in chunks[-1]["text"]
+    assert chunks == list(chunk_pages(PAGES, target=30, overlap=8))
+
+
+def test_incremental_emission() -> None:
+    chunker = Chunker(target=10, overlap=0)
+    first = list(chunker.add_page(0, _para(6, "w")))
+    assert [c["size"] for c in first] == [8, 8]  # emitted before the document ends
+    assert [c["size"] for c in chunker.finish()] == [8]
+
+
+def test_worker_caption_page_is_built_like_the_parsers(data_dir) -> None:
+    image = data_dir / "photo.png"
+    Image.new("RGB", (40, 30), "white").save(image)
+    parsed = ParsedDocument(full_text="text", pages=[{"index": 0, "text": _para(3, "alpha")}])
+    _append_caption_page(parsed, image)
+    page = parsed.pages[-1]
+    assert page["index"] == 1 and page["elements"][0]["type"] == "image_caption"
+    assert page["elements"][0]["description"] == page["text"] == "Image 40x30, mode=RGB"
+    assert parsed.metrics["caption"] == {"count": 1, "model": "stub"}
+    assert all(c["pages"] == [0] for c in chunk_pages(parsed.pages, target=30, overlap=8))
+
+
+def test_chunk_unit_is_validated(monkeypatch) -> None:
+    monkeypatch.setenv("NC_CHUNK_UNIT", "sentences")
+    get_settings.cache_clear()
+    with pytest.raises(pydantic.ValidationError):
+        get_settings()
+    get_settings.cache_clear()
@@ -0,0 +1,29 @@
+import json
+
+from nc_parser.processing.csv_stream import read_csv
+from nc_parser.processing.parser import parse_document_to_text
+
+
+def test_quoted_multiline_fields_and_summary(tmp_path) -> None:
+    src = tmp_path / "export.csv"
+    rows = ["name;amount;note"] + [f'позиция {i};{i}.5;"первая строка\nвторая <строка>"' for i in range(30)]
+    src.write_bytes("\n".join(rows + ["итог;7;ок", ""]).encode("cp1251"))
+    content = read_csv(src, html_max_rows=10, text_max_chars=1_000_000)
+    assert content.delimiter == ";" and content.has_header
+    assert content.rows == 31
+    assert [(c.name, c.type, c.non_empty) for c in content.columns] == [
+        ("name", "text", 31), ("amount", "number", 31), ("note", "text", 31),
+    ]
+    assert "<td>первая строка\nвторая &lt;строка&gt;</td>" in content.html
+    assert "21 more rows not shown" in content.html
+    assert "итог | 7 | ок" in content.text
+
+
+def test_csv_document_caps_text(tmp_path) -> None:
+    src = tmp_path / "big.csv"
+    src.write_text("a,b\n" + "".join(f"{i},x{i}\n" for i in range(5000)), encoding="utf-8")
+    doc = parse_document_to_text(src)
+    table, summary = doc.pages[0]["elements"]
+    assert table["type"] == "table_html" and table["description"].startswith("<table><thead><tr><th>a</th>")
+    assert json.loads(summary["description"])["rows"] == 5000
+    assert "4999 | x4999" in doc.full_text
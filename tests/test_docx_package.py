@@ -0,0 +1,84 @@
+import io
+import zipfile
+
+from PIL import Image
+
+from nc_parser.processing.docx_package import DocxPackage
+from nc_parser.processing.parser import parse_document_to_text
+
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+def _p(text: str) -> str:
+    return f"<w:p><w:r><w:t xml:space=\"preserve\">{text}</w:t></w:r></w:p>"
+
+
+def _tc(text: str, props: str = "") -> str:
+    return f"<w:tc><w:tcPr>{props}</w:tcPr>{_p(text)}</w:tc>"
+
+
+DOCUMENT = f"""<?xml version="1.0" encoding="UTF-8"?>
+<w:document {W}><w:body>
+{_p("Intro")}
+<w:p><w:r><w:t>Gross</w:t><w:tab/><w:t>100</w:t></w:r><w:del><w:r><w:delText>old</w:delText></w:r></w:del>
+  <w:r><w:instrText>PAGE</w:instrText></w:r></w:p>
+<w:tbl>
+  <w:tr><w:trPr><w:tblHeader/></w:trPr>{_tc("Region", '<w:gridSpan w:val="2"/>')}</w:tr>
+  <w:tr>{_tc("North", '<w:vMerge w:val="restart"/>')}{_tc("10")}</w:tr>
+  <w:tr>{_tc("", "<w:vMerge/>")}{_tc("20")}</w:tr>
+</w:tbl>
+{_p("Outro")}
+</w:body></w:document>"""
+NOTES = f"""<w:footnotes {W}>
+<w:footnote w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:footnote>
+<w:footnote w:id="1">{_p("See annex B")}</w:footnote></w:footnotes>"""
+RELS = f"""<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="{R}/header" Target="header1.xml"/>
+<Relationship Id="rId2" Type="{R}/footer" Target="footer1.xml"/>
+<Relationship Id="rId3" Type="{R}/footnotes" Target="footnotes.xml"/>
+<Relationship Id="rId4" Type="{R}/image" Target="media/image1.png"/>
+<Relationship Id="rId5" Type="{R}/hyperlink" Target="https://example.com" TargetMode="External"/>
+</Relationships>"""
+
+
+def _make_docx(path) -> None:
+    png = io.BytesIO()
+    Image.new("L", (4, 4)).save(png, "PNG")
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("word/document.xml", DOCUMENT)
+        zf.writestr("word/_rels/document.xml.rels", RELS)
+        zf.writestr("word/header1.xml", f"<w:hdr {W}>{_p('ACME Confidential')}</w:hdr>")
+        zf.writestr("word/footer1.xml", f"<w:ftr {W}>{_p('Page footer')}</w:ftr>")
+        zf.writestr("word/footnotes.xml", NOTES)
+        zf.writestr("word/media/image1.png", png.getvalue())
+
+
+def test_docx_package_single_pass(tmp_path) -> None:
+    src = tmp_path / "a.docx"
+    _make_docx(src)
+    with DocxPackage(src) as pkg:
+        body = pkg.body()
+        assert [kind for kind, _ in body.blocks] == ["paragraph", "paragraph", "table", "paragraph"]
+        assert body.paragraphs == ["Intro", "Gross\t100", "Outro"]
+        assert body.tables == [[
+            [{"text": "Region", "colspan": 2, "rowspan": 1, "header": True}],
+            [
+                {"text": "North", "colspan": 1, "rowspan": 2, "header": False},
+                {"text": "10", "colspan": 1, "rowspan": 1, "header": False},
+            ],
+            [{"text": "20", "colspan": 1, "rowspan": 1, "header": False}],
+        ]]
+        assert (pkg.headers(), pkg.footers(), pkg.notes()) == (["ACME Confidential"], ["Page footer"], ["See annex B"])
+        (image,) = pkg.images()
+        assert image.name == "word/media/image1.png" and pkg.read_image(image).startswith(b"\x89PNG")
+
+
+def test_docx_document_pages(tmp_path) -> None:
+    src = tmp_path / "a.docx"
+    _make_docx(src)
+    doc = parse_document_to_text(src)
+    assert doc.pages[0]["text"] == "Intro\nGross 100\nOutro"
+    assert [el["type"] for el in doc.pages[0]["elements"]] == ["page_header", "page_footer", "footnote"]
+    assert '<td rowspan="2">North</td>' in doc.pages[-1]["elements"][0]["description"]
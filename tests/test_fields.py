@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+from nc_parser.core.settings import get_settings
+from nc_parser.processing import fields as fields_mod
+from nc_parser.processing.fields import FieldEngine, FieldTemplate, extract_fields, load_templates
+
+
+PERMIT = """GOVERNMENT OF EXAMPLE
+WORK PERMIT
+Work Permit No: WP-2024/0117
+Name: JOHN A. SMITH
+Date of Birth: 12 MAR 1985
+Nationality: British
+Passport No. 5123456
+Name of the Employer ACME BUILD CO.
+TECHNICAL SUPERVISOR (SITE)
+Date of issue: 01 Jan 2024
+Date of Expiry: 31 Dec 2025
+"""
+
+
+def test_builtin_work_permit_template_values_and_positions() -> None:
+    results = extract_fields(PERMIT)
+    assert [r.template for r in results] == ["work_permit"]
+    values = results[0].values()
+    assert values["work_permit_no"] == "WP-2024/0117"
+    assert values["passport_no"] == "5123456"
+    assert values["dob"] == "12 MAR 1985"
+    assert values["date_of_expiry"] == "31 Dec 2025"
+    assert values["position"] == "TECHNICAL SUPERVISOR (SITE)"
+    for name, (start, end) in results[0].positions().items():
+        assert PERMIT[start:end] == values[name]
+    # No document type recognised: the general fields, as before templates existed
+    (generic,) = extract_fields("Name: JOHN SMITH\nPassport No. 5123456")
+    assert generic.template == "formal_document"
+    assert generic.values() == {"name": "JOHN SMITH", "passport_no": "5123456"}
+    assert extract_fields("Plain prose without any key fields.") == []
+
+
+def test_templates_dir_overrides_and_validation(tmp_path, monkeypatch) -> None:
+    (tmp_path / "work_permit.json").write_text(json.dumps({
+        "name": "work_permit",
+        "detect": ["Work\\s*Permit"],
+        "fields": {"permit": ["No:\\s*(\\S+)", "Permit\\s+(\\S+)"]},
+    }))
+    monkeypatch.setenv("NC_FIELD_TEMPLATES_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    fields_mod.get_field_engine.cache_clear()
+    try:
+        (result,) = extract_fields(PERMIT)
+        assert result.values() == {"permit": "WP-2024/0117"}
+        assert result.matches["permit"].pattern == 0
+        assert {t.name for t in load_templates(tmp_path)} >= {"work_permit", "visa_grant"}
+    finally:
+        monkeypatch.delenv("NC_FIELD_TEMPLATES_DIR")
+        get_settings.cache_clear()
+        fields_mod.get_field_engine.cache_clear()
+
+    with pytest.raises(ValueError):
+        FieldEngine([FieldTemplate("bad", {"x": ("(?P<v>x)",)})])
+
+
+def test_overlapping_detect_patterns() -> None:
+    engine = FieldEngine([
+        FieldTemplate("permit", {"no": ("No:\\s*(\\S+)",)}, detect=("Work\\s*Permit",)),
+        FieldTemplate("permit_no", {"no": ("No:\\s*(\\S+)",)}, detect=("Permit\\s*No",)),
+        FieldTemplate("permit_full", {"no": ("No:\\s*(\\S+)",)}, detect=("Work\\s*Permit\\s*No",)),
+        FieldTemplate("general", {"no": ("No:\\s*(\\S+)",)}, fallback=True),
+    ])
+    assert engine.detect("WORK PERMIT No: WP-1") == ["permit", "permit_no", "permit_full"]
+    assert engine.detect("Receipt No: 7") == ["general"]
+
+
+def test_fields_matching_at_the_same_offset() -> None:
+    invoice = FieldTemplate("invoice", {
+        "number": ("invoice\\s*(?:no\\.?|number|#)?\\s*[:#]?\\s*([A-Z0-9-]+)",),
+        "date": ("invoice\\s+date\\s*:?\\s*(\\S+)",),
+        "total": ("total:\\s*()", "total\\s+due:\\s*(\\S+)"),
+    })
+    text = "Invoice date: 2024-01-02\nTotal: \nTotal due: 12.50"
+    (result,) = FieldEngine([invoice]).extract(text)
+    assert result.values() == {"number": "date", "date": "2024-01-02", "total": "12.50"}
+    assert all(text[m.start:m.end] == m.value for m in result.matches.values())
+    assert result.matches["total"].pattern == 1
+
+
+def test_invalid_templates_fail_at_startup(tmp_path, monkeypatch) -> None:
+    from fastapi.testclient import TestClient
+
+    from nc_parser.api.main import create_app
+    from nc_parser.worker.app import load_field_templates
+
+    (tmp_path / "broken.json").write_text(json.dumps({"name": "broken", "fields": {"x": ["(unclosed"]}}))
+    monkeypatch.setenv("NC_FIELD_TEMPLATES_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    fields_mod.get_field_engine.cache_clear()
+    try:
+        with pytest.raises(SystemExit):
+            load_field_templates()
+        with pytest.raises(ValueError, match="broken"):
+            with TestClient(create_app()):
+                pass
+    finally:
+        monkeypatch.delenv("NC_FIELD_TEMPLATES_DIR")
+        get_settings.cache_clear()
+        fields_mod.get_field_engine.cache_clear()
@@ -11,3 +11,11 @@ def test_healthz() -> None:
     assert resp.json() == {"status": "ok"}
 
 
+
+
+def test_loop_lag_monitor_runs_with_app_lifecycle(data_dir) -> None:
+    app = create_app()
+    with TestClient(app) as client:
+        assert client.get("/healthz").status_code == 200
+        assert not app.state.loop_lag_task.done()
+    assert app.state.loop_lag_task.cancelled()
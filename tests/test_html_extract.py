@@ -0,0 +1,31 @@
+from nc_parser.processing.html_extract import extract_html
+from nc_parser.processing.parser import parse_document_to_text
+
+
+PAGE = """<html><head><title>T</title><script>var s = "<p>x</p>";</script></head><body>
+<nav>Home | About<table><tr><td>menu</td></tr></table></nav>
+<div>Share</div><h1>Report &amp; summary</h1><div>Share</div>
+<table><tr><th colspan="2">Totals</th></tr><tr><td rowspan="2">Q1</td><td>10 <b>EUR</b></td></tr></table>
+<footer>(c) Example</footer></body></html>"""
+
+
+def test_single_pass_text_and_span_tables() -> None:
+    content = extract_html(PAGE)
+    assert content.text.split() == ["Share", "Report", "&", "summary", "Totals", "Q1", "10", "EUR"]
+    assert content.tables == [[
+        [{"text": "Totals", "colspan": 2, "rowspan": 1, "header": True}],
+        [
+            {"text": "Q1", "colspan": 1, "rowspan": 2, "header": False},
+            {"text": "10EUR", "colspan": 1, "rowspan": 1, "header": False},
+        ],
+    ]]
+
+
+def test_html_document_tables_keep_spans(tmp_path) -> None:
+    src = tmp_path / "page.html"
+    src.write_bytes(PAGE.replace("summary", "сводка").encode("utf-8-sig"))
+    doc = parse_document_to_text(src)
+    assert "сводка" in doc.pages[0]["text"] and "menu" not in doc.full_text
+    (table,) = doc.pages[1]["elements"]
+    assert '<th colspan="2">Totals</th>' in table["description"]
+    assert '<td rowspan="2">Q1</td>' in table["description"]
@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+
+from nc_parser.processing.lattice import detect_tables, read_table
+
+
+def _page() -> np.ndarray:
+    img = np.full((1400, 1200), 255, np.uint8)
+    cv2.putText(img, "Invoice 42", (100, 120), cv2.FONT_HERSHEY_SIMPLEX, 1, 0, 2)
+    for y in (300, 380, 460, 540):
+        cv2.line(img, (100, y), (1000, y), 0, 2)
+    for x in (100, 400, 700, 1000):
+        cv2.line(img, (x, 300), (x, 540), 0, 2)
+    cv2.line(img, (400, 303), (400, 377), 255, 5)  # first row: columns 0-1 merged
+    cv2.putText(img, "Total", (120, 430), cv2.FONT_HERSHEY_SIMPLEX, 1, 0, 2)
+    cv2.putText(img, "99", (720, 510), cv2.FONT_HERSHEY_SIMPLEX, 1, 0, 2)
+    return img
+
+
+def test_grid_with_merged_cell() -> None:
+    (table,), _ = detect_tables(_page())
+    assert (table.n_rows, table.n_cols) == (3, 3)
+    assert [(c.row, c.col, c.rowspan, c.colspan) for c in table.cells][:3] == [(0, 0, 1, 2), (0, 2, 1, 1), (1, 0, 1, 1)]
+
+
+def test_cells_read_in_one_batch() -> None:
+    gray = _page()
+    (table,), ink = detect_tables(gray)
+    calls = []
+
+    def ocr(strip):
+        # One "word" per ink blob, reported at its box like tesseract's image_to_data
+        calls.append(strip.size)
+        arr = 255 - np.array(strip)
+        n, _, stats, _ = cv2.connectedComponentsWithStats((arr > 128).astype(np.uint8))
+        rows = sorted({(int(y) // 40) * 40 for _, y, _, _, _ in stats[1:n]})
+        return {"text": [f"w{i}" for i in range(len(rows))], "top": rows, "height": [20] * len(rows)}
+
+    rows = read_table(gray, ink, table, ocr)
+    assert len(calls) == 1
+    texts = [[c["text"] for c in row] for row in rows]
+    assert texts == [["", ""], ["w0", "", ""], ["", "", "w1"]]
+    assert rows[0][0]["colspan"] == 2
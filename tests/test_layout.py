@@ -0,0 +1,23 @@
+import shutil
+
+from nc_parser.storage import files as storage
+from nc_parser.storage.layout import migrate_flat_layout
+
+
+def test_sharded_layout_and_flat_migration(data_dir) -> None:
+    new = storage.init_upload(filename="a.txt")
+    name = str(new)
+    assert storage.job_dir("uploads", new) == data_dir / "uploads" / name[:2] / name[2:4] / name
+
+    # A job left over from the flat layout stays readable until it is migrated
+    legacy = storage.init_upload(filename="b.txt")
+    storage.write_status(legacy, status="done", progress=1.0)
+    shutil.move(str(storage.job_dir("uploads", legacy)), str(storage.flat_job_dir("uploads", legacy)))
+    assert storage.job_dir("uploads", legacy) == storage.flat_job_dir("uploads", legacy)
+    assert storage.read_status(legacy)["status"] == "done"
+
+    report = migrate_flat_layout()
+    assert report["moved"] == 1 and report["conflicts"] == 0
+    assert not storage.flat_job_dir("uploads", legacy).exists()
+    assert storage.read_meta(legacy).filename == "b.txt"
+    assert {fid for fid, _ in storage.iter_job_dirs("uploads")} == {new, legacy}
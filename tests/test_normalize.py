@@ -0,0 +1,41 @@
+from nc_parser.processing.normalize import NormalizedText, normalize_text
+from nc_parser.processing.parser import parse_document_to_text
+
+
+def test_normalize_is_single_pass_and_idempotent(monkeypatch) -> None:
+    raw = "Total:\t\t1\xa0000 −5  \r\n•\n---\nÐ¿Ñ€Ð¸Ð²ÐµÑ‚  \n\n  ok"
+    out = normalize_text(raw)
+    assert out == "Total: 1 000 -5\nпривет\n\n ok"
+    assert normalize_text(str(out)) == out
+
+    # Already-normalised strings are passed through without re-running ftfy
+    import nc_parser.processing.normalize as mod
+    monkeypatch.setattr(mod.ftfy, "fix_text", lambda t: (_ for _ in ()).throw(AssertionError))
+    assert isinstance(out, NormalizedText) and normalize_text(out) is out
+
+
+def test_full_text_is_built_from_normalized_pages(tmp_path) -> None:
+    src = tmp_path / "a.txt"
+    src.write_text("Hello   world\t \n•\nline two", encoding="utf-8")
+    doc = parse_document_to_text(src)
+    assert doc.full_text == "Hello world\nline two"
+    assert [p["text"] for p in doc.pages] == [doc.full_text]
+
+
+def test_fix_text_runs_ftfy_only_on_flagged_lines(monkeypatch) -> None:
+    import ftfy
+
+    import nc_parser.processing.normalize as mod
+
+    dirty = "clean line\nsÃ³ â€œquotedâ€\x9d\r\n“curly” ﬁne &amp; ＬＯＵＤ\nПривет\n"
+    assert mod.fix_text(dirty) == ftfy.fix_text(dirty)
+
+    seen: list[str] = []
+    real = ftfy.fix_text
+    monkeypatch.setattr(mod.ftfy, "fix_text", lambda t, c=None: seen.append(t) or real(t, c))
+    clean = "plain ascii\nКириллица, é, ✔ and 中文\n<b>&amp;</b>"
+    assert mod.fix_text(clean) is clean and seen == []
+    changed = mod._SEGMENTS["changed"]._value.get()
+    assert mod.fix_text("ok\nsÃ³\nok") == "ok\nsó\nok"
+    assert seen == ["sÃ³\n"]
+    assert mod._SEGMENTS["changed"]._value.get() == changed + 1
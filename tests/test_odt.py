@@ -0,0 +1,69 @@
+import zipfile
+
+from nc_parser.processing.odt import read_odt
+from nc_parser.processing.parser import parse_document_to_text
+
+
+NS = (
+    'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+    'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+    'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0"'
+)
+CONTENT = f"""<?xml version="1.0" encoding="UTF-8"?>
+<office:document-content {NS}><office:body><office:text>
+<text:tracked-changes><text:changed-region><text:p>deleted text</text:p></text:changed-region></text:tracked-changes>
+<text:h text:outline-level="1">Quarterly <text:span>report</text:span></text:h>
+<text:p>Revenue<text:s text:c="3"/>grew<text:tab/>fast</text:p>
+<table:table>
+  <table:table-header-rows><table:table-row>
+    <table:table-cell table:number-columns-spanned="2"><text:p>Region</text:p></table:table-cell>
+    <table:covered-table-cell/>
+  </table:table-row></table:table-header-rows>
+  <table:table-row>
+    <table:table-cell table:number-rows-spanned="2"><text:p>North</text:p></table:table-cell>
+    <table:table-cell><text:p>10</text:p><text:p>EUR</text:p></table:table-cell>
+  </table:table-row>
+</table:table>
+</office:text></office:body></office:document-content>"""
+STYLES = f"""<?xml version="1.0" encoding="UTF-8"?>
+<office:document-styles {NS}><office:master-styles>
+<style:master-page style:name="Standard">
+  <style:header><text:p>ACME Confidential</text:p></style:header>
+  <style:footer><text:p>Page footer</text:p></style:footer>
+  <style:footer-left><text:p>Page footer</text:p></style:footer-left>
+</style:master-page>
+</office:master-styles></office:document-styles>"""
+
+
+def _make_odt(path) -> None:
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("mimetype", "application/vnd.oasis.opendocument.text")
+        zf.writestr("content.xml", CONTENT)
+        zf.writestr("styles.xml", STYLES)
+
+
+def test_read_odt_single_pass(tmp_path) -> None:
+    src = tmp_path / "r.odt"
+    _make_odt(src)
+    odt = read_odt(src)
+    assert odt is not None
+    assert odt.paragraphs == ["Quarterly report", "Revenue   grew\tfast", "Region", "North", "10", "EUR"]
+    assert odt.tables == [[
+        [{"text": "Region", "colspan": 2, "rowspan": 1, "header": True}],
+        [
+            {"text": "North", "colspan": 1, "rowspan": 2, "header": False},
+            {"text": "10 EUR", "colspan": 1, "rowspan": 1, "header": False},
+        ],
+    ]]
+    assert odt.headers == ["ACME Confidential"] and odt.footers == ["Page footer"]
+
+
+def test_odt_document_pages(tmp_path) -> None:
+    src = tmp_path / "r.odt"
+    _make_odt(src)
+    doc = parse_document_to_text(src)
+    assert doc.pages[0]["text"].startswith("Quarterly report\nRevenue grew fast")
+    assert [el["type"] for el in doc.pages[0]["elements"]] == ["page_header", "page_footer"]
+    assert '<th colspan="2">Region</th>' in doc.pages[1]["elements"][0]["description"]
+    assert "deleted text" not in doc.full_text
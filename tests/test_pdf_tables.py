@@ -0,0 +1,62 @@
+from nc_parser.processing.pdf_tables import extract_pdf_tables
+
+
+def _pdf(pages: list[bytes], form: bytes) -> bytes:
+    """Minimal PDF: one page per content stream, a shared Helvetica font and form XObject /Fm0."""
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")  # 3
+    objs.append(b"<< /Type /XObject /Subtype /Form /BBox [0 0 400 400] /Length %d >>\nstream\n%s\nendstream" % (len(form), form))  # 4
+    kids = []
+    for content in pages:
+        objs.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objs.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R"
+            b" /Resources << /Font << /F1 3 0 R >> /XObject << /Fm0 4 0 R >> >> >>" % (len(objs))
+        )
+        kids.append(b"%d 0 R" % len(objs))
+    objs[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % o for o in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+
+PROSE = b"q 0 0 612 792 re W n BT /F1 12 Tf 72 700 Td (Plain prose, 1 2 3 4 re S) Tj ET Q"
+# 2x2 grid in form space, drawn at half scale; the labels sit inside the scaled cells
+GRID = b"0.5 w 100 100 m 300 100 l S 100 200 m 300 200 l S 100 300 m 300 300 l S 100 100 m 100 300 l S 200 100 m 200 300 l S 300 100 m 300 300 l S"
+TABLE = (
+    b"q 0.5 0 0 0.5 100 100 cm /Fm0 Do Q "
+    b"BT /F1 10 Tf 160 220 Td (Name) Tj 50 0 Td (Qty) Tj -50 -50 Td (Bolt) Tj 50 0 Td (4) Tj ET"
+)
+
+
+def test_prefilter_skips_pages_without_ruling(tmp_path) -> None:
+    src = tmp_path / "doc.pdf"
+    src.write_bytes(_pdf([PROSE, TABLE], GRID))
+    tables, probes = extract_pdf_tables(src)
+    assert [(p.page, p.candidate, p.reason) for p in probes] == [(1, False, "no_ruling"), (2, True, "ruling")]
+    assert (probes[1].h_rules, probes[1].v_rules) == (3, 3)
+    assert tables == [[["Name", "Qty"], ["Bolt", "4"]]]
+    forced, probes = extract_pdf_tables(src, force=True)
+    assert forced == tables and all(p.reason == "forced" for p in probes)
+
+
+def test_dashed_ruling_is_a_candidate(tmp_path) -> None:
+    # The TABLE grid redrawn in page space as 2 pt dashes with 1 pt gaps
+    dashes = [b"0.5 w"]
+    for pos in (150, 200, 250):
+        for start in range(150, 250, 3):
+            end = min(start + 2, 250)
+            dashes.append(b"%d %d m %d %d l S %d %d m %d %d l S" % (start, pos, end, pos, pos, start, pos, end))
+    labels = TABLE[TABLE.index(b"BT"):]
+    src = tmp_path / "dashed.pdf"
+    src.write_bytes(_pdf([b" ".join(dashes) + b" " + labels], GRID))
+    tables, probes = extract_pdf_tables(src)
+    assert [(p.candidate, p.reason, p.h_rules, p.v_rules) for p in probes] == [(True, "ruling", 3, 3)]
+    assert tables == [[["Name", "Qty"], ["Bolt", "4"]]]
@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+
+from nc_parser.api.main import create_app
+from nc_parser.storage import files as storage
+
+
+def _store_result(file_id) -> None:
+    pages = [{"index": i, "text": f"page {i}"} for i in range(4)]
+    pages[2]["elements"] = [
+        {"type": "table_html", "description": "<table><tr><td>a</td></tr></table>"},
+        {"type": "fields", "description": "{}"},
+    ]
+    storage.write_result(file_id, {
+        "document_id": str(file_id),
+        "full_text": "big text",
+        "pages": pages,
+        "chunks": [],
+        "processing_metrics": {"timings_ms": {"parse": 1}},
+    })
+
+
+def test_result_projection_and_page_ranges(data_dir) -> None:
+    file_id = storage.init_upload(filename="a.txt")
+    _store_result(file_id)
+    client = TestClient(create_app())
+
+    body = client.get(f"/result/{file_id}", params={"fields": "processing_metrics"}).json()
+    assert set(body) == {"document_id", "processing_metrics"}
+
+    body = client.get(f"/result/{file_id}", params={"fields": "pages", "pages": "1-2"}).json()
+    assert [p["index"] for p in body["pages"]] == [1, 2] and body["page_count"] == 4
+
+    body = client.get(f"/result/{file_id}", params={"elements": "table_html"}).json()
+    assert [p["index"] for p in body["pages"]] == [2]
+    assert [el["type"] for el in body["pages"][0]["elements"]] == ["table_html"]
+
+    assert client.get(f"/result/{file_id}/pages/3").json()["text"] == "page 3"
+    assert client.get(f"/result/{file_id}/pages/9").status_code == 404
+    tables = client.get(f"/result/{file_id}/tables").json()["tables"]
+    assert tables == [{"page": 2, "html": "<table><tr><td>a</td></tr></table>"}]
+    assert client.get(f"/result/{file_id}", params={"pages": "x"}).status_code == 400
+
+
+def test_result_etag_and_precompressed_serving(data_dir) -> None:
+    file_id = storage.init_upload(filename="a.txt")
+    _store_result(file_id)
+    client = TestClient(create_app())
+
+    resp = client.get(f"/result/{file_id}", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.json()["full_text"] == "big text"
+    etag = resp.headers["etag"]
+    assert client.get(f"/result/{file_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    plain = client.get(f"/result/{file_id}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.json() == resp.json()
+    # Each coding is its own representation
+    assert plain.headers["etag"] != etag
+    assert client.get(f"/result/{file_id}", headers={"Accept-Encoding": "identity", "If-None-Match": etag}).status_code == 200
+
+    page = client.get(f"/result/{file_id}/pages/1")
+    assert page.headers["etag"] != etag
+    assert client.get(f"/result/{file_id}/pages/1", headers={"If-None-Match": page.headers["etag"]}).status_code == 304
@@ -0,0 +1,37 @@
+import gzip
+import json
+
+import pytest
+
+from nc_parser.storage import results
+
+
+def _sample() -> dict:
+    return {
+        "document_id": "d1",
+        "full_text": "hello\nworld",
+        "pages": [{"index": i, "text": f"page {i} ünïcode"} for i in range(5)],
+        "chunks": [],
+        "processing_metrics": {"timings_ms": {"parse": 1}},
+    }
+
+
+def test_result_roundtrip_and_random_page_access(tmp_path) -> None:
+    data = _sample()
+    out = results.write_result_file(tmp_path, data)
+    assert results.read_result_file(tmp_path) == data
+    # The stored stream is the complete JSON document, so it can be served as-is
+    assert json.loads(gzip.decompress(out.read_bytes())) == data
+    assert results.read_result_page(tmp_path, 3) == data["pages"][3]
+    header = results.read_result_header(tmp_path)
+    assert "pages" not in header and header["page_count"] == 5
+    assert header["full_text"] == data["full_text"]
+    with pytest.raises(IndexError):
+        results.read_result_page(tmp_path, 5)
+
+
+def test_legacy_plain_result_is_still_readable(tmp_path) -> None:
+    data = _sample()
+    (tmp_path / "result.json").write_text(json.dumps(data), encoding="utf-8")
+    assert results.read_result_file(tmp_path) == data
+    assert results.read_result_page(tmp_path, 1) == data["pages"][1]
@@ -0,0 +1,32 @@
+import time
+
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import files as storage
+from nc_parser.storage import retention
+
+
+def test_cleanup_reads_only_due_manifests(data_dir) -> None:
+    old = storage.init_upload(filename="old.txt")
+    fresh = storage.init_upload(filename="fresh.txt")
+    (storage.job_dir("uploads", old) / "old.txt").write_bytes(b"x" * 100)
+    ttl = get_settings().retention_ttl_hours * 3600
+    # Re-index "old" as if it had been created two TTLs ago
+    for p in (data_dir / retention.EXPIRY_DIR).iterdir():
+        p.unlink()
+    retention.record_expiry(old, time.time() - 2 * ttl)
+    retention.record_expiry(fresh, time.time())
+
+    report = retention.cleanup_expired()
+    assert report["expired"] == 1 and report["bytes_freed"] >= 100
+    assert storage.job_dirs(old) == [] and storage.job_dirs(fresh)
+    assert retention.cleanup_expired()["manifests"] == 0
+
+
+def test_reconcile_removes_orphans(data_dir) -> None:
+    kept = storage.init_upload(filename="a.txt")
+    orphan = data_dir / "results" / "00000000-0000-0000-0000-000000000001"
+    orphan.mkdir(parents=True)
+    (orphan / "result.json").write_text("{}")
+    report = retention.reconcile(now=time.time() + 2 * 3600)
+    assert report["orphans"] == 1 and not orphan.exists()
+    assert storage.job_dirs(kept)
@@ -0,0 +1,53 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from nc_parser.api.main import create_app
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import files as storage
+from nc_parser.storage import search_index
+
+
+def _result(file_id, passport: str) -> dict:
+    return {
+        "document_id": str(file_id),
+        "pages": [
+            {"index": 0, "text": "Work permit issued to the holder"},
+            {"index": 1, "text": f"Passport No: {passport}", "elements": [
+                {"type": "fields", "description": json.dumps({"passport_no": passport})},
+            ]},
+        ],
+        "chunks": [
+            {"index": 0, "text": "Work permit issued to the holder", "pages": [0]},
+            {"index": 1, "text": f"Passport No: {passport}", "pages": [1]},
+        ],
+    }
+
+
+def test_index_search_and_delete(data_dir, monkeypatch) -> None:
+    monkeypatch.setenv("NC_SEARCH_INDEX_ENABLED", "true")
+    get_settings.cache_clear()
+    a, b = storage.init_upload(filename="a.txt"), storage.init_upload(filename="b.txt")
+    assert search_index.index_result(a, _result(a, "AB1234567")) == 3
+    search_index.index_result(b, _result(b, "ZX7654321"))
+    # Re-indexing replaces the document's rows
+    search_index.index_result(b, _result(b, "ZX7654321"))
+
+    client = TestClient(create_app())
+    body = client.get("/search", params={"q": "AB1234567"}).json()
+    assert body["total"] == 2 and {h["document_id"] for h in body["hits"]} == {str(a)}
+    assert {(h["kind"], h["page"]) for h in body["hits"]} == {("chunk", 1), ("field", 1)}
+
+    body = client.get("/search", params={"q": "zx7654321", "field": "passport_no"}).json()
+    assert body["hits"] == [
+        {"document_id": str(b), "kind": "field", "page": 1, "snippet": "[ZX7654321]",
+         "score": body["hits"][0]["score"], "field": "passport_no"}
+    ]
+    page = client.get("/search", params={"q": "permit", "limit": 1, "offset": 1}).json()
+    assert page["total"] == 2 and len(page["hits"]) == 1
+    assert client.get("/search", params={"q": 'permit" OR *'}).status_code == 200
+
+    assert client.delete(f"/file/{b}").status_code == 204
+    assert client.get("/search", params={"q": "ZX7654321"}).json()["total"] == 0
+    assert client.get("/search", params={"q": "permit"}).json()["total"] == 1
+    get_settings.cache_clear()
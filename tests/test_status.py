@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from fastapi.testclient import TestClient
+
+from nc_parser.api import status_events
+from nc_parser.api.main import create_app
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import files as storage
+
+
+def test_status_is_served_without_reading_result(data_dir, monkeypatch) -> None:
+    file_id = storage.init_upload(filename="a.txt")
+    storage.write_status(file_id, status="done", progress=1.0)
+    storage.write_summary(file_id, {"pages": 1, "caption": {"count": 2, "model": "stub"}})
+
+    def _fail(_):  # pragma: no cover - must not be called
+        raise AssertionError("status must not read the result")
+
+    monkeypatch.setattr(storage, "read_result", _fail)
+    client = TestClient(create_app())
+    body = client.get(f"/status/{file_id}").json()
+    assert body["status"] == "done"
+    assert body["caption"] == {"count": 2, "model": "stub"}
+
+
+def test_status_unknown_file_is_404(data_dir) -> None:
+    client = TestClient(create_app())
+    assert client.get("/status/00000000-0000-0000-0000-000000000000").status_code == 404
+
+
+def test_status_long_poll_returns_on_change(data_dir, monkeypatch) -> None:
+    monkeypatch.setenv("NC_STATUS_POLL_INTERVAL_S", "0.05")
+    get_settings.cache_clear()
+    file_id = storage.init_upload(filename="a.txt")
+    storage.write_status(file_id, status="processing", progress=0.2)
+    timer = threading.Timer(0.2, lambda: storage.write_status(file_id, status="done", progress=1.0))
+    timer.start()
+    client = TestClient(create_app())
+    body = client.get(f"/status/{file_id}?wait=5s").json()
+    timer.join()
+    assert body["status"] == "done"
+
+
+def test_status_sse_stream_ends_when_jobs_are_final(data_dir) -> None:
+    ids = [storage.init_upload(filename=f"{i}.txt") for i in range(2)]
+    storage.write_status(ids[0], status="done", progress=1.0)
+    storage.write_status(ids[1], status="failed", error="boom")
+    client = TestClient(create_app())
+    resp = client.get("/events", params={"file_ids": ",".join(str(i) for i in ids)})
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert resp.text.count("event: status") == 2
+    assert resp.text.rstrip().endswith("event: end\ndata: {}")
+
+
+def test_redis_waiters_share_one_subscriber(data_dir, redis_db, monkeypatch) -> None:
+    import redis.asyncio as aioredis
+
+    monkeypatch.setenv("NC_STATUS_EVENTS", "redis")
+    get_settings.cache_clear()
+    clients = []
+    make_client = aioredis.from_url
+    monkeypatch.setattr(aioredis, "from_url", lambda url, **kw: clients.append(url) or make_client(url, **kw))
+    first, second = storage.init_upload(filename="a.txt"), storage.init_upload(filename="b.txt")
+    for fid in (first, second):
+        storage.write_status(fid, status="processing", progress=0.1)
+
+    async def follow(ids):
+        return [st["status"] async for st in status_events.status_updates(ids, timeout=5, initial=False)]
+
+    async def scenario():
+        waiters = [asyncio.create_task(follow([first, second])), asyncio.create_task(follow([first]))]
+        await asyncio.sleep(0.2)
+        await asyncio.to_thread(storage.write_status, first, status="done", progress=1.0)
+        await asyncio.to_thread(storage.write_status, second, status="done", progress=1.0)
+        results = await asyncio.wait_for(asyncio.gather(*waiters), timeout=5)
+        await status_events.close_subscriber()
+        return results
+
+    assert asyncio.run(scenario()) == [["done", "done"], ["done"]]
+    assert len(clients) == 1
+    channels = [status_events.events_channel(fid) for fid in (first, second)]
+    assert all(count == 0 for _, count in redis_db.pubsub_numsub(*channels))
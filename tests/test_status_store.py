@@ -0,0 +1,69 @@
+import threading
+from uuid import uuid4
+
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import status_store
+
+
+def test_replace_drops_stale_fields_and_sets_ttl(redis_db, monkeypatch) -> None:
+    monkeypatch.setenv("NC_RETENTION_TTL_HOURS", "2")
+    get_settings.cache_clear()
+    file_id = uuid4()
+    status_store.write_status(file_id, {"status": "failed", "error": "boom", "timings_ms": {"parse": 1.5}})
+    assert status_store.read_status_and_summary(file_id) == (
+        {"status": "failed", "error": "boom", "timings_ms": {"parse": 1.5}},
+        None,
+    )
+    status_store.write_status(file_id, {"status": "queued", "progress": 0.0})
+    status_store.write_summary(file_id, {"caption": {"count": 2}})
+    assert status_store.read_status_and_summary(file_id) == ({"status": "queued", "progress": 0.0}, {"caption": {"count": 2}})
+    for key in (status_store.status_key(file_id), status_store.summary_key(file_id)):
+        assert 7000 < redis_db.ttl(key) <= 7200
+
+    status_store.delete(file_id)
+    assert status_store.read_status_and_summary(file_id) == (None, None)
+
+
+def test_readers_never_see_a_half_replaced_status(redis_db) -> None:
+    file_id = uuid4()
+    records = [
+        {"status": "processing", "progress": 0.5, "stage": "ocr"},
+        {"status": "done", "progress": 1.0, "timings_ms": {"total": 12.0}},
+    ]
+    status_store.write_status(file_id, records[0])
+    stop = threading.Event()
+    seen: list[dict] = []
+
+    def read() -> None:
+        while not stop.is_set():
+            seen.append(status_store.read_status_and_summary(file_id)[0])
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    for i in range(300):
+        status_store.write_status(file_id, records[i % 2])
+    stop.set()
+    reader.join()
+    assert seen and all(st in records for st in seen)
+
+
+def test_write_status_many_stores_expires_and_publishes(redis_db) -> None:
+    ids = [uuid4(), uuid4()]
+    status_store.write_status(ids[0], {"status": "processing", "stage": "upload"})
+    pubsub = redis_db.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(*(status_store.events_channel(fid) for fid in ids))
+
+    status_store.write_status_many({fid: {"status": "queued", "progress": 0.0} for fid in ids}, publish=True)
+    missing = uuid4()
+    assert status_store.read_many([ids[1], missing, ids[0]]) == [
+        ({"status": "queued", "progress": 0.0}, None),
+        (None, None),
+        ({"status": "queued", "progress": 0.0}, None),
+    ]
+    assert all(redis_db.ttl(status_store.status_key(fid)) > 0 for fid in ids)
+    messages = [msg["channel"] for msg in (pubsub.get_message(timeout=0.5) for _ in range(6)) if msg]
+    assert sorted(messages) == sorted(status_store.events_channel(fid) for fid in ids)
+
+    status_store.write_status_many({ids[0]: {"status": "done"}})
+    assert pubsub.get_message(timeout=0.2) is None
+    pubsub.close()
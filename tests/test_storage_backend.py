@@ -0,0 +1,92 @@
+import io
+import time
+from uuid import UUID
+
+import pydantic
+import pytest
+
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import backend as storage_backend
+from nc_parser.storage import batches
+from nc_parser.storage import files as storage
+from nc_parser.storage import retention
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+
+@pytest.fixture()
+def s3_store(data_dir, redis_db, monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("NC_STORAGE_BACKEND", "s3")
+    monkeypatch.setenv("NC_S3_BUCKET", "nc-test")
+    monkeypatch.setenv("NC_S3_REGION", "us-east-1")
+    monkeypatch.setenv("NC_STATUS_BACKEND", "redis")
+    get_settings.cache_clear()
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="nc-test")
+        storage_backend._s3_backend.cache_clear()
+        yield storage_backend.get_storage_backend()
+    storage_backend._s3_backend.cache_clear()
+
+
+def test_s3_backend_round_trip(s3_store) -> None:
+    file_id = storage.store_complete_upload(io.BytesIO(b"payload"), "doc.txt")
+    assert sorted(s3_store.list_keys(storage.job_key("uploads", file_id) + "/")) == [
+        storage.job_key("uploads", file_id, "doc.txt"),
+        storage.job_key("uploads", file_id, "meta.json"),
+    ]
+
+    # Worker side: fetched by key once, then served from the read-through cache
+    path = storage.fetch_input(file_id)
+    assert path.read_bytes() == b"payload"
+    assert storage.fetch_input(file_id) == path
+
+    pages = [{"index": i, "text": f"page {i}"} for i in range(3)]
+    storage.write_result(file_id, {"document_id": str(file_id), "full_text": "x", "pages": pages})
+    assert storage.read_result_header(file_id)["page_count"] == 3
+    assert storage.read_result_pages(file_id, [2, 0]) == [pages[2], pages[0]]
+    assert storage.read_result(file_id)["pages"] == pages
+
+    storage.delete_all(file_id)
+    assert s3_store.list_keys(storage.job_key("results", file_id) + "/") == []
+    assert storage.read_result_index(file_id) is None
+
+
+def _switch_node(monkeypatch, data_dir) -> None:
+    """Continue as another node: same bucket and Redis, its own empty NC_DATA_DIR."""
+    monkeypatch.setenv("NC_DATA_DIR", str(data_dir))
+    get_settings.cache_clear()
+    get_settings().ensure_data_dirs()
+
+
+def test_s3_job_state_is_shared_across_nodes(s3_store, tmp_path, monkeypatch) -> None:
+    file_id = storage.store_complete_upload(io.BytesIO(b"payload"), "doc.txt")
+    storage.save_celery_task_id(file_id, "task-1")
+    batch_id = UUID(batches.create_batch([(io.BytesIO(b"member"), "m.txt")])["batch_id"])
+
+    _switch_node(monkeypatch, tmp_path / "worker")
+    assert storage.read_meta(file_id).celery_task_id == "task-1"
+    assert storage.fetch_input(file_id).read_bytes() == b"payload"
+    storage.write_artifact(file_id, "probe.txt", b"ok")
+    storage.write_result(file_id, {"document_id": str(file_id), "full_text": "x", "pages": []})
+    storage.write_summary(file_id, {"caption": {"count": 1}})
+    storage.write_status(file_id, "done", progress=1.0)
+    assert not list((tmp_path / "worker").glob("*/*/*/*/status.json"))
+
+    _switch_node(monkeypatch, tmp_path / "cron")
+    assert storage.read_job_status(file_id)["caption"] == {"count": 1}
+    assert batches.read_batch_status(batch_id)["counts"] == {"queued": 1}
+    report = retention.cleanup_expired(now=time.time() + 2 * get_settings().retention_ttl_hours * 3600)
+    assert report["expired"] == 2 and report["batches"] == 1
+    assert s3_store.list_keys("") == []
+    with pytest.raises(FileNotFoundError):
+        storage.read_job_status(file_id)
+
+
+def test_s3_needs_redis_status(data_dir, monkeypatch) -> None:
+    monkeypatch.setenv("NC_STORAGE_BACKEND", "s3")
+    get_settings.cache_clear()
+    with pytest.raises(pydantic.ValidationError, match="NC_STATUS_BACKEND=redis"):
+        get_settings()
@@ -0,0 +1,47 @@
+from nc_parser.processing.csv_stream import read_csv
+from nc_parser.processing.html_extract import extract_html_file
+from nc_parser.processing.textio import SAMPLE_BYTES, detect_file_encoding, read_text
+
+
+def test_encoding_from_middle_sample_and_cap(tmp_path) -> None:
+    src = tmp_path / "server.log"
+    ascii_head = b"GET /healthz 200\n" * (SAMPLE_BYTES // 8)
+    cyrillic = "Ошибка авторизации пользователя: неверный пароль\n".encode("cp1251") * 2000
+    src.write_bytes(ascii_head + cyrillic + ascii_head)
+    assert detect_file_encoding(src) == "cp1251"
+    content = read_text(src, max_chars=len(ascii_head) + 10_000)
+    assert content.truncated and content.text.endswith("characters")
+    assert "Ошибка авторизации пользователя" in content.text
+    assert len(content.text) < len(ascii_head) + 10_100
+
+
+def test_html_file_in_legacy_encoding(tmp_path) -> None:
+    src = tmp_path / "page.html"
+    body = "<p>Справка о доходах физического лица за отчётный период</p>" * 20
+    src.write_bytes(f"<html><body>{body}<table><tr><td>Итого</td></tr></table></body></html>".encode("cp1251"))
+    content = extract_html_file(src)
+    assert "Справка о доходах" in content.text and not content.truncated
+    assert content.tables[0][0][0]["text"] == "Итого"
+
+
+def test_legacy_text_after_first_sample(tmp_path) -> None:
+    ascii_head = b"GET /healthz 200\n" * (SAMPLE_BYTES // 16)
+    cyrillic = "Ошибка авторизации пользователя\n".encode("cp1251") * 700
+    small = tmp_path / "small.log"
+    small.write_bytes(ascii_head + cyrillic)  # ~88 KB: read whole for detection
+    assert detect_file_encoding(small) == "cp1251"
+    assert read_text(small).text.count("Ошибка авторизации") == 700
+
+    # Over 192 KiB, with the legacy text only between the sampled regions
+    big = tmp_path / "big.log"
+    big.write_bytes(ascii_head * 6 + cyrillic + ascii_head * 2)
+    assert detect_file_encoding(big) == "utf-8-sig"
+    content = read_text(big)
+    assert content.text.count("Ошибка авторизации") == 700 and "�" not in content.text
+    assert content.encoding != "utf-8-sig"
+
+    table = tmp_path / "table.csv"
+    table.write_bytes(b"id,name\n" + b"".join(b"%d,user\n" % i for i in range(9000)) + "".join(
+        f"{i},{name}\n" for i, name in enumerate(["Иванов Сергей", "Петрова Анна", "Смирнов Дмитрий", "Кузнецова Ольга"] * 50)
+    ).encode("cp1251"))
+    assert "Смирнов Дмитрий" in read_csv(table, html_max_rows=10, text_max_chars=10**7).text
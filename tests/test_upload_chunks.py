@@ -0,0 +1,140 @@
+import errno
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from nc_parser.api.main import create_app
+from nc_parser.core.settings import get_settings
+from nc_parser.storage import files as storage
+
+
+def test_parallel_chunks_are_all_recorded(data_dir) -> None:
+    payload = bytes(range(256)) * 40
+    chunk_size = 256
+    file_id = storage.init_upload(filename="doc.bin")
+    parts = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda ip: storage.append_chunk(file_id, ip[0], ip[1]), enumerate(parts)))
+    assert sorted(storage.read_chunk_ledger(file_id)) == list(range(len(parts)))
+    assembled = storage.assemble_file(file_id)
+    assert assembled.read_bytes() == payload
+    assert storage.UploadMeta.from_file(storage._meta_path(file_id)).chunks_digest
+
+
+def test_chunk_checksum_is_verified(data_dir) -> None:
+    file_id = storage.init_upload(filename="doc.bin")
+    storage.append_chunk(file_id, 0, b"abc", checksum=hashlib.sha256(b"abc").hexdigest())
+    with pytest.raises(ValueError):
+        storage.append_chunk(file_id, 1, b"abc", checksum="0" * 64)
+
+
+def test_chunks_endpoint_reports_missing_ranges(data_dir) -> None:
+    client = TestClient(create_app())
+    file_id = client.post("/upload/init", json={"filename": "a.bin", "size_bytes": 10, "chunk_size": 2}).json()["file_id"]
+    for idx in (0, 1, 3):
+        resp = client.post(f"/upload/chunk?file_id={file_id}&index={idx}", content=b"xx")
+        assert resp.status_code == 204
+    body = client.get(f"/upload/{file_id}/chunks").json()
+    assert body["expected_chunks"] == 5
+    assert body["received"] == [[0, 1], [3, 3]]
+    assert body["missing"] == [[2, 2], [4, 4]]
+
+
+def test_offset_mode_writes_in_place(data_dir) -> None:
+    payload = b"0123456789abcdefghij-tail"
+    file_id = storage.init_upload(filename="doc.bin", size_bytes=len(payload), chunk_size=10)
+    target = storage.get_uploaded_file_path(file_id)
+    assert target.stat().st_size == len(payload)
+    for idx in (2, 0, 1):
+        storage.append_chunk(file_id, idx, payload[idx * 10:(idx + 1) * 10])
+    with pytest.raises(ValueError):
+        storage.append_chunk(file_id, 1, b"short")
+    assert storage.assemble_file(file_id) == target
+    assert target.read_bytes() == payload
+    assert not (target.parent / "chunks").exists()
+
+
+def test_complete_checksum_uses_running_digest(data_dir, monkeypatch) -> None:
+    client = TestClient(create_app())
+    monkeypatch.setattr("nc_parser.api.routes.upload._enqueue", lambda file_id: None)
+    payload = bytes(range(256)) * 8
+    parts = [payload[i:i + 512] for i in range(0, len(payload), 512)]
+    checksum = hashlib.sha256(payload).hexdigest()
+    rehashed = []
+    monkeypatch.setattr(storage, "sha256_file", lambda path: rehashed.append(path) or hashlib.sha256(path.read_bytes()).hexdigest())
+
+    for order in ([0, 1, 2, 3], [1, 0, 3, 2]):
+        init = {"filename": "a.bin", "size_bytes": len(payload), "chunk_size": 512, "checksum": checksum}
+        file_id = client.post("/upload/init", json=init).json()["file_id"]
+        for idx in order:
+            assert client.post(f"/upload/chunk?file_id={file_id}&index={idx}", content=parts[idx]).status_code == 204
+        assert client.post(f"/upload/complete?file_id={file_id}").json()["status"] == "queued"
+    assert len(rehashed) == 1  # only the out-of-order upload was read again
+
+    file_id = client.post("/upload/init", json={**init, "checksum": "0" * 64}).json()["file_id"]
+    for idx, part in enumerate(parts):
+        client.post(f"/upload/chunk?file_id={file_id}&index={idx}", content=part)
+    assert client.post(f"/upload/complete?file_id={file_id}").status_code == 400
+
+
+def test_double_complete_keeps_the_upload(data_dir, monkeypatch) -> None:
+    client = TestClient(create_app())
+    queued = []
+    monkeypatch.setattr("nc_parser.api.routes.upload._enqueue", queued.append)
+    file_id = client.post("/upload/init", json={"filename": "a.txt"}).json()["file_id"]
+    for idx, part in enumerate((b"hello ", b"world")):
+        client.post(f"/upload/chunk?file_id={file_id}&index={idx}", content=part)
+    for _ in range(2):
+        resp = client.post(f"/upload/complete?file_id={file_id}")
+        assert resp.status_code == 200 and resp.json()["status"] == "queued"
+    assert storage.get_uploaded_file_path(UUID(file_id)).read_bytes() == b"hello world"
+    assert len(queued) == 1
+
+    # Part files gone before the upload was completed: refused, nothing truncated
+    other = client.post("/upload/init", json={"filename": "b.txt"}).json()["file_id"]
+    client.post(f"/upload/chunk?file_id={other}&index=0", content=b"data")
+    for part in (storage.job_dir("uploads", UUID(other)) / "chunks").glob("*.part"):
+        part.unlink()
+    assert client.post(f"/upload/complete?file_id={other}").status_code == 409
+    assert client.post(f"/upload/complete?file_id={uuid4()}").status_code == 404
+
+
+def test_init_rejects_bad_sizes(data_dir, monkeypatch) -> None:
+    monkeypatch.setenv("NC_UPLOAD_MAX_MB", "1")
+    monkeypatch.setenv("NC_UPLOAD_CHUNK_MAX_MB", "1")
+    get_settings.cache_clear()
+    client = TestClient(create_app())
+    for body in (
+        {"size_bytes": 10, "chunk_size": 0},
+        {"size_bytes": -1},
+        {"chunk_size": "4"},
+        {"chunk_size": 1.5},
+        {"chunk_size": True},
+        {"chunk_size": 1024 * 1024 + 1},
+        {"size_bytes": 2 * 1024 * 1024},
+    ):
+        assert client.post("/upload/init", json={"filename": "a.bin", **body}).status_code == 422
+    assert not (data_dir / "uploads").exists() or not list((data_dir / "uploads").glob("*/*/*"))
+    assert client.post("/upload/init", json={"filename": "a.bin", "chunk_size": 1024 * 1024}).status_code == 200
+
+
+def test_preallocate_errors(data_dir, monkeypatch) -> None:
+    def fallocate(errno_):
+        def fail(fd, offset, length):
+            raise OSError(errno_, os.strerror(errno_))
+        return fail
+
+    monkeypatch.setattr(os, "posix_fallocate", fallocate(errno.EOPNOTSUPP))
+    file_id = storage.init_upload(filename="a.bin", size_bytes=100, chunk_size=10)
+    assert storage.get_uploaded_file_path(file_id).stat().st_size == 100
+
+    monkeypatch.setattr(os, "posix_fallocate", fallocate(errno.ENOSPC))
+    with pytest.raises(OSError):
+        storage.init_upload(filename="b.bin", size_bytes=100, chunk_size=10)
+    assert len(list((data_dir / "uploads").glob("*/*/*"))) == 1
+    resp = TestClient(create_app()).post("/upload/init", json={"filename": "b.bin", "size_bytes": 100, "chunk_size": 10})
+    assert resp.status_code == 507